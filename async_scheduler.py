@@ -0,0 +1,207 @@
+import asyncio
+import inspect
+import time
+from typing import Iterable
+from uuid import UUID
+
+from dag import validate_graph
+from executors import run_step
+from exceptions import TaskTimeLimitError
+from job import (FAILED_STATUSES,
+                 Job,
+                 JobStatus)
+from custom_logger import logger
+
+
+class AsyncScheduler:
+    """
+    Планировщик задач на asyncio.
+
+    Выполняет все задачи в одном цикле событий. Целью задачи может быть
+    `async def` функция, асинхронный генератор или обычный генератор.
+    Одновременно выполняется не более `pool_size` задач, ожидание
+    зависимостей и времени старта место в пуле не занимает.
+
+    Атрибуты:
+        pool_size (int): Максимальное количество одновременно
+        выполняемых задач.
+        dependency_map (dict[UUID, list[Job]]): Словарь задач-зависимостей.
+    """
+
+    def __init__(self, pool_size: int = 10):
+        self.pool_size: int = pool_size
+        self.dependency_map: dict[UUID, list[Job]] = {}
+        # Итоговые статусы завершённых задач, в том числе из прошлых запусков.
+        self._completed: dict[UUID, JobStatus] = {}
+        logger.info('Асинхронный шедулер инициализирован')
+
+    def process_all_tasks(self, tasks: Iterable[Job]) -> None:
+        """
+        Выполняет все переданные задачи в новом цикле событий.
+
+        Параметры:
+            tasks (Iterable[Job]): Задачи для выполнения.
+        """
+        asyncio.run(self.run(tasks))
+
+    async def run(self, tasks: Iterable[Job]) -> None:
+        """
+        Выполняет все переданные задачи в текущем цикле событий.
+
+        Args:
+            tasks (Iterable[Job]): Задачи для выполнения.
+
+        Raises:
+            DependencyGraphError: Если зависимости задач образуют цикл.
+        """
+        tasks = validate_graph(self.__runnable(list(tasks)), self._completed)
+        semaphore = asyncio.Semaphore(self.pool_size)
+        events = {task.id: asyncio.Event() for task in tasks}
+        for task in tasks:
+            for dependency in task.dependencies:
+                self.dependency_map.setdefault(dependency, []).append(task)
+
+        await asyncio.gather(*(self.__run_task(task, semaphore, events)
+                               for task in tasks))
+        logger.info('Все задачи обработаны')
+
+    def __runnable(self, tasks: list[Job]) -> list[Job]:
+        """
+        Отбрасывает задачи, зависимости которых никогда не будут выполнены.
+
+        Args:
+            tasks (list[Job]): Задачи для выполнения.
+
+        Returns:
+            list[Job]: Задачи, все зависимости которых либо уже завершены,
+            либо могут быть выполнены в этом запуске.
+        """
+        runnable = {task.id: task for task in tasks}
+        changed = True
+        while changed:
+            changed = False
+            for task in list(runnable.values()):
+                if all(dependency in runnable or dependency in self._completed
+                       for dependency in task.dependencies):
+                    continue
+                logger.warning('Задача %s не может быть запущена: '
+                               'её зависимости не были добавлены '
+                               'в планировщик.', task.id)
+                task.status = JobStatus.POSTPONED
+                del runnable[task.id]
+                changed = True
+        return list(runnable.values())
+
+    async def __run_task(self,
+                         task: Job,
+                         semaphore: asyncio.Semaphore,
+                         events: dict[UUID, asyncio.Event]) -> None:
+        """
+        Дожидается зависимостей и времени старта задачи,
+        затем выполняет её с учётом перезапусков.
+
+        Если зависимость провалена или пропущена, задача с политикой
+        'skip' или 'fail' завершается без запуска.
+
+        Args:
+            task (Job): Задача для выполнения.
+            semaphore (asyncio.Semaphore): Ограничитель размера пула.
+            events (dict[UUID, asyncio.Event]): События завершения задач.
+        """
+        for dependency in task.dependencies:
+            if dependency in events and not events[dependency].is_set():
+                task.status = JobStatus.POSTPONED
+                await events[dependency].wait()
+            status = self._completed[dependency]
+            task.dependency_statuses[dependency] = status
+            if (status in FAILED_STATUSES
+                    and task.on_dependency_failure != 'run'):
+                self.__cancel(task, events)
+                return
+
+        if task.start_at and time.time() < task.start_at:
+            await asyncio.sleep(task.start_at - time.time())
+
+        while True:
+            try:
+                async with semaphore:
+                    logger.info('Выполнение %s', task.id)
+                    await self.__execute(task)
+            except Exception as e:
+                logger.error('Ошибка при выполнении %s: %s', task.id, e)
+                if (task.max_restarts > task.restarts
+                        and task.retry.should_retry(e)):
+                    task.restarts += 1
+                    task.running_time = 0
+                    task.reset()
+                    # Задержка перед повтором не занимает место в пуле.
+                    await asyncio.sleep(task.retry.delay(task.restarts))
+                    continue
+                task.status = JobStatus.FAILED
+            else:
+                task.status = JobStatus.FINISHED
+            break
+
+        self._completed[task.id] = task.status
+        self.dependency_map.pop(task.id, None)
+        events[task.id].set()
+
+    def __cancel(self,
+                 task: Job,
+                 events: dict[UUID, asyncio.Event]) -> None:
+        """
+        Пропускает или проваливает задачу, не запуская её,
+        согласно её политике on_dependency_failure.
+        """
+        if task.on_dependency_failure == 'skip':
+            task.status = JobStatus.SKIPPED
+        else:
+            task.status = JobStatus.FAILED
+        logger.warning('Задача %s не будет запущена: её зависимость '
+                       'провалена. Статус задачи - %s.',
+                       task.id, task.status.value)
+        self._completed[task.id] = task.status
+        self.dependency_map.pop(task.id, None)
+        events[task.id].set()
+
+    @staticmethod
+    async def __execute(task: Job) -> None:
+        """
+        Выполняет корутину задачи, контролируя время выполнения
+        и длительность каждого шага через asyncio.wait_for.
+
+        Args:
+            task (Job): Задача для выполнения.
+
+        Raises:
+            TaskTimeLimitError: Если задача превысила max_running_time.
+        """
+        task.status = JobStatus.STARTED
+        coroutine = task.coroutine
+
+        if not (inspect.isasyncgen(coroutine)
+                or inspect.iscoroutine(coroutine)):
+            # Обычный генератор выполняется по шагам, уступая цикл событий.
+            # Отданный через yield Future ожидается без блокировки цикла.
+            while not run_step(task):
+                if task.awaiting is None:
+                    await asyncio.sleep(0)
+                    continue
+                awaiting, task.awaiting = task.awaiting, None
+                await asyncio.wait([asyncio.wrap_future(awaiting)])
+            return
+
+        while True:
+            timeout = task.time_budget()
+            started = time.monotonic()
+            try:
+                if inspect.iscoroutine(coroutine):
+                    task.result = await asyncio.wait_for(coroutine, timeout)
+                    return
+                await asyncio.wait_for(coroutine.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise TaskTimeLimitError
+            finally:
+                task.running_time += time.monotonic() - started
@@ -0,0 +1,719 @@
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import (BaseHTTPRequestHandler,
+                         ThreadingHTTPServer)
+from typing import (Callable,
+                    Optional)
+
+import requests
+
+import file_io
+import http_client
+from async_scheduler import AsyncScheduler
+from broker import BrokerExecutor
+from custom_logger import (RateLimitFilter,
+                           setup_logging,
+                           stop_logging)
+from executors import ProcessExecutor
+from job import Job
+from scheduler import Scheduler
+from work_stealing import WorkStealingScheduler
+from worker import run_worker
+
+
+def noop():
+    yield
+
+
+def steps(count: int):
+    for _ in range(count):
+        yield
+
+
+def burn(iterations: int):
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    yield
+
+
+def make_payload(megabytes: int):
+    yield
+    return os.urandom(1 << 20) * megabytes
+
+
+def checksum_payload(data):
+    yield
+    return sum(data[::4096])
+
+
+def fetch(url: str, count: int, pooled: bool):
+    client = http_client.session() if pooled else requests
+    for _ in range(count):
+        client.get(url).content
+        yield
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    """
+    Отвечает 'ok' на любой GET-запрос, не закрывая соединение.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело уходят отдельными пакетами; без этого алгоритм
+    # Нейгла задерживает ответ на постоянном соединении на десятки мс.
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def measure_queued_job_memory(count: int, shape: str = 'independent') -> dict:
+    """
+    Измеряет, сколько памяти занимает одна задача в очереди планировщика.
+
+    Учитывается всё, что создаётся при постановке задачи в очередь:
+    сам объект Job, его идентификатор и служебные структуры планировщика.
+
+    Args:
+        count (int): Количество задач.
+        shape (str): 'independent' - задачи без зависимостей в очереди
+        готовых задач, 'chain' - каждая задача ждёт предыдущую.
+
+    Returns:
+        dict: Результат измерения.
+    """
+    gc.collect()
+    tracemalloc.start()
+    scheduler = Scheduler(pool_size=count)
+    before, _ = tracemalloc.get_traced_memory()
+
+    previous: Optional[Job] = None
+    for _ in range(count):
+        dependencies = [previous.id] if shape == 'chain' and previous else None
+        previous = Job(target=noop, dependencies=dependencies)
+        scheduler.schedule(previous)
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'benchmark': 'queued_job_memory',
+        'shape': shape,
+        'jobs': count,
+        'bytes_per_job': round((after - before) / count, 1),
+    }
+
+
+def measure_logging_throughput(mode: str,
+                               jobs: int = 100,
+                               steps_per_job: int = 200) -> dict:
+    """
+    Измеряет, сколько шагов в секунду выполняет планировщик
+    при разных режимах журналирования.
+
+    Args:
+        mode (str): 'sync' - запись в файл в потоке планировщика,
+        'queued' - запись в фоновом потоке, 'sampled' - запись
+        в фоновом потоке с ограничением однотипных сообщений.
+        jobs (int): Количество задач.
+        steps_per_job (int): Количество шагов в каждой задаче.
+
+    Returns:
+        dict: Результат измерения.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        setup_logging(filename=os.path.join(directory, 'benchmark.log'),
+                      queued=mode != 'sync',
+                      rate_limit=RateLimitFilter() if mode == 'sampled'
+                      else None)
+        scheduler = Scheduler(pool_size=jobs)
+        tasks = (Job(target=steps, args=(steps_per_job,))
+                 for _ in range(jobs))
+        started = time.perf_counter()
+        scheduler.process_all_tasks(tasks)
+        elapsed = time.perf_counter() - started
+        stop_logging()
+
+    return {
+        'benchmark': 'logging',
+        'mode': mode,
+        'steps': jobs * steps_per_job,
+        'steps_per_second': round(jobs * steps_per_job / elapsed),
+    }
+
+
+def chain(nodes: int, steps_per_job: int = 1) -> list[Job]:
+    """
+    Длинная цепочка: каждая задача зависит от предыдущей (как в main.py).
+    """
+    jobs: list[Job] = []
+    for _ in range(nodes):
+        dependencies = [jobs[-1].id] if jobs else None
+        jobs.append(Job(target=steps, args=(steps_per_job,),
+                        dependencies=dependencies))
+    return jobs
+
+
+def fan_out(nodes: int, steps_per_job: int = 1) -> list[Job]:
+    """
+    Широкое ветвление: все задачи зависят от одной (как в files_tasks.py).
+    """
+    root = Job(target=steps, args=(steps_per_job,))
+    return [root] + [Job(target=steps, args=(steps_per_job,),
+                         dependencies=[root.id])
+                     for _ in range(nodes - 1)]
+
+
+def diamonds(nodes: int, steps_per_job: int = 1) -> list[Job]:
+    """
+    Цепочка ромбов: вершина, две параллельные задачи и их слияние,
+    которое становится вершиной следующего ромба.
+    """
+    jobs = [Job(target=steps, args=(steps_per_job,))]
+    while len(jobs) + 3 <= nodes:
+        top = jobs[-1].id
+        left = Job(target=steps, args=(steps_per_job,), dependencies=[top])
+        right = Job(target=steps, args=(steps_per_job,), dependencies=[top])
+        join = Job(target=steps, args=(steps_per_job,),
+                   dependencies=[left.id, right.id])
+        jobs += [left, right, join]
+    return jobs
+
+
+def random_dag(nodes: int,
+               steps_per_job: int = 1,
+               max_dependencies: int = 3,
+               window: int = 100,
+               seed: int = 0) -> list[Job]:
+    """
+    Случайный ациклический граф: каждая задача зависит от нескольких
+    случайных задач среди `window` предыдущих.
+    """
+    generator = random.Random(seed)
+    jobs: list[Job] = []
+    for index in range(nodes):
+        candidates = range(max(0, index - window), index)
+        count = min(len(candidates),
+                    generator.randint(0, max_dependencies))
+        dependencies = [jobs[i].id
+                        for i in generator.sample(candidates, count)]
+        jobs.append(Job(target=steps, args=(steps_per_job,),
+                        dependencies=dependencies))
+    return jobs
+
+
+SHAPES: dict[str, Callable[..., list[Job]]] = {
+    'chain': chain,
+    'fan-out': fan_out,
+    'diamond': diamonds,
+    'random': random_dag,
+}
+
+
+def run_scheduler(jobs: list[Job], pool_size: int, executor: str) -> None:
+    """
+    Выполняет задачи планировщиком Scheduler и останавливает его пул.
+    """
+    with Scheduler(pool_size=pool_size, executor=executor) as scheduler:
+        scheduler.process_all_tasks(jobs)
+
+
+ENGINES: dict[str, Callable[[list[Job], int], None]] = {
+    'inline': lambda jobs, pool_size: run_scheduler(
+        jobs, pool_size, 'inline'),
+    'thread': lambda jobs, pool_size: run_scheduler(
+        jobs, pool_size, 'thread'),
+    'process': lambda jobs, pool_size: run_scheduler(
+        jobs, pool_size, 'process'),
+    'async': lambda jobs, pool_size: AsyncScheduler(
+        pool_size=pool_size).process_all_tasks(jobs),
+    'stealing': lambda jobs, pool_size: WorkStealingScheduler(
+        workers=4).process_all_tasks(jobs),
+}
+
+
+def measure_dag(engine: str,
+                shape: str,
+                nodes: int,
+                pool_size: int = 100,
+                steps_per_job: int = 1,
+                trace_memory: bool = True) -> dict:
+    """
+    Измеряет накладные расходы планировщика на графе задач без полезной
+    работы: время на один шаг, пиковую память и общее время выполнения.
+
+    Args:
+        engine (str): Движок из ENGINES.
+        shape (str): Форма графа из SHAPES.
+        nodes (int): Количество задач.
+        pool_size (int): Размер пула планировщика.
+        steps_per_job (int): Количество шагов в каждой задаче.
+        trace_memory (bool): Измерить пиковую память отдельным
+        прогоном под tracemalloc. Задачи создаются до начала измерения,
+        поэтому учитывается только память самого планировщика.
+
+    Returns:
+        dict: Результат измерения.
+    """
+    jobs = SHAPES[shape](nodes, steps_per_job)
+    edges = sum(len(job.dependencies) for job in jobs)
+    # Шаг, на котором генератор завершается, тоже выполняет планировщик.
+    total_steps = len(jobs) * (steps_per_job + 1)
+
+    gc.collect()
+    started = time.perf_counter()
+    ENGINES[engine](jobs, pool_size)
+    makespan = time.perf_counter() - started
+
+    peak_memory = None
+    if trace_memory:
+        jobs = SHAPES[shape](nodes, steps_per_job)
+        gc.collect()
+        tracemalloc.start()
+        ENGINES[engine](jobs, pool_size)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'benchmark': 'dag',
+        'engine': engine,
+        'shape': shape,
+        'nodes': len(jobs),
+        'edges': edges,
+        'pool_size': pool_size,
+        'steps': total_steps,
+        'makespan_s': round(makespan, 6),
+        'scheduler_us_per_step': round(makespan * 1e6 / total_steps, 3),
+        'peak_memory_bytes': peak_memory,
+        'python': platform.python_version(),
+        'timestamp': round(time.time()),
+    }
+
+
+def measure_contention(design: str,
+                       workers: int,
+                       shape: str = 'random',
+                       nodes: int = 10_000,
+                       steps_per_job: int = 10) -> dict:
+    """
+    Сравнивает очереди потоков с кражей задач и одну общую очередь
+    под блокировкой при разном количестве рабочих потоков.
+
+    Args:
+        design (str): 'stealing' - очередь у каждого потока,
+        'global' - одна общая очередь.
+        workers (int): Количество рабочих потоков.
+        shape (str): Форма графа из SHAPES.
+        nodes (int): Количество задач.
+        steps_per_job (int): Количество шагов в каждой задаче.
+
+    Returns:
+        dict: Результат измерения.
+    """
+    jobs = SHAPES[shape](nodes, steps_per_job)
+    total_steps = len(jobs) * (steps_per_job + 1)
+    scheduler = WorkStealingScheduler(workers=workers,
+                                      stealing=design == 'stealing')
+    gc.collect()
+    started = time.perf_counter()
+    scheduler.process_all_tasks(jobs)
+    elapsed = time.perf_counter() - started
+    return {
+        'benchmark': 'contention',
+        'design': design,
+        'workers': workers,
+        'shape': shape,
+        'steps': total_steps,
+        'steps_per_second': round(total_steps / elapsed),
+    }
+
+
+def file_jobs_per_file(directory: str, files: int, lines: int):
+    """
+    Прежний подход files_tasks.py: файл открывается на каждую запись
+    и чтение, копии делаются shutil.copy в потоке планировщика.
+    """
+    paths = [os.path.join(directory, f'file_{i}.txt') for i in range(files)]
+    for path in paths:
+        for line in range(lines):
+            with open(path, 'a') as file:
+                file.write(f'line {line}\n')
+        yield
+    for path in paths:
+        with open(path) as file:
+            file.read()
+        yield
+    for path in paths:
+        shutil.copy(path, path + '.copy')
+        yield
+
+
+def file_jobs_toolkit(directory: str, files: int, lines: int):
+    """
+    Тот же набор операций через file_io: одна запись на файл,
+    чтение и копирование в пуле ввода-вывода.
+    """
+    paths = [os.path.join(directory, f'file_{i}.txt') for i in range(files)]
+    batch = file_io.WriteBatch()
+    for path in paths:
+        for line in range(lines):
+            batch.append(path, f'line {line}\n')
+    future = file_io.submit(batch.flush)
+    yield future
+    future.result()
+
+    future = file_io.submit(file_io.read_files, paths)
+    yield future
+    future.result()
+
+    copies = [file_io.submit(file_io.copy_file, path, path + '.copy')
+              for path in paths]
+    for future in copies:
+        yield future
+        future.result()
+
+
+def measure_file_io(mode: str, files: int = 2000, lines: int = 10) -> dict:
+    """
+    Измеряет время задачи, которая создаёт, читает и копирует
+    тысячи небольших файлов.
+
+    Args:
+        mode (str): 'per-file' - файл открывается на каждую операцию,
+        'toolkit' - пакетная запись и пул ввода-вывода из file_io.
+        files (int): Количество файлов.
+        lines (int): Количество мелких записей в каждый файл.
+
+    Returns:
+        dict: Результат измерения.
+    """
+    target = file_jobs_toolkit if mode == 'toolkit' else file_jobs_per_file
+    with tempfile.TemporaryDirectory() as directory:
+        job = Job(target=target, args=(directory, files, lines))
+        started = time.perf_counter()
+        Scheduler(pool_size=1).process_all_tasks((job,))
+        elapsed = time.perf_counter() - started
+    return {
+        'benchmark': 'files',
+        'mode': mode,
+        'files': files,
+        'writes': files * lines,
+        'elapsed_s': round(elapsed, 4),
+        'files_per_second': round(files / elapsed),
+    }
+
+
+def measure_http_throughput(mode: str,
+                            jobs: int = 20,
+                            requests_per_job: int = 50,
+                            workers: int = 4) -> dict:
+    """
+    Измеряет, сколько HTTP-запросов в секунду выполняют задачи
+    к локальному серверу.
+
+    Args:
+        mode (str): 'pooled' - запросы через общую сессию с пулом
+        соединений, 'unpooled' - новое соединение на каждый запрос.
+        jobs (int): Количество задач.
+        requests_per_job (int): Количество запросов в каждой задаче.
+        workers (int): Количество потоков исполнителя и соединений
+        к серверу в пуле.
+
+    Returns:
+        dict: Результат измерения.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    http_client.configure(hosts=1, connections_per_host=workers)
+
+    tasks = [Job(target=fetch, args=(url, requests_per_job,
+                                     mode == 'pooled'))
+             for _ in range(jobs)]
+    started = time.perf_counter()
+    with Scheduler(pool_size=jobs, executor='thread',
+                   workers=workers) as scheduler:
+        scheduler.process_all_tasks(tasks)
+    elapsed = time.perf_counter() - started
+
+    http_client.close()
+    server.shutdown()
+    server.server_close()
+    return {
+        'benchmark': 'http',
+        'mode': mode,
+        'workers': workers,
+        'requests': jobs * requests_per_job,
+        'requests_per_second': round(jobs * requests_per_job / elapsed),
+    }
+
+
+def measure_broker_throughput(workers: int,
+                              jobs: int = 200,
+                              iterations: int = 200_000) -> dict:
+    """
+    Измеряет, сколько задач в секунду выполняют рабочие процессы,
+    подключённые к брокеру через localhost.
+
+    Args:
+        workers (int): Количество рабочих процессов.
+        jobs (int): Количество задач.
+        iterations (int): Объём вычислений в каждой задаче.
+
+    Returns:
+        dict: Результат измерения.
+    """
+    broker = BrokerExecutor(capacity=workers * 2)
+    processes = [multiprocessing.Process(target=run_worker,
+                                         args=(broker.address,
+                                               broker.authkey))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    while broker.workers() < workers:
+        time.sleep(0.01)
+
+    tasks = [Job(target=burn, args=(iterations,)) for _ in range(jobs)]
+    started = time.perf_counter()
+    Scheduler(pool_size=jobs, executor=broker).process_all_tasks(tasks)
+    elapsed = time.perf_counter() - started
+
+    broker.shutdown()
+    for process in processes:
+        process.join()
+    return {
+        'benchmark': 'broker',
+        'workers': workers,
+        'jobs': jobs,
+        'jobs_per_second': round(jobs / elapsed, 1),
+    }
+
+
+def measure_dataflow(mode: str,
+                     megabytes: int = 64,
+                     consumers: int = 4) -> dict:
+    """
+    Измеряет передачу большого результата задачи зависимым задачам,
+    выполняющимся в пуле процессов.
+
+    Args:
+        mode (str): 'shared' - результат передаётся через общую память,
+        'pickle' - копируется каждому процессу через pickle.
+        megabytes (int): Размер результата в мегабайтах.
+        consumers (int): Количество зависимых задач.
+
+    Returns:
+        dict: Результат измерения.
+    """
+    executor = ProcessExecutor(2, threshold=None if mode == 'pickle'
+                               else 1 << 20)
+    producer = Job(target=make_payload, args=(megabytes,))
+    tasks = [producer] + [Job(target=checksum_payload,
+                              dependencies=[producer.id], pass_results=True)
+                          for _ in range(consumers)]
+    # Пул процессов запускается заранее, чтобы не учитывать его старт.
+    executor.submit(Job(target=noop)).result()
+    started = time.perf_counter()
+    Scheduler(pool_size=len(tasks), executor=executor).process_all_tasks(
+        tasks
+    )
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+    return {
+        'benchmark': 'dataflow',
+        'mode': mode,
+        'megabytes': megabytes,
+        'consumers': consumers,
+        'elapsed_s': round(elapsed, 4),
+    }
+
+
+def run_memory(args: argparse.Namespace) -> None:
+    # Журналирование каждой задачи искажает измерения.
+    logging.disable(logging.INFO)
+    for shape in args.shape:
+        for count in args.jobs:
+            report(measure_queued_job_memory(count, shape), args.output)
+
+
+def run_logging(args: argparse.Namespace) -> None:
+    for mode in args.mode:
+        report(measure_logging_throughput(mode, args.jobs, args.steps),
+               args.output)
+
+
+def run_dag(args: argparse.Namespace) -> None:
+    # Журналирование каждой задачи искажает измерения.
+    logging.disable(logging.INFO)
+    for engine in args.engine:
+        for shape in args.shape:
+            for nodes in args.nodes:
+                report(measure_dag(engine, shape, nodes, args.pool_size,
+                                   args.steps,
+                                   trace_memory=not args.no_memory),
+                       args.output)
+
+
+def run_contention(args: argparse.Namespace) -> None:
+    logging.disable(logging.WARNING)
+    for shape in args.shape:
+        for workers in args.workers:
+            for design in args.design:
+                report(measure_contention(design, workers, shape,
+                                          args.nodes, args.steps),
+                       args.output)
+
+
+def run_files(args: argparse.Namespace) -> None:
+    logging.disable(logging.INFO)
+    for files in args.files:
+        for mode in args.mode:
+            report(measure_file_io(mode, files, args.lines), args.output)
+
+
+def run_http(args: argparse.Namespace) -> None:
+    logging.disable(logging.INFO)
+    for workers in args.workers:
+        for mode in args.mode:
+            report(measure_http_throughput(mode, args.jobs, args.requests,
+                                           workers),
+                   args.output)
+
+
+def run_broker(args: argparse.Namespace) -> None:
+    logging.disable(logging.INFO)
+    for workers in args.workers:
+        report(measure_broker_throughput(workers, args.jobs, args.iterations),
+               args.output)
+
+
+def run_dataflow(args: argparse.Namespace) -> None:
+    logging.disable(logging.INFO)
+    for mode in args.mode:
+        report(measure_dataflow(mode, args.megabytes, args.consumers),
+               args.output)
+
+
+def report(result: dict, output: Optional[str]) -> None:
+    """
+    Выводит результат в формате JSON и, если указан файл,
+    дописывает его туда.
+    """
+    line = json.dumps(result)
+    print(line, flush=True)
+    if output:
+        with open(output, 'a') as file:
+            file.write(line + '\n')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Бенчмарки планировщика. Результаты выводятся '
+                    'в формате JSON, по одному объекту на строку.'
+    )
+    parser.add_argument('--output', help='Дописать результаты в файл')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    memory = subparsers.add_parser('memory',
+                                   help='Память на одну задачу в очереди')
+    memory.add_argument('--jobs', type=int, nargs='+',
+                        default=[100_000, 1_000_000])
+    memory.add_argument('--shape', choices=['independent', 'chain'],
+                        nargs='+', default=['independent', 'chain'])
+    memory.set_defaults(handler=run_memory)
+
+    logs = subparsers.add_parser('logging',
+                                 help='Шаги в секунду в режимах журнала')
+    logs.add_argument('--jobs', type=int, default=100)
+    logs.add_argument('--steps', type=int, default=200)
+    logs.add_argument('--mode', choices=['sync', 'queued', 'sampled'],
+                      nargs='+', default=['sync', 'queued', 'sampled'])
+    logs.set_defaults(handler=run_logging)
+
+    dag = subparsers.add_parser('dag',
+                                help='Накладные расходы на графах задач')
+    dag.add_argument('--engine', choices=list(ENGINES), nargs='+',
+                     default=['inline', 'thread', 'async', 'stealing'])
+    dag.add_argument('--shape', choices=list(SHAPES), nargs='+',
+                     default=list(SHAPES))
+    dag.add_argument('--nodes', type=int, nargs='+',
+                     default=[1_000, 10_000, 100_000])
+    dag.add_argument('--pool-size', type=int, default=100)
+    dag.add_argument('--steps', type=int, default=1)
+    dag.add_argument('--no-memory', action='store_true',
+                     help='Не измерять пиковую память')
+    dag.set_defaults(handler=run_dag)
+
+    contention = subparsers.add_parser(
+        'contention',
+        help='Очереди потоков с кражей задач против общей очереди'
+    )
+    contention.add_argument('--workers', type=int, nargs='+',
+                            default=[1, 4, 8, 16])
+    contention.add_argument('--design', choices=['stealing', 'global'],
+                            nargs='+', default=['stealing', 'global'])
+    contention.add_argument('--shape', choices=list(SHAPES), nargs='+',
+                            default=['random', 'fan-out'])
+    contention.add_argument('--nodes', type=int, default=10_000)
+    contention.add_argument('--steps', type=int, default=10)
+    contention.set_defaults(handler=run_contention)
+
+    files = subparsers.add_parser('files',
+                                  help='Работа с тысячами небольших файлов')
+    files.add_argument('--mode', choices=['per-file', 'toolkit'], nargs='+',
+                       default=['per-file', 'toolkit'])
+    files.add_argument('--files', type=int, nargs='+', default=[1000, 5000])
+    files.add_argument('--lines', type=int, default=10)
+    files.set_defaults(handler=run_files)
+
+    http = subparsers.add_parser('http',
+                                 help='HTTP-запросы в секунду с пулом '
+                                      'соединений и без него')
+    http.add_argument('--mode', choices=['pooled', 'unpooled'], nargs='+',
+                      default=['pooled', 'unpooled'])
+    http.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    http.add_argument('--jobs', type=int, default=20)
+    http.add_argument('--requests', type=int, default=50)
+    http.set_defaults(handler=run_http)
+
+    broker = subparsers.add_parser('broker',
+                                   help='Задачи в секунду на рабочих '
+                                        'процессах брокера')
+    broker.add_argument('--workers', type=int, nargs='+',
+                        default=[1, 2, 4])
+    broker.add_argument('--jobs', type=int, default=200)
+    broker.add_argument('--iterations', type=int, default=200_000)
+    broker.set_defaults(handler=run_broker)
+
+    dataflow = subparsers.add_parser('dataflow',
+                                     help='Передача большого результата '
+                                          'зависимым задачам в процессах')
+    dataflow.add_argument('--mode', nargs='+', choices=('shared', 'pickle'),
+                          default=['pickle', 'shared'])
+    dataflow.add_argument('--megabytes', type=int, default=64)
+    dataflow.add_argument('--consumers', type=int, default=4)
+    dataflow.set_defaults(handler=run_dataflow)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import secrets
+import threading
+from collections import deque
+from concurrent.futures import Future
+from itertools import count
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import (Client,
+                                        Connection,
+                                        Listener)
+from typing import (Optional,
+                    Union)
+
+from executors import ProcessExecutor
+from job import (Job,
+                 JobStatus)
+from utils import target_reference
+from custom_logger import logger
+
+Address = Union[tuple[str, int], str]
+
+
+def parse_address(text: str) -> Address:
+    """
+    Разбирает адрес брокера из командной строки.
+
+    Args:
+        text (str): 'хост:порт' для TCP или путь к Unix-сокету.
+
+    Returns:
+        Address: Адрес для multiprocessing.connection.
+    """
+    host, separator, port = text.rpartition(':')
+    if separator and port.isdigit():
+        return host, int(port)
+    return text
+
+
+class BrokerExecutor(ProcessExecutor):
+    """
+    Исполнитель, раздающий задачи рабочим процессам по сети.
+
+    Планировщик, использующий этот исполнитель, остаётся координатором:
+    он хранит граф зависимостей и решает, какие задачи готовы. Брокер
+    принимает подключения рабочих (worker.py) по TCP или через
+    Unix-сокет и отдаёт каждому не больше задач, чем тот запросил.
+    Рабочий сообщает о свободных местах при подключении и освобождает
+    место каждым отчётом о выполненной задаче. Задачи рабочего,
+    соединение с которым оборвалось, возвращаются в начало очереди
+    и достаются другим рабочим.
+
+    Как и в ProcessExecutor, задача передаётся импортируемой целью
+    с аргументами и выполняется рабочим целиком.
+
+    Сообщения соединения десериализуются через pickle, поэтому любой,
+    кто знает ключ, может выполнить код на брокере и рабочих. Если ключ
+    не передан, брокер создаёт случайный; его нужно передать рабочим
+    в переменной окружения SCHEDULER_AUTHKEY.
+
+    Атрибуты:
+        address (Address): Адрес, на котором брокер принимает рабочих.
+        authkey (bytes): Ключ, которым рабочие подтверждают подключение.
+        capacity (int): Сколько задач планировщик передаёт брокеру
+        одновременно.
+    """
+
+    def __init__(self,
+                 address: Address = ('127.0.0.1', 0),
+                 authkey: Optional[bytes] = None,
+                 capacity: int = 100) -> None:
+        self.capacity = capacity
+        # Случайный ключ - hex-строка, чтобы его можно было передать
+        # рабочим (worker.py) в переменной SCHEDULER_AUTHKEY.
+        self.authkey: bytes = authkey or secrets.token_hex(32).encode()
+        self._listener = Listener(address, authkey=self.authkey)
+        self.address: Address = self._listener.address
+        self._lock = threading.Lock()
+        self._closed = False
+        # Каждая отправка задачи получает свой номер: брошенная
+        # планировщиком и перезапущенная задача не спутается с прежней.
+        self._keys = count()
+        # Задачи, ещё не отданные рабочим: (номер, описание задачи).
+        self._pending: deque[tuple[int, tuple]] = deque()
+        self._futures: dict[int, Future] = {}
+        # Свободные места и выполняемые задачи каждого рабочего.
+        self._credits: dict[Connection, int] = {}
+        self._assigned: dict[Connection, dict[int, tuple]] = {}
+        threading.Thread(target=self.__accept, name='broker',
+                         daemon=True).start()
+        logger.info('Брокер ожидает рабочих по адресу %s', self.address)
+
+    def submit(self, task: Job) -> Future:
+        """
+        Ставит задачу в очередь брокера.
+
+        Args:
+            task (Job): Задача с импортируемой целью.
+
+        Returns:
+            Future: Накопленное время выполнения задачи и её результат.
+        """
+        future: Future = Future()
+        try:
+            target = target_reference(task.target)
+        except ValueError as e:
+            future.set_exception(e)
+            return future
+
+        task.status = JobStatus.STARTED
+        # Рабочие могут быть на других машинах, поэтому результаты
+        # передаются через соединение, а не через общую память.
+        spec = (target, task.args, dict(task.kwargs), task.max_running_time,
+                task.running_time, task.inputs, None)
+        with self._lock:
+            key = next(self._keys)
+            self._futures[key] = future
+            self._pending.append((key, spec))
+            self.__dispatch()
+        return future
+
+    def workers(self) -> int:
+        """
+        Возвращает количество подключённых рабочих.
+        """
+        with self._lock:
+            return len(self._credits)
+
+    def shutdown(self) -> None:
+        """
+        Останавливает рабочих и перестаёт принимать подключения.
+        """
+        with self._lock:
+            self._closed = True
+            connections = list(self._credits)
+        for connection in connections:
+            try:
+                connection.send(('stop',))
+            except OSError:
+                pass
+        # Будим поток, ожидающий подключения в accept().
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+        self._listener.close()
+
+    def __accept(self) -> None:
+        while True:
+            try:
+                connection = self._listener.accept()
+            except AuthenticationError:
+                logger.warning('Отклонено подключение с неверным ключом.')
+                continue
+            except OSError:
+                if self._closed:
+                    return
+                logger.error('Не удалось принять подключение рабочего.')
+                continue
+            if self._closed:
+                connection.close()
+                return
+            threading.Thread(target=self.__serve, args=(connection,),
+                             name='broker-worker', daemon=True).start()
+
+    def __serve(self, connection: Connection) -> None:
+        """
+        Принимает сообщения одного рабочего, пока соединение не закроется.
+        """
+        with self._lock:
+            self._credits[connection] = 0
+            self._assigned[connection] = {}
+        logger.info('Рабочий подключился к брокеру')
+        try:
+            while True:
+                message = connection.recv()
+                with self._lock:
+                    self.__handle(connection, message)
+        except (EOFError, OSError):
+            pass
+        finally:
+            connection.close()
+            with self._lock:
+                self.__forget(connection)
+
+    def __handle(self, connection: Connection, message: tuple) -> None:
+        """
+        Обрабатывает сообщение рабочего: ('ready', мест),
+        ('done', номер, (время выполнения, результат))
+        или ('error', номер, исключение).
+        """
+        kind = message[0]
+        if kind != 'ready':
+            _, key, result = message
+            self._assigned[connection].pop(key, None)
+            future = self._futures.pop(key, None)
+            if future is not None and not future.done():
+                if kind == 'done':
+                    future.set_result(result)
+                else:
+                    future.set_exception(result)
+        self._credits[connection] += 1 if kind != 'ready' else message[1]
+        self.__dispatch()
+
+    def __forget(self, connection: Connection) -> None:
+        """
+        Убирает отключившегося рабочего и возвращает его задачи в очередь.
+        """
+        self._credits.pop(connection, None)
+        lost = self._assigned.pop(connection, {})
+        if lost and not self._closed:
+            logger.warning('Рабочий отключился, задачи %s возвращены '
+                           'в очередь.', list(lost))
+            self._pending.extendleft(reversed(lost.items()))
+            self.__dispatch()
+
+    def __dispatch(self) -> None:
+        """
+        Отдаёт задачи из очереди рабочим со свободными местами.
+        Вызывается под блокировкой.
+        """
+        for connection, credits in self._credits.items():
+            while credits and self._pending:
+                key, spec = self._pending.popleft()
+                future = self._futures.get(key)
+                # Задачу, брошенную планировщиком, выполнять не нужно.
+                if future is None or not (
+                    future.running() or future.set_running_or_notify_cancel()
+                ):
+                    self._futures.pop(key, None)
+                    continue
+                try:
+                    connection.send(('job', key, spec))
+                except OSError:
+                    # Соединение уже закрыто, задачу получит другой рабочий.
+                    self._pending.appendleft((key, spec))
+                    break
+                self._assigned[connection][key] = spec
+                credits -= 1
+            self._credits[connection] = credits
@@ -0,0 +1,159 @@
+import hashlib
+import pickle
+import shelve
+import time
+from collections import OrderedDict
+from typing import (Any,
+                    Optional)
+
+from custom_logger import logger
+from job import Job
+from utils import target_reference
+
+
+def cache_key(task: Job) -> Optional[str]:
+    """
+    Возвращает ключ кэша задачи: ссылку на цель и хэш аргументов
+    и результатов зависимостей.
+
+    Порядок элементов set и frozenset зависит от рандомизации хэшей
+    и различается между процессами, поэтому перед хэшированием
+    их элементы сортируются. Это делается внутри кортежей, списков
+    и словарей, но не внутри атрибутов произвольных объектов.
+
+    Args:
+        task (Job): Задача.
+
+    Returns:
+        str | None: Ключ или None, если цель нельзя импортировать
+        по имени или аргументы не сериализуются.
+    """
+    try:
+        reference = target_reference(task.target)
+        arguments = _canonical_dumps(
+            (task.args, task.inputs, sorted(task.kwargs.items())))
+    except (ValueError, TypeError, AttributeError, pickle.PicklingError):
+        return None
+    return f'{reference}:{hashlib.sha256(arguments).hexdigest()}'
+
+
+class _SortedSet(tuple):
+    """
+    Множество с отсортированными элементами; тип отличает его
+    от обычного кортежа с теми же элементами.
+    """
+
+
+def _canonical_dumps(obj: Any) -> bytes:
+    return pickle.dumps(_canonical(obj), protocol=4)
+
+
+def _canonical(obj: Any) -> Any:
+    """Заменяет множества кортежами элементов в детерминированном порядке."""
+    if type(obj) in (set, frozenset):
+        items = sorted(map(_canonical, obj), key=_canonical_dumps)
+        return _SortedSet((type(obj).__name__, *items))
+    if type(obj) in (tuple, list):
+        return type(obj)(map(_canonical, obj))
+    if type(obj) is dict:
+        return {key: _canonical(value) for key, value in obj.items()}
+    return obj
+
+
+class ResultCache:
+    """
+    Кэш результатов задач с вытеснением давно не использованных
+    записей (LRU) и сроком жизни записей.
+
+    Атрибуты:
+        max_entries (int): Максимальное количество записей.
+        ttl (float, optional): Срок жизни записи в секундах;
+        None - записи не устаревают.
+        path (str, optional): Файл, в котором кэш хранится между
+        запусками; None - кэш только в памяти.
+        hits (int): Количество попаданий.
+        misses (int): Количество промахов.
+    """
+
+    def __init__(self,
+                 max_entries: int = 1024,
+                 ttl: Optional[float] = None,
+                 path: Optional[str] = None) -> None:
+        self.max_entries: int = max_entries
+        self.ttl: Optional[float] = ttl
+        self.path: Optional[str] = path
+        self.hits: int = 0
+        self.misses: int = 0
+        # Ключ -> (время устаревания по time.time() или None, результат).
+        self._entries: OrderedDict[str, tuple[Optional[float], Any]] = (
+            OrderedDict()
+        )
+        self._shelf: Optional[shelve.Shelf] = None
+        if path is not None:
+            self._shelf = shelve.open(path)
+            now = time.time()
+            for key, entry in self._shelf.items():
+                if entry[0] is None or entry[0] > now:
+                    self._entries[key] = entry
+                else:
+                    del self._shelf[key]
+            self.__evict()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        Ищет результат в кэше.
+
+        Args:
+            key (str): Ключ из cache_key.
+
+        Returns:
+            tuple[bool, Any]: Найден ли результат и сам результат.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is not None and (
+                entry[0] <= time.time()):
+            self.__delete(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Сохраняет результат, вытесняя самые давно использованные записи.
+
+        Результат, который нельзя сохранить в файл кэша, не сохраняется.
+        """
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        if self._shelf is not None:
+            try:
+                self._shelf[key] = (expires, value)
+            except (TypeError, AttributeError, pickle.PicklingError) as e:
+                logger.warning('Результат не сохранён в кэш: %s', e)
+                return
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        self.__evict()
+
+    def close(self) -> None:
+        """
+        Закрывает файл кэша.
+        """
+        if self._shelf is not None:
+            self._shelf.close()
+            self._shelf = None
+
+    def __evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self.__delete(next(iter(self._entries)))
+
+    def __delete(self, key: str) -> None:
+        del self._entries[key]
+        if self._shelf is not None:
+            del self._shelf[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,10 +1,138 @@
+import atexit
 import logging
+import os
+import queue
+import time
+from logging.handlers import (QueueHandler,
+                              QueueListener)
+from typing import (Optional,
+                    Union)
 
-# Здесь задана глобальная конфигурация для всех логгеров
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename='program.log',
-    format='%(asctime)s, %(levelname)s, %(message)s'
-)
+LOG_FORMAT = '%(asctime)s, %(levelname)s, %(message)s'
+
+_listener: Optional[QueueListener] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничивает количество однотипных сообщений.
+
+    Сообщения с одинаковым шаблоном (например, «задача отложена»)
+    пропускаются не чаще `burst` раз за `interval` секунд. Количество
+    отброшенных сообщений дописывается к следующему пропущенному.
+    Сообщения уровня WARNING и выше не ограничиваются.
+
+    Атрибуты:
+        interval (float): Длина окна в секундах.
+        burst (int): Количество сообщений одного шаблона в окне.
+    """
+
+    def __init__(self, interval: float = 1.0, burst: int = 10) -> None:
+        super().__init__()
+        self.interval: float = interval
+        self.burst: int = burst
+        # Шаблон -> [начало окна, пропущено в окне, отброшено].
+        self._windows: dict[str, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        window = self._windows.get(record.msg)
+        if window is None or now - window[0] >= self.interval:
+            dropped = window[2] if window else 0
+            self._windows[record.msg] = [now, 1, 0]
+            if dropped:
+                record.msg = f'{record.msg} (пропущено похожих: {dropped})'
+            return True
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Передаёт записи в очередь без форматирования.
+
+    Стандартный QueueHandler форматирует сообщение в вызывающем потоке.
+    Записи не покидают процесс, поэтому форматирование можно отложить
+    до фонового потока, который пишет их в файл.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: Union[int, str] = logging.DEBUG,
+                  filename: str = 'program.log',
+                  queued: bool = False,
+                  rate_limit: Optional[RateLimitFilter] = None,
+                  force: bool = True) -> None:
+    """
+    Настраивает глобальное журналирование для всех логгеров.
+
+    В режиме `queued` записи передаются через очередь фоновому потоку,
+    который пишет их в файл, и поток планировщика не ждёт диска.
+
+    Args:
+        level (int | str): Минимальный уровень сообщений.
+        filename (str): Файл журнала.
+        queued (bool): Писать журнал в фоновом потоке.
+        rate_limit (RateLimitFilter, optional): Ограничитель однотипных
+        сообщений.
+        force (bool): Заменить уже настроенные обработчики. Если False
+        и обработчики уже есть, настройка не меняется.
+    """
+    global _listener
+
+    root = logging.getLogger()
+    if root.handlers and not force:
+        return
+
+    stop_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler: logging.Handler = file_handler
+    if queued:
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(records)
+        _listener = QueueListener(records, file_handler)
+        _listener.start()
+    if rate_limit is not None:
+        handler.addFilter(rate_limit)
+
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def stop_logging() -> None:
+    """
+    Останавливает фоновый поток журнала, дописав все накопленные записи.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+# Здесь задана глобальная конфигурация для всех логгеров. Уровень, режим
+# записи и ограничение однотипных сообщений можно включить переменными
+# окружения или вызовом setup_logging. По умолчанию пишутся все сообщения.
+setup_logging(level=os.environ.get('SCHEDULER_LOG_LEVEL', 'DEBUG'),
+              queued=os.environ.get('SCHEDULER_LOG_QUEUE') == '1',
+              rate_limit=(RateLimitFilter()
+                          if os.environ.get('SCHEDULER_LOG_SAMPLE') == '1'
+                          else None),
+              force=False)
 
 logger = logging.getLogger(__name__)
@@ -0,0 +1,81 @@
+from typing import (Container,
+                    Iterable)
+from uuid import UUID
+
+from job import Job
+from exceptions import DependencyGraphError
+
+
+def validate_graph(tasks: Iterable[Job],
+                   known: Container[UUID] = ()) -> list[Job]:
+    """
+    Проверяет граф зависимостей и упорядочивает задачи топологически.
+
+    Проверка проходит каждую задачу и каждую зависимость один раз
+    (алгоритм Кана), поэтому занимает время O(задач + зависимостей).
+
+    Args:
+        tasks (Iterable[Job]): Добавляемые задачи.
+        known (Container[UUID]): Задачи, которые уже находятся
+        в планировщике или завершены; зависимости от них допустимы.
+
+    Returns:
+        list[Job]: Задачи в порядке, в котором каждая идёт после
+        всех своих зависимостей из `tasks`.
+
+    Raises:
+        DependencyGraphError: Если задача зависит от отсутствующей задачи
+        или зависимости образуют цикл.
+    """
+    nodes = {task.id: task for task in tasks}
+    indegree = dict.fromkeys(nodes, 0)
+    dependents: dict[UUID, list[UUID]] = {}
+
+    for task in nodes.values():
+        for dependency in task.dependencies:
+            if dependency in nodes:
+                indegree[task.id] += 1
+                dependents.setdefault(dependency, []).append(task.id)
+            elif dependency not in known:
+                raise DependencyGraphError(
+                    f'Задача {task.id} зависит от задачи {dependency}, '
+                    'которая не была добавлена в планировщик.'
+                )
+
+    order = [nodes[node] for node, degree in indegree.items() if not degree]
+    for task in order:
+        for dependent in dependents.get(task.id, ()):
+            indegree[dependent] -= 1
+            if not indegree[dependent]:
+                order.append(nodes[dependent])
+
+    if len(order) < len(nodes):
+        cycle = [node for node, degree in indegree.items() if degree]
+        raise DependencyGraphError(
+            f'Зависимости задач образуют цикл: {", ".join(map(str, cycle))}.'
+        )
+    return order
+
+
+def critical_path(order: list[Job]) -> dict[UUID, int]:
+    """
+    Вычисляет для каждой задачи длину самого длинного пути до конца графа.
+
+    Задача с наибольшей длиной лежит на критическом пути: задержка её
+    запуска увеличивает время выполнения всего графа.
+
+    Args:
+        order (list[Job]): Задачи в топологическом порядке,
+        например результат validate_graph.
+
+    Returns:
+        dict[UUID, int]: Количество задач в самой длинной цепочке,
+        которая начинается с задачи.
+    """
+    lengths = {task.id: 1 for task in order}
+    for task in reversed(order):
+        for dependency in task.dependencies:
+            if dependency in lengths:
+                lengths[dependency] = max(lengths[dependency],
+                                          lengths[task.id] + 1)
+    return lengths
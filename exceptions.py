@@ -9,3 +9,10 @@ class QueueFullOfElems(Exception):
     Сообщает о том, в очередь больше нельзя положить задачи для одновременного
     исполнения.
     """
+
+
+class DependencyGraphError(Exception):
+    """
+    Сообщает о том, что граф зависимостей задач содержит цикл
+    или ссылается на задачи, которые не были добавлены в планировщик.
+    """
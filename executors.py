@@ -0,0 +1,445 @@
+import queue
+import threading
+import time
+from concurrent.futures import (Future,
+                                ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from typing import (Any,
+                    NamedTuple,
+                    Optional,
+                    Union)
+
+from job import (Job,
+                 JobStatus)
+from results import (SHARED_THRESHOLD,
+                     share)
+from utils import (charge_running_time,
+                   import_target,
+                   target_reference)
+
+
+class StepOutcome(NamedTuple):
+    """
+    Итог шага, выполненного в фоновом потоке run_step_abandonable.
+
+    Атрибуты:
+        exhausted (bool): Исчерпан ли генератор задачи.
+        value (Any): Значение, отданное через yield, или результат
+        исчерпанного генератора.
+        elapsed (float): Длительность шага в секундах.
+    """
+
+    exhausted: bool
+    value: Any
+    elapsed: float
+
+
+def run_step(task: Job) -> bool:
+    """
+    Выполняет один шаг задачи. Значение, которое вернул исчерпанный
+    генератор, сохраняется в task.result.
+
+    Args:
+        task (Job): Задача, шаг которой нужно выполнить.
+
+    Returns:
+        bool: True, если генератор задачи исчерпан, иначе False.
+    """
+    try:
+        task.run()
+    except StopIteration as stop:
+        task.result = stop.value
+        return True
+    return False
+
+
+class StepThreads:
+    """
+    Фоновые потоки для шагов с ограничением по времени.
+
+    Потоки переиспользуются: освободившийся поток берёт следующий шаг.
+    Новый поток создаётся, только если свободных нет, например когда
+    поток занят зависшим шагом, брошенным планировщиком. Потоки - демоны,
+    поэтому зависший шаг не задерживает завершение программы.
+    """
+
+    def __init__(self) -> None:
+        self._steps: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        # Свободные потоки, за которыми ещё не закреплён шаг из очереди.
+        self._idle = 0
+
+    def submit(self, coroutine) -> Future:
+        """
+        Выполняет один шаг корутины в свободном фоновом потоке.
+
+        Args:
+            coroutine (Generator): Корутина задачи.
+
+        Returns:
+            Future: StepOutcome шага.
+        """
+        future: Future = Future()
+        self._steps.put((future, coroutine))
+        with self._lock:
+            start = not self._idle
+            if not start:
+                self._idle -= 1
+        if start:
+            threading.Thread(target=self.__work, name='step',
+                             daemon=True).start()
+        return future
+
+    def __work(self) -> None:
+        while True:
+            future, coroutine = self._steps.get()
+            if future.set_running_or_notify_cancel():
+                _send(future, coroutine)
+            with self._lock:
+                self._idle += 1
+
+
+def _send(future: Future, coroutine) -> None:
+    started = time.perf_counter()
+    try:
+        value = coroutine.send(None)
+    except StopIteration as stop:
+        outcome = StepOutcome(True, stop.value, 0.0)
+    except BaseException as e:
+        future.set_exception(e)
+        return
+    else:
+        outcome = StepOutcome(False, value, time.perf_counter() - started)
+    future.set_result(outcome)
+
+
+_step_threads = StepThreads()
+
+
+def run_step_abandonable(task: Job) -> Future:
+    """
+    Выполняет шаг задачи в фоновом потоке StepThreads.
+
+    Шаг с ограничением по времени может зависнуть. Такой шаг планировщик
+    бросает, а фоновый поток не мешает ни другим задачам,
+    ни завершению программы.
+
+    Поток работает только с корутиной задачи и не меняет саму задачу:
+    итог шага переносит в задачу complete_step() в потоке планировщика.
+    Поэтому брошенный шаг, закончившись уже после перезапуска задачи,
+    не влияет на её новую попытку.
+
+    Args:
+        task (Job): Задача, шаг которой нужно выполнить.
+
+    Returns:
+        Future: StepOutcome шага.
+    """
+    coroutine = task.coroutine
+    task.status = JobStatus.STARTED
+    return _step_threads.submit(coroutine)
+
+
+def complete_step(task: Job, outcome: StepOutcome) -> bool:
+    """
+    Переносит в задачу итог шага, выполненного run_step_abandonable.
+
+    Args:
+        task (Job): Задача, шаг которой завершился.
+        outcome (StepOutcome): Итог шага.
+
+    Returns:
+        bool: True, если генератор задачи исчерпан, иначе False.
+
+    Raises:
+        TaskTimeLimitError: Если задача превысила max_running_time.
+    """
+    if outcome.exhausted:
+        task.result = outcome.value
+        return True
+    value = outcome.value
+    task.awaiting = value if isinstance(value, Future) else None
+    if task.max_running_time:
+        charge_running_time(task, outcome.elapsed)
+    return False
+
+
+def run_job_in_process(target: str,
+                       args: tuple,
+                       kwargs: dict,
+                       max_running_time: Optional[float],
+                       running_time: float,
+                       inputs: tuple = (),
+                       threshold: Optional[int] = SHARED_THRESHOLD
+                       ) -> tuple[float, object]:
+    """
+    Восстанавливает задачу в рабочем процессе и выполняет её до конца.
+
+    Args:
+        target (str): Ссылка на цель задачи в формате 'модуль:имя'.
+        args (tuple): Аргументы цели.
+        kwargs (dict): Именованные аргументы цели.
+        max_running_time (float, optional): Ограничение времени выполнения.
+        running_time (float): Уже накопленное время выполнения.
+        inputs (tuple): Результаты зависимостей задачи.
+        threshold (int, optional): Начиная с какого размера буфер-результат
+        возвращается через общую память; None - всегда через pickle.
+
+    Returns:
+        tuple[float, object]: Накопленное время выполнения задачи и её
+        результат.
+    """
+    task = Job(target=import_target(target),
+               args=args,
+               kwargs=kwargs,
+               max_running_time=max_running_time,
+               running_time=running_time)
+    task.inputs = inputs
+    while not run_step(task):
+        pass
+    if threshold is None:
+        return task.running_time, task.result
+    return task.running_time, share(task.result, threshold)
+
+
+class BaseExecutor:
+    """
+    Базовый исполнитель шагов задач.
+
+    Атрибуты:
+        capacity (int): Количество шагов, выполняемых одновременно.
+    """
+
+    capacity = 1
+
+    @staticmethod
+    def time_budget(task: Job) -> Optional[float]:
+        """
+        Возвращает, сколько секунд может длиться отправленный шаг задачи,
+        или None, если ограничения нет.
+
+        Args:
+            task (Job): Задача.
+        """
+        return task.time_budget()
+
+    def submit(self, task: Job) -> Future:
+        """
+        Запускает очередной шаг задачи.
+
+        Args:
+            task (Job): Задача, шаг которой нужно выполнить.
+
+        Returns:
+            Future: Результат шага.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def complete(task: Job, future: Future) -> bool:
+        """
+        Возвращает результат шага задачи. Итог шага, выполненного
+        в фоновом потоке, сначала переносится в задачу.
+
+        Args:
+            task (Job): Задача, шаг которой завершился.
+            future (Future): Результат шага.
+
+        Returns:
+            bool: True, если задача выполнена полностью.
+        """
+        outcome = future.result()
+        if isinstance(outcome, StepOutcome):
+            return complete_step(task, outcome)
+        return outcome
+
+    def abandon(self, future: Future) -> bool:
+        """
+        Бросает шаг, превысивший отведённое время. Результат брошенного
+        шага планировщик не забирает.
+
+        Args:
+            future (Future): Результат шага.
+
+        Returns:
+            bool: True, если брошенный шаг до своего завершения
+            продолжает занимать место в исполнителе.
+        """
+        future.cancel()
+        return False
+
+    def shutdown(self) -> None:
+        """
+        Освобождает ресурсы исполнителя.
+        """
+
+
+class InlineExecutor(BaseExecutor):
+    """
+    Исполнитель, выполняющий шаги задач прямо в потоке планировщика.
+
+    Шаги задач с ограничением по времени выполняются в фоновом потоке,
+    чтобы планировщик мог бросить зависший шаг.
+    """
+
+    def submit(self, task: Job) -> Future:
+        """
+        Синхронно выполняет шаг задачи и возвращает завершённый Future.
+
+        Args:
+            task (Job): Задача, шаг которой нужно выполнить.
+
+        Returns:
+            Future: Результат шага или возникшее исключение.
+        """
+        if self.time_budget(task) is not None:
+            return run_step_abandonable(task)
+
+        future: Future = Future()
+        try:
+            future.set_result(run_step(task))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class ThreadExecutor(BaseExecutor):
+    """
+    Исполнитель, выполняющий шаги разных задач параллельно в пуле потоков.
+
+    Подходит для задач, шаги которых блокируются на вводе-выводе
+    или в time.sleep. Шаги задач с ограничением по времени выполняются
+    в фоновых потоках StepThreads, чтобы зависший шаг не занимал поток
+    пула и не задерживал завершение программы.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.capacity = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers,
+                                        thread_name_prefix='scheduler')
+
+    def submit(self, task: Job) -> Future:
+        """
+        Отправляет шаг задачи в пул потоков.
+
+        Args:
+            task (Job): Задача, шаг которой нужно выполнить.
+
+        Returns:
+            Future: Результат шага.
+        """
+        if self.time_budget(task) is not None:
+            return run_step_abandonable(task)
+        return self._pool.submit(run_step, task)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+class ProcessExecutor(BaseExecutor):
+    """
+    Исполнитель, выполняющий задачи целиком в пуле процессов.
+
+    Генераторы нельзя передать в другой процесс, поэтому задача
+    восстанавливается в рабочем процессе из импортируемой цели и
+    аргументов и выполняется там до конца. Подходит для задач,
+    нагружающих процессор. Ограничение по времени действует на задачу
+    целиком; задача, превысившая его, бросается, но рабочий процесс
+    досчитывает её до конца и до тех пор не принимает новые задачи.
+    Планировщик считает такое место занятым.
+
+    Результат-буфер не меньше `threshold` байт возвращается из рабочего
+    процесса через общую память и передаётся зависимым задачам без
+    копирования; None - все результаты передаются через pickle.
+    """
+
+    def __init__(self,
+                 workers: int,
+                 threshold: Optional[int] = SHARED_THRESHOLD) -> None:
+        self.capacity = workers
+        self.threshold = threshold
+        self._pool = ProcessPoolExecutor(max_workers=workers)
+
+    @staticmethod
+    def time_budget(task: Job) -> Optional[float]:
+        if not task.max_running_time:
+            return None
+        return max(task.max_running_time - task.running_time, 0)
+
+    def submit(self, task: Job) -> Future:
+        """
+        Отправляет задачу на выполнение в пул процессов.
+
+        Args:
+            task (Job): Задача с импортируемой целью.
+
+        Returns:
+            Future: Накопленное время выполнения задачи и её результат.
+        """
+        try:
+            target = target_reference(task.target)
+        except ValueError as e:
+            future: Future = Future()
+            future.set_exception(e)
+            return future
+
+        task.status = JobStatus.STARTED
+        return self._pool.submit(run_job_in_process, target, task.args,
+                                 dict(task.kwargs), task.max_running_time,
+                                 task.running_time, task.inputs,
+                                 self.threshold)
+
+    @staticmethod
+    def complete(task: Job, future: Future) -> bool:
+        """
+        Переносит время выполнения и результат из рабочего процесса
+        в задачу.
+
+        Args:
+            task (Job): Задача, выполнение которой завершилось.
+            future (Future): Результат выполнения задачи.
+
+        Returns:
+            bool: Всегда True - задача выполняется в процессе целиком.
+        """
+        task.running_time, task.result = future.result()
+        return True
+
+    def abandon(self, future: Future) -> bool:
+        # Рабочий процесс нельзя прервать: отменить можно только
+        # задачу, которая ещё ждёт свободного процесса.
+        return not future.cancel()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+def create_executor(kind: Union[str, BaseExecutor],
+                    workers: Optional[int],
+                    pool_size: int) -> BaseExecutor:
+    """
+    Создаёт исполнитель шагов по его названию.
+
+    Args:
+        kind (str | BaseExecutor): Название исполнителя: 'inline',
+        'thread' или 'process', либо уже созданный исполнитель, например
+        BrokerExecutor; такой исполнитель возвращается как есть.
+        workers (int, optional): Количество рабочих потоков или процессов;
+        по умолчанию равно pool_size.
+        pool_size (int): Размер пула планировщика.
+
+    Returns:
+        Исполнитель шагов задач.
+
+    Raises:
+        ValueError: Если исполнитель с таким названием не существует.
+    """
+    if isinstance(kind, BaseExecutor):
+        return kind
+    if kind == 'inline':
+        return InlineExecutor()
+    if kind == 'thread':
+        return ThreadExecutor(workers or pool_size)
+    if kind == 'process':
+        return ProcessExecutor(workers or pool_size)
+    raise ValueError(f'Неизвестный исполнитель: {kind}')
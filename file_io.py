@@ -0,0 +1,220 @@
+import mmap
+import os
+import shutil
+import threading
+from concurrent.futures import (Future,
+                                ThreadPoolExecutor)
+from contextlib import contextmanager
+from typing import (BinaryIO,
+                    Callable,
+                    Iterable,
+                    Iterator,
+                    Optional,
+                    Union)
+
+# Количество потоков пула ввода-вывода.
+IO_WORKERS = 8
+
+Data = Union[str, bytes]
+
+_pool: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def submit(func: Callable, *args, **kwargs) -> Future:
+    """
+    Выполняет блокирующую операцию с файловой системой в пуле потоков
+    ввода-вывода.
+
+    Задача планировщика может отдать полученный Future через yield:
+    планировщик вернётся к ней только после завершения операции
+    и не будет занимать исполнитель ожиданием.
+
+        future = file_io.submit(file_io.copy_file, 'a.txt', 'b.txt')
+        yield future
+        future.result()
+
+    Args:
+        func (Callable): Блокирующая функция.
+        *args: Аргументы функции.
+        **kwargs: Именованные аргументы функции.
+
+    Returns:
+        Future: Результат функции.
+    """
+    global _pool
+
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=IO_WORKERS,
+                                           thread_name_prefix='io')
+    return _pool.submit(func, *args, **kwargs)
+
+
+class WriteBatch:
+    """
+    Накапливает мелкие записи и дозаписи в файлы и выполняет их
+    одной записью на файл.
+
+    Вместо открытия файла на каждую запись файл открывается один раз
+    при flush(), а все его части записываются вместе в порядке
+    добавления.
+    """
+
+    def __init__(self) -> None:
+        # Путь -> [дописывать ли в существующий файл, части].
+        self._files: dict[str, list] = {}
+
+    def write(self, path: str, data: Data) -> None:
+        """
+        Перезаписывает файл: предыдущие части файла в пакете отбрасываются.
+        """
+        self._files[path] = [False, [data]]
+
+    def append(self, path: str, data: Data) -> None:
+        """
+        Дописывает данные в конец файла.
+        """
+        if path not in self._files:
+            self._files[path] = [True, []]
+        self._files[path][1].append(data)
+
+    def flush(self) -> int:
+        """
+        Записывает накопленные данные и очищает пакет.
+
+        Returns:
+            int: Количество записанных файлов.
+        """
+        files, self._files = self._files, {}
+        for path, (append, chunks) in files.items():
+            binary = bool(chunks) and isinstance(chunks[0], bytes)
+            mode = ('a' if append else 'w') + ('b' if binary else '')
+            with open(path, mode) as file:
+                file.write((b'' if binary else '').join(chunks))
+        return len(files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+@contextmanager
+def map_file(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Отображает файл в память только для чтения.
+
+    Данные читаются страницами по мере обращения и не копируются
+    в память процесса целиком.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Yields:
+        mmap.mmap | bytes: Содержимое файла; для пустого файла - b''.
+    """
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            yield b''
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def read_file(path: str) -> bytes:
+    """
+    Читает файл целиком одним вызовом read.
+
+    Результат - копия содержимого; чтобы обработать большой файл
+    без копирования, используйте map_file.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        bytes: Содержимое файла.
+    """
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def read_files(paths: Iterable[str]) -> list[bytes]:
+    """
+    Читает несколько файлов.
+
+    Args:
+        paths (Iterable[str]): Пути к файлам.
+
+    Returns:
+        list[bytes]: Содержимое файлов в том же порядке.
+    """
+    return [read_file(path) for path in paths]
+
+
+def copy_file(source: str, destination: str) -> int:
+    """
+    Копирует файл внутри ядра, не перенося данные в память процесса.
+
+    Используется os.copy_file_range (файловая система может сделать
+    копию без чтения данных), затем os.sendfile, а если ни один
+    не доступен - обычное копирование блоками. Как и shutil.copy,
+    переносит права доступа, но не время изменения и владельца.
+
+    Args:
+        source (str): Исходный файл.
+        destination (str): Файл назначения; перезаписывается.
+
+    Returns:
+        int: Количество скопированных байт.
+    """
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        copied = _copy_data(src, dst)
+    shutil.copymode(source, destination)
+    return copied
+
+
+def _copy_data(src: BinaryIO, dst: BinaryIO) -> int:
+    size = os.fstat(src.fileno()).st_size
+    for copy in (_copy_file_range, _sendfile):
+        try:
+            return copy(src.fileno(), dst.fileno(), size)
+        except (AttributeError, OSError):
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+    shutil.copyfileobj(src, dst)
+    return size
+
+
+def _copy_file_range(source: int, destination: int, size: int) -> int:
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(source, destination, size - copied)
+        if not sent:
+            break
+        copied += sent
+    return copied
+
+
+def _sendfile(source: int, destination: int, size: int) -> int:
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(destination, source, copied, size - copied)
+        if not sent:
+            break
+        copied += sent
+    return copied
+
+
+def remove_files(paths: Iterable[str]) -> None:
+    """
+    Удаляет файлы; отсутствующие файлы пропускаются.
+
+    Args:
+        paths (Iterable[str]): Пути к файлам.
+    """
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
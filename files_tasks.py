@@ -1,6 +1,11 @@
 import os
 import shutil
 
+from file_io import (WriteBatch,
+                     copy_file,
+                     read_files,
+                     remove_files,
+                     submit)
 from job import Job
 from scheduler import Scheduler
 
@@ -28,52 +33,58 @@ def task_3():
 
 def task_4():
     """Копирование файла"""
-    shutil.copy('file1.txt', 'file1_copy.txt')
-    yield
+    future = submit(copy_file, 'file1.txt', 'file1_copy.txt')
+    yield future
+    future.result()
 
 
 def task_5():
     """Перемещение файла"""
     os.makedirs('new_dir', exist_ok=True)
-    shutil.move('file1_copy.txt', 'new_dir/')
-    yield
+    future = submit(shutil.move, 'file1_copy.txt', 'new_dir/')
+    yield future
+    future.result()
 
 
 def task_6():
     """Удаление файла"""
-    os.remove('file1.txt')
-    yield
+    future = submit(remove_files, ['file1.txt'])
+    yield future
+    future.result()
 
 
 def task_7():
     """Создание множества файлов"""
+    batch = WriteBatch()
     for i in range(5):
-        with open(f'file_{i}.txt', 'w') as f:
-            f.write(f'This is file {i}')
-            yield
+        batch.write(f'file_{i}.txt', f'This is file {i}')
+    future = submit(batch.flush)
+    yield future
+    future.result()
 
 
 def task_8():
     """Чтение из множества файлов"""
-    for i in range(5):
-        with open(f'file_{i}.txt', 'r') as f:
-            f.read()
-            yield
+    future = submit(read_files, [f'file_{i}.txt' for i in range(5)])
+    yield future
+    future.result()
 
 
 def task_9():
     """Изменение данных в множестве файлов"""
+    batch = WriteBatch()
     for i in range(5):
-        with open(f'file_{i}.txt', 'a') as f:
-            f.write(f'\nAdded line to file {i}.')
-            yield
+        batch.append(f'file_{i}.txt', f'\nAdded line to file {i}.')
+    future = submit(batch.flush)
+    yield future
+    future.result()
 
 
 def task_10():
     """Удаление множества файлов"""
-    for i in range(5):
-        os.remove(f'file_{i}.txt')
-        yield
+    future = submit(remove_files, [f'file_{i}.txt' for i in range(5)])
+    yield future
+    future.result()
 
 
 def main():
@@ -81,32 +92,40 @@ def main():
                max_running_time=5)
     job2 = Job(target=task_2,
                max_running_time=5,
-               dependencies=[job1.id])
+               dependencies=[job1.id],
+               on_dependency_failure='skip')
     job3 = Job(target=task_3,
                max_running_time=5,
-               dependencies=[job1.id])
+               dependencies=[job1.id],
+               on_dependency_failure='skip')
     job4 = Job(target=task_4,
                max_running_time=5,
-               dependencies=[job1.id])
+               dependencies=[job1.id],
+               on_dependency_failure='skip')
     job5 = Job(target=task_5,
                max_running_time=5,
-               dependencies=[job4.id])
+               dependencies=[job4.id],
+               on_dependency_failure='skip')
     job6 = Job(target=task_6,
                max_running_time=0.1,
-               dependencies=[job1.id])
+               dependencies=[job1.id],
+               on_dependency_failure='skip')
     job7 = Job(target=task_7,
                max_running_time=10)
     job8 = Job(target=task_8,
                max_running_time=7,
-               dependencies=[job7.id])
+               dependencies=[job7.id],
+               on_dependency_failure='skip')
     job9 = Job(target=task_9,
                max_running_time=8,
-               dependencies=[job7.id])
+               dependencies=[job7.id],
+               on_dependency_failure='skip')
     job10 = Job(target=task_10,
                 max_running_time=0.1,
-                dependencies=[job7.id])
+                dependencies=[job7.id],
+                on_dependency_failure='skip')
 
-    scheduler = Scheduler(pool_size=10)
+    scheduler = Scheduler(pool_size=10, ordering='critical-path')
     tasks = (job1, job2, job3, job4, job5, job6, job7, job8, job9, job10)
 
     scheduler.process_all_tasks(tasks)
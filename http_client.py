@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Ошибки сети, после которых запрос имеет смысл повторить, например
+# RetryPolicy(retry_on=NETWORK_ERRORS).
+NETWORK_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def create_session(hosts: int = 10,
+                   connections_per_host: int = 10) -> requests.Session:
+    """
+    Создаёт сессию requests с пулом постоянных соединений.
+
+    Соединения к хосту переиспользуются между запросами (keep-alive),
+    поэтому повторные запросы не тратят время на установку TCP и TLS.
+
+    Args:
+        hosts (int): Для скольких хостов пул хранит соединения.
+        connections_per_host (int): Сколько соединений к одному хосту
+        открыто одновременно. Запрос, которому не хватило соединения,
+        ждёт, пока другой запрос вернёт своё соединение в пул.
+
+    Returns:
+        requests.Session: Сессия; её можно использовать из нескольких
+        потоков одновременно.
+    """
+    adapter = HTTPAdapter(pool_connections=hosts,
+                          pool_maxsize=connections_per_host,
+                          pool_block=True)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def configure(hosts: int = 10, connections_per_host: int = 10) -> None:
+    """
+    Пересоздаёт общую сессию с другими размерами пула.
+
+    Args:
+        hosts (int): Для скольких хостов пул хранит соединения.
+        connections_per_host (int): Ограничение соединений к одному хосту.
+    """
+    global _session
+
+    with _lock:
+        previous, _session = _session, create_session(hosts,
+                                                      connections_per_host)
+    if previous is not None:
+        previous.close()
+
+
+def session() -> requests.Session:
+    """
+    Возвращает общую для всех задач сессию с пулом соединений.
+
+    Returns:
+        requests.Session: Общая сессия; создаётся при первом обращении.
+    """
+    global _session
+
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close() -> None:
+    """
+    Закрывает общую сессию и все её соединения.
+    """
+    global _session
+
+    with _lock:
+        previous, _session = _session, None
+    if previous is not None:
+        previous.close()
+
+
+async def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Выполняет запрос через общую сессию, не блокируя цикл событий.
+
+    Запрос выполняется в пуле потоков asyncio, поэтому ограничения
+    пула соединений общие с синхронными задачами.
+
+    Args:
+        method (str): HTTP-метод.
+        url (str): Адрес.
+        **kwargs: Параметры requests.Session.request.
+
+    Returns:
+        requests.Response: Ответ сервера.
+    """
+    return await asyncio.to_thread(session().request, method, url, **kwargs)
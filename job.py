@@ -1,11 +1,19 @@
+import random
+from concurrent.futures import Future
+from types import MappingProxyType
 from typing import (Optional,
                     Callable)
 from enum import Enum
 from uuid import (UUID,
                   uuid4)
 
+from recurrence import Recurrence
+from results import resolve
 from utils import measure_execution_time
 
+# Общий неизменяемый словарь для задач без именованных аргументов.
+EMPTY_KWARGS = MappingProxyType({})
+
 
 class JobStatus(Enum):
     """
@@ -18,6 +26,8 @@ class JobStatus(Enum):
         POSTPONED: Задача отложена (обычно из-за невыполненных зависимостей).
         FAILED: Задача завершилась с ошибкой.
         FINISHED: Задача успешно выполнена.
+        SKIPPED: Задача не запускалась, потому что её зависимость
+        провалена или пропущена.
     """
 
     NOT_STARTED = 'NOT STARTED'
@@ -26,6 +36,67 @@ class JobStatus(Enum):
     POSTPONED = 'POSTPONED'
     FAILED = 'FAILED'
     FINISHED = 'FINISHED'
+    SKIPPED = 'SKIPPED'
+
+
+# Статусы, при которых результат задачи отсутствует.
+FAILED_STATUSES = (JobStatus.FAILED, JobStatus.SKIPPED)
+
+
+class RetryPolicy:
+    """
+    Политика повторного запуска задачи после ошибки.
+
+    Задержка перед n-м повтором равна `base * factor ** (n - 1)`,
+    но не больше `cap`, и случайно отклоняется на долю `jitter`, чтобы
+    повторы многих задач не совпадали по времени.
+
+    Атрибуты:
+        base (float): Задержка перед первым повтором в секундах;
+        0 означает повтор без задержки.
+        factor (float): Множитель задержки для каждого следующего повтора.
+        cap (float): Максимальная задержка в секундах.
+        jitter (float): Доля случайного отклонения задержки, от 0 до 1.
+        retry_on (tuple[type[Exception]]): Ошибки, после которых задача
+        повторяется. При остальных ошибках задача сразу проваливается.
+    """
+
+    __slots__ = ('base', 'factor', 'cap', 'jitter', 'retry_on')
+
+    def __init__(self,
+                 base: float = 0.0,
+                 factor: float = 2.0,
+                 cap: float = 60.0,
+                 jitter: float = 0.1,
+                 retry_on: tuple[type[Exception], ...] = (Exception,)
+                 ) -> None:
+        self.base = base
+        self.factor = factor
+        self.cap = cap
+        self.jitter = jitter
+        self.retry_on = retry_on
+
+    def should_retry(self, error: Exception) -> bool:
+        return isinstance(error, self.retry_on)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Возвращает задержку перед повтором.
+
+        Args:
+            attempt (int): Номер повтора, начиная с 1.
+
+        Returns:
+            float: Задержка в секундах.
+        """
+        delay = min(self.cap, self.base * self.factor ** (attempt - 1))
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(delay, 0.0)
+
+
+# Политика по умолчанию: немедленный повтор после любой ошибки.
+DEFAULT_RETRY = RetryPolicy(jitter=0.0)
 
 
 class Job:
@@ -35,6 +106,9 @@ class Job:
 
     Атрибуты:
         id (UUID): Уникальный идентификатор задачи.
+        target (Callable): Функция-генератор, выполняющая задачу.
+        В AsyncScheduler также может быть `async def` функцией
+        или асинхронным генератором.
         args (tuple): Аргументы для целевого генератора.
         kwargs (dict): Именованные аргументы для целевого генератора.
         start_at (int, optional): Временная метка начала выполнения задачи.
@@ -42,20 +116,66 @@ class Job:
         running_time (int): Накопленное время выполнения задачи.
         max_running_time (int): Максимально допустимое время выполнения;
         None означает отсутствие ограничений.
+        step_timeout (float, optional): Максимальная длительность
+        одного шага; None означает отсутствие ограничений.
         restarts (int): Количество перезапусков задачи.
         max_restarts (int): Максимально допустимое количество перезапусков.
-        dependencies (list[UUID]): Список ID задач,
+        retry (RetryPolicy): Задержки между перезапусками и ошибки,
+        после которых задача перезапускается.
+        dependencies (tuple[UUID]): ID задач,
         от которых зависит данная задача.
         dependency_statuses (dict[UUID, JobStatus]): Статусы зависимых задач.
+        Создаётся при первом обращении.
+        resources (tuple[str]): Ресурсные теги задачи. Ограничения тегов
+        задаются планировщику параметром `limits`.
+        on_dependency_failure (str): Что делать, если зависимость провалена
+        или пропущена: 'run' - всё равно выполнить задачу, 'skip' -
+        пропустить её (SKIPPED), 'fail' - провалить её (FAILED).
+        unresolved (int): Количество незавершённых зависимостей задачи.
         status (JobStatus): Текущий статус задачи.
+        priority (int): Приоритет задачи; чем больше, тем раньше
+        задача выбирается из очереди планировщика.
         coroutine (Generator): Целевая корутина для выполнения задачи.
+        Создаётся вызовом target(*args, **kwargs) при первом обращении.
+        awaiting (Future, optional): Future, который задача отдала
+        через yield на последнем шаге. Планировщик продолжит задачу
+        только после его завершения.
+        pass_results (bool): Передавать ли задаче результаты зависимостей:
+        они добавляются к `args` в порядке `dependencies`. Результат
+        проваленной зависимости - None. Поддерживается только Scheduler.
+        inputs (tuple): Результаты зависимостей, переданные задаче.
+        result: Значение, которое вернул генератор задачи (return).
+        Большой буфер, возвращённый из рабочего процесса, передаётся
+        потребителям через общую память (SharedPayload) и освобождается
+        после завершения последнего из них.
+        cache (bool): Можно ли брать результат задачи из кэша результатов
+        планировщика. Подходит для идемпотентных задач с импортируемой
+        целью: задачи с той же целью и теми же аргументами считаются
+        одинаковыми. Поддерживается только Scheduler.
+        recurrence (Recurrence, optional): Расписание повторяющейся
+        задачи. Каждый запуск выполняется отдельной задачей, созданной
+        spawn(); сама задача завершается после последнего запуска.
+        Поддерживается только Scheduler.
 
     Методы:
         run(): Запускает или возобновляет выполнение корутины задачи.
+        time_budget(): Возвращает допустимую длительность следующего шага.
+        reset(): Сбрасывает корутину, чтобы запустить задачу заново.
+        spawn(): Создаёт очередной запуск повторяющейся задачи.
         pause(): Временно приостанавливает выполнение задачи.
         finish(): Отмечает задачу как завершённую.
     """
 
+    # Без __dict__ у каждого экземпляра задача в очереди занимает
+    # в несколько раз меньше памяти.
+    __slots__ = ('id', 'target', 'args', 'kwargs', 'start_at',
+                 'running_time', 'max_running_time', 'restarts',
+                 'max_restarts', 'dependencies', 'unresolved', 'status',
+                 'priority', 'step_timeout', 'retry',
+                 'on_dependency_failure', 'resources', 'recurrence',
+                 'pass_results', 'inputs', 'result', 'cache', 'awaiting',
+                 '_dependency_statuses', '_coroutine')
+
     def __init__(self,
                  target: Callable,
                  id: Optional[UUID] = None,
@@ -68,28 +188,89 @@ class Job:
                  max_restarts: int = 0,
                  dependencies: Optional[list[UUID]] = None,
                  dependency_statuses: Optional[dict[UUID, JobStatus]] = None,
-                 status: JobStatus = JobStatus.NOT_STARTED) -> None:
+                 status: JobStatus = JobStatus.NOT_STARTED,
+                 priority: int = 0,
+                 step_timeout: Optional[float] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 on_dependency_failure: str = 'run',
+                 resources: Optional[list[str]] = None,
+                 recurrence: Optional[Recurrence] = None,
+                 pass_results: bool = False,
+                 cache: bool = False) -> None:
 
         self.id = id or uuid4()
+        self.target = target
         self.args = args or ()
-        self.kwargs = kwargs or {}
+        self.kwargs = kwargs or EMPTY_KWARGS
         self.start_at = start_at
         self.running_time = running_time
         self.max_running_time = max_running_time
         self.restarts = restarts
         self.max_restarts = max_restarts
-        self.dependencies = dependencies or []
-        self.dependency_statuses = (
-            dependency_statuses or {dep: JobStatus.NOT_STARTED
-                                    for dep in self.dependencies}
-        )
+        self.dependencies = tuple(dependencies) if dependencies else ()
+        self.unresolved = 0
         self.status = status
-        self.coroutine = target(*self.args, **self.kwargs)
+        self.priority = priority
+        self.step_timeout = step_timeout
+        self.retry = retry or DEFAULT_RETRY
+        self.on_dependency_failure = on_dependency_failure
+        self.resources = tuple(resources) if resources else ()
+        self.recurrence = recurrence
+        self.pass_results = pass_results
+        self.inputs = ()
+        self.result = None
+        self.cache = cache
+        self._dependency_statuses = dependency_statuses
+        self.awaiting = None
+        self._coroutine = None
+
+    @property
+    def dependency_statuses(self) -> dict[UUID, JobStatus]:
+        if self._dependency_statuses is None:
+            self._dependency_statuses = {dep: JobStatus.NOT_STARTED
+                                         for dep in self.dependencies}
+        return self._dependency_statuses
+
+    @property
+    def coroutine(self):
+        if self._coroutine is None:
+            self._coroutine = self.target(*self.args,
+                                          *map(resolve, self.inputs),
+                                          **self.kwargs)
+        return self._coroutine
 
     @measure_execution_time
     def run(self):
         self.status = JobStatus.STARTED
-        self.coroutine.send(None)
+        value = self.coroutine.send(None)
+        self.awaiting = value if isinstance(value, Future) else None
+
+    def time_budget(self) -> Optional[float]:
+        budgets = []
+        if self.step_timeout:
+            budgets.append(self.step_timeout)
+        if self.max_running_time:
+            budgets.append(max(self.max_running_time - self.running_time, 0))
+        return min(budgets) if budgets else None
+
+    def reset(self):
+        self._coroutine = None
+        self.awaiting = None
+
+    def spawn(self) -> 'Job':
+        """
+        Создаёт очередной запуск повторяющейся задачи: новую задачу
+        с той же целью и ограничениями, но без зависимостей и расписания.
+        """
+        return Job(target=self.target,
+                   args=self.args,
+                   kwargs=self.kwargs,
+                   max_running_time=self.max_running_time,
+                   max_restarts=self.max_restarts,
+                   priority=self.priority,
+                   step_timeout=self.step_timeout,
+                   retry=self.retry,
+                   resources=self.resources)
 
     def pause(self):
         self.status = JobStatus.PAUSED
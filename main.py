@@ -70,10 +70,10 @@ def main():
     job7 = Job(target=task_7,
                max_running_time=3)
 
-    scheduler = Scheduler(pool_size=3)
     tasks = (job1, job2, job3, job4, job5, job6, job7)
 
-    scheduler.process_all_tasks(tasks)
+    with Scheduler(pool_size=3, executor='thread') as scheduler:
+        scheduler.process_all_tasks(tasks)
 
 
 if __name__ == '__main__':
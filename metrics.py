@@ -0,0 +1,270 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from http.server import (BaseHTTPRequestHandler,
+                         ThreadingHTTPServer)
+from typing import Callable
+from uuid import UUID
+
+from job import (Job,
+                 JobStatus)
+
+# Границы корзин гистограмм в секундах, как у клиентов Prometheus.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+
+def target_name(task: Job) -> str:
+    """
+    Возвращает имя цели задачи для меток метрик.
+
+    Args:
+        task (Job): Задача.
+
+    Returns:
+        str: Имя цели в формате 'модуль.имя' или имя её типа.
+    """
+    module = getattr(task.target, '__module__', None)
+    qualname = getattr(task.target, '__qualname__', None)
+    if isinstance(module, str) and isinstance(qualname, str):
+        return f'{module}.{qualname}'
+    return type(task.target).__name__
+
+
+class Histogram:
+    """
+    Гистограмма длительностей с фиксированными границами корзин.
+
+    Атрибуты:
+        count (int): Количество наблюдений.
+        sum (float): Сумма наблюдений.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.sum: float = 0.0
+        self._buckets: list[int] = [0] * len(BUCKETS)
+
+    def observe(self, value: float) -> None:
+        """
+        Добавляет наблюдение.
+
+        Args:
+            value (float): Длительность в секундах.
+        """
+        self.count += 1
+        self.sum += value
+        self._buckets[bisect_left(BUCKETS, value)] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает состояние гистограммы с накопительными корзинами.
+
+        Returns:
+            dict: Количество, сумма и корзины {граница: наблюдений <= границы}.
+        """
+        buckets = {}
+        total = 0
+        for bound, observed in zip(BUCKETS, self._buckets):
+            total += observed
+            buckets[bound] = total
+        return {'count': self.count, 'sum': self.sum, 'buckets': buckets}
+
+
+class SchedulerMetrics:
+    """
+    Метрики планировщика: длительность шагов по целям задач, ожидание
+    в очереди, ожидание зависимостей, перезапуски, завершённые задачи
+    и количество задач в каждом состоянии.
+
+    Все методы, кроме snapshot, вызываются из потока планировщика;
+    snapshot можно вызывать из любого потока.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._step_latency: dict[str, Histogram] = {}
+        self._queue_wait = Histogram()
+        self._dependency_wait = Histogram()
+        self._restarts = 0
+        self._completed = {JobStatus.FINISHED: 0, JobStatus.FAILED: 0,
+                           JobStatus.SKIPPED: 0}
+        # Момент, с которого задача находится в текущем состоянии.
+        self._blocked_since: dict[UUID, float] = {}
+        self._ready_since: dict[UUID, float] = {}
+        self._step_since: dict[UUID, float] = {}
+        # Количество задач в каждом состоянии на момент последней
+        # публикации из потока планировщика.
+        self._jobs: dict[str, int] = {}
+
+    def jobs_counted(self, jobs: dict[str, int]) -> None:
+        with self._lock:
+            self._jobs = jobs
+
+    def job_blocked(self, task: Job) -> None:
+        self._blocked_since[task.id] = time.monotonic()
+
+    def job_unblocked(self, task: Job) -> None:
+        since = self._blocked_since.pop(task.id, None)
+        if since is not None:
+            with self._lock:
+                self._dependency_wait.observe(time.monotonic() - since)
+
+    def job_ready(self, task: Job) -> None:
+        self._ready_since[task.id] = time.monotonic()
+
+    def step_started(self, task: Job) -> None:
+        now = time.monotonic()
+        since = self._ready_since.pop(task.id, None)
+        if since is not None:
+            with self._lock:
+                self._queue_wait.observe(now - since)
+        self._step_since[task.id] = now
+
+    def step_finished(self, task: Job) -> None:
+        since = self._step_since.pop(task.id, None)
+        if since is None:
+            return
+        name = target_name(task)
+        with self._lock:
+            if name not in self._step_latency:
+                self._step_latency[name] = Histogram()
+            self._step_latency[name].observe(time.monotonic() - since)
+
+    def job_restarted(self) -> None:
+        with self._lock:
+            self._restarts += 1
+
+    def job_completed(self, task: Job) -> None:
+        # Задача могла завершиться, так и не начав выполняться,
+        # например с результатом из кэша.
+        self._ready_since.pop(task.id, None)
+        with self._lock:
+            self._completed[task.status] = (
+                self._completed.get(task.status, 0) + 1
+            )
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает согласованный снимок всех метрик.
+
+        Returns:
+            dict: Снимок метрик.
+        """
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            completed = {status.value: count
+                         for status, count in self._completed.items()}
+            return {
+                'uptime': uptime,
+                'restarts': self._restarts,
+                'jobs_completed': completed,
+                'jobs_completed_per_second': (
+                    sum(completed.values()) / uptime if uptime else 0.0
+                ),
+                'step_latency': {name: histogram.snapshot()
+                                 for name, histogram
+                                 in self._step_latency.items()},
+                'queue_wait': self._queue_wait.snapshot(),
+                'dependency_wait': self._dependency_wait.snapshot(),
+                'jobs': dict(self._jobs),
+            }
+
+
+def _label(value: str) -> str:
+    return (str(value).replace('\\', '\\\\')
+            .replace('\n', '\\n').replace('"', '\\"'))
+
+
+def _histogram_lines(name: str, help_text: str, histograms: dict) -> list:
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for labels, histogram in histograms.items():
+        prefix = f'{labels},' if labels else ''
+        suffix = f'{{{labels}}}' if labels else ''
+        for bound, count in histogram['buckets'].items():
+            le = '+Inf' if bound == math.inf else repr(bound)
+            lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {count}')
+        lines.append(f'{name}_sum{suffix} {histogram["sum"]}')
+        lines.append(f'{name}_count{suffix} {histogram["count"]}')
+    return lines
+
+
+def to_prometheus(snapshot: dict) -> str:
+    """
+    Преобразует снимок метрик в текстовый формат Prometheus.
+
+    Args:
+        snapshot (dict): Снимок из Scheduler.metrics().
+
+    Returns:
+        str: Метрики в текстовом формате Prometheus.
+    """
+    lines = _histogram_lines(
+        'scheduler_step_duration_seconds', 'Длительность шага задачи.',
+        {f'target="{_label(name)}"': histogram
+         for name, histogram in snapshot['step_latency'].items()}
+    )
+    lines += _histogram_lines('scheduler_queue_wait_seconds',
+                              'Ожидание готовой задачи в очереди.',
+                              {'': snapshot['queue_wait']})
+    lines += _histogram_lines('scheduler_dependency_wait_seconds',
+                              'Ожидание завершения зависимостей.',
+                              {'': snapshot['dependency_wait']})
+    lines += ['# HELP scheduler_job_restarts_total Перезапуски задач.',
+              '# TYPE scheduler_job_restarts_total counter',
+              f'scheduler_job_restarts_total {snapshot["restarts"]}',
+              '# HELP scheduler_jobs_completed_total Завершённые задачи.',
+              '# TYPE scheduler_jobs_completed_total counter']
+    lines += [f'scheduler_jobs_completed_total{{status="{status}"}} {count}'
+              for status, count in snapshot['jobs_completed'].items()]
+    lines += ['# HELP scheduler_jobs_completed_per_second '
+              'Завершённых задач в секунду с момента запуска.',
+              '# TYPE scheduler_jobs_completed_per_second gauge',
+              'scheduler_jobs_completed_per_second '
+              f'{snapshot["jobs_completed_per_second"]}',
+              '# HELP scheduler_jobs Задачи в планировщике по состояниям.',
+              '# TYPE scheduler_jobs gauge']
+    lines += [f'scheduler_jobs{{state="{state}"}} {count}'
+              for state, count in snapshot.get('jobs', {}).items()]
+    return '\n'.join(lines) + '\n'
+
+
+def serve_metrics(snapshot: Callable[[], dict],
+                  port: int,
+                  host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Запускает в фоновом потоке HTTP-сервер, отдающий метрики
+    в формате Prometheus по адресу /metrics.
+
+    Args:
+        snapshot (Callable[[], dict]): Функция, возвращающая снимок метрик.
+        port (int): Порт; 0 - выбрать свободный.
+        host (str): Адрес, на котором принимаются подключения.
+
+    Returns:
+        ThreadingHTTPServer: Запущенный сервер; остановить его можно
+        методом shutdown().
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = to_prometheus(snapshot()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type',
+                             'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever,
+                     name='metrics', daemon=True).start()
+    return server
@@ -1,7 +1,11 @@
 import time
 import os
 
+from file_io import (WriteBatch,
+                     read_files,
+                     submit)
 from job import Job
+from resources import ResourceLimit
 from scheduler import Scheduler
 
 
@@ -10,31 +14,39 @@ def task_1():
     if not os.path.exists('test_dir'):
         os.makedirs('test_dir')
         yield
+    batch = WriteBatch()
     for i in range(1, 6):
-        with open(f'test_dir/test_file_{i}.txt', 'w') as f:
-            f.write(f"This is test file {i}.")
+        batch.write(f'test_dir/test_file_{i}.txt', f"This is test file {i}.")
+    future = submit(batch.flush)
+    yield future
+    for _ in range(future.result()):
         yield
         time.sleep(1)
 
 
 def task_2():
     """Чтение из файлов"""
-    for i in range(1, 4):
-        if os.path.exists(f'test_dir/test_file_{i}.txt'):
-            with open(f'test_dir/test_file_{i}.txt', 'r') as f:
-                f.read()
-            yield
-            time.sleep(1)
+    paths = [f'test_dir/test_file_{i}.txt' for i in range(1, 4)]
+    future = submit(read_files, [path for path in paths
+                                 if os.path.exists(path)])
+    yield future
+    for _ in future.result():
+        yield
+        time.sleep(1)
 
 
 def task_3():
     """Изменение содержимого файлов"""
+    batch = WriteBatch()
     for i in range(1, 6):
         if os.path.exists(f'test_dir/test_file_{i}.txt'):
-            with open(f'test_dir/test_file_{i}.txt', 'a') as f:
-                f.write(f"\nAppended text to file {i}.")
-            yield
-            time.sleep(1)
+            batch.append(f'test_dir/test_file_{i}.txt',
+                         f"\nAppended text to file {i}.")
+    future = submit(batch.flush)
+    yield future
+    for _ in range(future.result()):
+        yield
+        time.sleep(1)
 
 
 def task_4():
@@ -56,28 +68,37 @@ def task_5():
 
 def main():
     job1 = Job(target=task_1,
-               max_running_time=10)
+               max_running_time=10,
+               resources=['test_dir'])
 
     job2 = Job(target=task_2,
                max_running_time=6,
-               dependencies=[job1.id])
+               dependencies=[job1.id],
+               resources=['test_dir'])
 
     job3 = Job(target=task_3,
                max_running_time=10,
-               dependencies=[job1.id])
+               dependencies=[job1.id],
+               resources=['test_dir'])
 
     job4 = Job(target=task_4,
                max_running_time=4,
-               dependencies=[job3.id])
+               dependencies=[job3.id],
+               resources=['test_dir'])
 
     job5 = Job(target=task_5,
                max_running_time=3,
-               dependencies=[job4.id])
+               dependencies=[job4.id],
+               resources=['test_dir'])
 
-    scheduler = Scheduler(pool_size=3)
+    # С директорией одновременно работают не больше двух задач
+    scheduler = Scheduler(pool_size=3, executor='thread',
+                          ordering='critical-path',
+                          limits={'test_dir': ResourceLimit(concurrency=2)})
     tasks = (job1, job2, job3, job4, job5)
 
-    scheduler.process_all_tasks(tasks)
+    with scheduler:
+        scheduler.process_all_tasks(tasks)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+import os
+import pickle
+from typing import (BinaryIO,
+                    Iterable,
+                    Optional)
+from uuid import UUID
+
+from job import (Job,
+                 JobStatus)
+from utils import (import_target,
+                   target_reference)
+from custom_logger import logger
+
+# Параметры конструктора Job, которые сохраняются в журнале.
+SPEC_FIELDS = ('id', 'args', 'start_at', 'running_time', 'max_running_time',
+               'restarts', 'max_restarts', 'priority', 'step_timeout',
+               'retry', 'on_dependency_failure', 'resources', 'recurrence',
+               'pass_results', 'cache')
+
+TERMINAL_STATUSES = (JobStatus.FINISHED, JobStatus.FAILED,
+                     JobStatus.SKIPPED)
+
+
+def job_to_spec(task: Job) -> dict:
+    """
+    Описывает задачу словарём, из которого её можно восстановить
+    в другом процессе.
+
+    Args:
+        task (Job): Задача с импортируемой целью.
+
+    Returns:
+        dict: Описание задачи.
+
+    Raises:
+        ValueError: Если цель задачи нельзя импортировать по имени.
+    """
+    spec = {field: getattr(task, field) for field in SPEC_FIELDS}
+    spec['target'] = target_reference(task.target)
+    spec['kwargs'] = dict(task.kwargs)
+    spec['dependencies'] = list(task.dependencies)
+    return spec
+
+
+def required_statuses(
+    tasks: Iterable[Job],
+    completed: dict[UUID, JobStatus]
+) -> dict[UUID, JobStatus]:
+    """
+    Отбирает статусы завершённых задач, от которых зависят переданные задачи.
+
+    Args:
+        tasks (Iterable[Job]): Незавершённые задачи.
+        completed (dict[UUID, JobStatus]): Итоговые статусы
+        завершённых задач.
+
+    Returns:
+        dict[UUID, JobStatus]: Статусы, нужные для разрешения зависимостей.
+    """
+    statuses = {}
+    for task in tasks:
+        for dependency in task.dependencies:
+            # Планировщик хранит статусы лишь недавно завершённых задач,
+            # но ожидающая задача уже запомнила статусы своих зависимостей.
+            status = completed.get(dependency,
+                                   task.dependency_statuses.get(dependency))
+            if status in TERMINAL_STATUSES:
+                statuses[dependency] = status
+    return statuses
+
+
+def job_from_spec(spec: dict) -> Job:
+    """
+    Восстанавливает задачу из описания, полученного из job_to_spec.
+
+    Args:
+        spec (dict): Описание задачи.
+
+    Returns:
+        Job: Новая задача, которая начнёт выполнение с начала.
+    """
+    spec = dict(spec)
+    return Job(target=import_target(spec.pop('target')), **spec)
+
+
+class JobJournal:
+    """
+    Журнал переходов состояний задач, дописываемый в конец файла.
+
+    Каждая запись - отдельный pickle-объект: ('submit', описание задачи)
+    или ('status', ID, статус, перезапуски, время выполнения).
+    Восстановление проходит журнал один раз, поэтому занимает время,
+    пропорциональное количеству записанных изменений.
+
+    Атрибуты:
+        file (str): Путь к файлу журнала.
+    """
+
+    def __init__(self, file: str) -> None:
+        self.file: str = file
+        self._stream: Optional[BinaryIO] = None
+
+    def record_submit(self, task: Job) -> None:
+        """
+        Записывает добавление задачи в планировщик.
+
+        Args:
+            task (Job): Добавленная задача.
+
+        Raises:
+            ValueError: Если цель задачи нельзя импортировать по имени.
+        """
+        self.__append(('submit', job_to_spec(task)))
+
+    def record_status(self, task: Job) -> None:
+        """
+        Записывает изменение статуса и счётчиков задачи.
+
+        Args:
+            task (Job): Задача, состояние которой изменилось.
+        """
+        self.__append(('status', task.id, task.status.value,
+                       task.restarts, task.running_time))
+
+    def close(self) -> None:
+        """
+        Закрывает файл журнала. Следующая запись откроет его снова.
+        """
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def replay(self) -> tuple[list[Job], dict[UUID, JobStatus]]:
+        """
+        Восстанавливает состояние задач по журналу.
+
+        Обрезанная последняя запись (например, после аварийного завершения)
+        игнорируется.
+
+        Returns:
+            tuple[list[Job], dict[UUID, JobStatus]]: Незавершённые задачи
+            в порядке добавления и итоговые статусы завершённых задач.
+        """
+        specs: dict[UUID, dict] = {}
+        completed: dict[UUID, JobStatus] = {}
+
+        for record in self.__records():
+            if record[0] == 'submit':
+                specs[record[1]['id']] = record[1]
+                continue
+            _, task_id, status, restarts, running_time = record
+            status = JobStatus(status)
+            if status in TERMINAL_STATUSES:
+                specs.pop(task_id, None)
+                completed[task_id] = status
+            elif task_id in specs:
+                specs[task_id]['restarts'] = restarts
+                specs[task_id]['running_time'] = running_time
+
+        return [job_from_spec(spec) for spec in specs.values()], completed
+
+    def compact(self,
+                tasks: Iterable[Job],
+                completed: dict[UUID, JobStatus]) -> None:
+        """
+        Атомарно перезаписывает журнал, оставляя только переданные
+        статусы завершённых задач и незавершённые задачи.
+
+        Задачи, цель которых нельзя импортировать, не сохраняются.
+
+        Args:
+            tasks (Iterable[Job]): Незавершённые задачи.
+            completed (dict[UUID, JobStatus]): Итоговые статусы
+            завершённых задач.
+        """
+        self.close()
+        temporary = f'{self.file}.tmp'
+        with open(temporary, 'wb') as stream:
+            for task_id, status in completed.items():
+                pickle.dump(('status', task_id, status.value, 0, 0), stream,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            for task in tasks:
+                try:
+                    record = ('submit', job_to_spec(task))
+                except ValueError as e:
+                    logger.error('Задача %s не сохранена: %s', task.id, e)
+                    continue
+                pickle.dump(record, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.file)
+
+    def __append(self, record: tuple) -> None:
+        if self._stream is None:
+            self._stream = open(self.file, 'ab')
+        pickle.dump(record, self._stream, protocol=pickle.HIGHEST_PROTOCOL)
+        self._stream.flush()
+
+    def __records(self):
+        if not os.path.exists(self.file):
+            return
+        with open(self.file, 'rb') as stream:
+            while True:
+                try:
+                    yield pickle.load(stream)
+                except EOFError:
+                    return
+                except pickle.UnpicklingError:
+                    logger.error('Повреждённая запись в журнале %s '
+                                 'пропущена.', self.file)
+                    return
@@ -0,0 +1,196 @@
+import math
+from datetime import (datetime,
+                      timedelta)
+from typing import Optional
+
+OVERLAP_POLICIES = ('skip', 'queue', 'parallel')
+
+# Поля cron-выражения: (название, минимум, максимум).
+# Воскресенье в дне недели можно записать и как 0, и как 7.
+CRON_FIELDS = (('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31),
+               ('month', 1, 12), ('weekday', 0, 7))
+
+# Сколько лет вперёд ищется время, подходящее под cron-выражение.
+CRON_SEARCH_YEARS = 5
+
+
+class Interval:
+    """
+    Запуски через равные промежутки времени.
+
+    Атрибуты:
+        seconds (float): Промежуток между запусками.
+    """
+
+    __slots__ = ('seconds',)
+
+    def __init__(self, seconds: float) -> None:
+        if seconds <= 0:
+            raise ValueError('Промежуток между запусками должен быть '
+                             'больше нуля')
+        self.seconds = seconds
+
+    def first_fire(self, start: float) -> float:
+        return start
+
+    def next_fire(self, previous: float, now: float) -> float:
+        """
+        Возвращает время следующего запуска.
+
+        Запуски отсчитываются от предыдущего запланированного времени,
+        а не от момента, когда планировщик до него добрался, поэтому
+        расписание не смещается. Пропущенные запуски не наверстываются.
+        """
+        missed = max(math.floor((now - previous) / self.seconds), 0)
+        return previous + (missed + 1) * self.seconds
+
+
+class Cron:
+    """
+    Запуски по cron-выражению из пяти полей: минута, час, день месяца,
+    месяц, день недели (0 или 7 - воскресенье) в местном времени.
+
+    Поле может быть '*', числом, диапазоном 'a-b', списком через запятую
+    и шагом '*/n' или 'a-b/n'. Если ограничены и день месяца, и день
+    недели, подходит любой из них, как в cron.
+
+    Атрибуты:
+        expression (str): Исходное выражение.
+    """
+
+    __slots__ = ('expression', '_minutes', '_hours', '_days', '_months',
+                 '_weekdays', '_any_day', '_any_weekday')
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != len(CRON_FIELDS):
+            raise ValueError(f'Cron-выражение {expression!r} должно '
+                             f'состоять из {len(CRON_FIELDS)} полей')
+        self.expression = expression
+        (self._minutes, self._hours, self._days, self._months,
+         weekdays) = (
+            _parse_field(field, low, high)
+            for field, (_, low, high) in zip(fields, CRON_FIELDS)
+        )
+        self._weekdays = frozenset(weekday % 7 for weekday in weekdays)
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def first_fire(self, start: float) -> float:
+        # Время, совпадающее с началом подходящей минуты, тоже подходит.
+        return self.next_fire(start - 1, start - 1)
+
+    def next_fire(self, previous: float, now: float) -> float:
+        """
+        Возвращает начало первой подходящей минуты позже `previous`
+        и `now`.
+
+        Raises:
+            ValueError: Если подходящего времени нет (например, 31 февраля).
+        """
+        moment = (datetime.fromtimestamp(max(previous, now))
+                  .replace(second=0, microsecond=0) + timedelta(minutes=1))
+        limit = moment.year + CRON_SEARCH_YEARS
+        while moment.year <= limit:
+            if moment.month not in self._months:
+                moment = _next_month(moment)
+            elif not self.__day_matches(moment):
+                moment = (moment.replace(hour=0, minute=0)
+                          + timedelta(days=1))
+            elif moment.hour not in self._hours:
+                hour = _next_value(self._hours, moment.hour)
+                if hour is None:
+                    moment = (moment.replace(hour=0, minute=0)
+                              + timedelta(days=1))
+                else:
+                    moment = moment.replace(hour=hour, minute=0)
+            else:
+                minute = _next_value(self._minutes, moment.minute)
+                if minute is not None:
+                    return moment.replace(minute=minute).timestamp()
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+        raise ValueError(f'Cron-выражению {self.expression!r} не подходит '
+                         'ни одна дата')
+
+    def __day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self._days
+        # В datetime понедельник - 0, в cron - воскресенье.
+        weekday = (moment.weekday() + 1) % 7 in self._weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in field.split(','):
+        body, _, step = part.partition('/')
+        if body == '*':
+            start, stop = low, high
+        elif '-' in body:
+            start, stop = map(int, body.split('-'))
+        else:
+            start = stop = int(body)
+            if step:
+                stop = high
+        if not low <= start <= stop <= high:
+            raise ValueError(f'Значение {part!r} вне диапазона '
+                             f'{low}-{high}')
+        values.update(range(start, stop + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+def _next_value(values: frozenset, current: int) -> Optional[int]:
+    return min((value for value in values if value >= current), default=None)
+
+
+def _next_month(moment: datetime) -> datetime:
+    if moment.month == 12:
+        return moment.replace(year=moment.year + 1, month=1, day=1,
+                              hour=0, minute=0)
+    return moment.replace(month=moment.month + 1, day=1, hour=0, minute=0)
+
+
+class Recurrence:
+    """
+    Расписание повторяющейся задачи.
+
+    Каждый запуск выполняется как отдельная задача; сама повторяющаяся
+    задача ждёт своего времени в куче таймеров планировщика и
+    завершается после последнего запуска.
+
+    Атрибуты:
+        schedule (Interval | Cron): Когда выполнять запуски.
+        max_runs (int, optional): Максимальное количество запусков;
+        None - без ограничений.
+        overlap (str): Что делать, если подошло время запуска, а
+        предыдущий ещё выполняется: 'skip' - пропустить запуск,
+        'queue' - выполнить сразу после предыдущего, 'parallel' -
+        выполнить одновременно с ним.
+        runs (int): Количество начатых запусков.
+    """
+
+    __slots__ = ('schedule', 'max_runs', 'overlap', 'runs')
+
+    def __init__(self,
+                 every: Optional[float] = None,
+                 cron: Optional[str] = None,
+                 max_runs: Optional[int] = None,
+                 overlap: str = 'skip') -> None:
+        if (every is None) == (cron is None):
+            raise ValueError('Нужно указать ровно один из параметров '
+                             'every и cron')
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f'Неизвестная политика перекрытия: {overlap}')
+        self.schedule = Interval(every) if every is not None else Cron(cron)
+        self.max_runs = max_runs
+        self.overlap = overlap
+        self.runs = 0
+
+    def exhausted(self, pending: int = 0) -> bool:
+        """
+        Проверяет, начаты ли все запуски с учётом `pending` отложенных.
+        """
+        return self.max_runs is not None and self.runs + pending >= (
+            self.max_runs
+        )
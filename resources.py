@@ -0,0 +1,156 @@
+import math
+import time
+from collections import deque
+from typing import (Iterator,
+                    Optional)
+from uuid import UUID
+
+from job import Job
+
+
+class ResourceLimit:
+    """
+    Ограничения для задач с общим ресурсным тегом.
+
+    Атрибуты:
+        concurrency (int, optional): Сколько задач с тегом может
+        выполняться одновременно. Задача занимает ресурс от первого шага
+        до завершения.
+        rate (float, optional): Сколько шагов задач с тегом можно
+        запускать в секунду.
+        burst (int): Сколько шагов можно запустить подряд без ожидания
+        после простоя; по умолчанию равно округлённому вверх rate.
+    """
+
+    __slots__ = ('concurrency', 'rate', 'burst')
+
+    def __init__(self,
+                 concurrency: Optional[int] = None,
+                 rate: Optional[float] = None,
+                 burst: Optional[int] = None) -> None:
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst or (math.ceil(rate) if rate else 1)
+
+
+class TokenBucket:
+    """
+    Ведро токенов: пополняется со скоростью `rate` токенов в секунду
+    и вмещает не больше `burst` токенов.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate: float = rate
+        self.burst: int = burst
+        self._tokens: float = burst
+        self._updated: float = time.monotonic()
+
+    def delay(self) -> float:
+        """
+        Возвращает, через сколько секунд появится токен; 0 - токен есть.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+
+class ResourceManager:
+    """
+    Выдаёт задачам ресурсы по их тегам с учётом ограничений.
+
+    Задача, для которой не хватило одновременных мест, ставится
+    в очередь ожидания тега и возвращается планировщику, когда
+    одно из мест освобождается. Пока задача ждёт, планировщик
+    о ней не вспоминает.
+
+    Атрибуты:
+        limits (dict[str, ResourceLimit]): Ограничения по тегам.
+        Теги без ограничений ничего не ограничивают.
+    """
+
+    def __init__(self, limits: Optional[dict[str, ResourceLimit]] = None
+                 ) -> None:
+        self.limits: dict[str, ResourceLimit] = limits or {}
+        self._buckets: dict[str, TokenBucket] = {
+            tag: TokenBucket(limit.rate, limit.burst)
+            for tag, limit in self.limits.items() if limit.rate
+        }
+        self._in_use: dict[str, int] = dict.fromkeys(self.limits, 0)
+        self._waiters: dict[str, deque[Job]] = {}
+        # Теги, места которых занимает задача.
+        self._holders: dict[UUID, tuple[str, ...]] = {}
+
+    def acquire(self, task: Job) -> Optional[float]:
+        """
+        Пытается выдать задаче ресурсы для очередного шага.
+
+        Места выдаются только все сразу, а токен каждого тега
+        тратится на каждый шаг.
+
+        Args:
+            task (Job): Задача, которую планировщик хочет запустить.
+
+        Returns:
+            float | None: 0, если ресурсы выданы; время в секундах,
+            через которое стоит попробовать снова, если не хватает
+            токенов; None, если задача поставлена в очередь ожидания места.
+        """
+        tags = [tag for tag in task.resources if tag in self.limits]
+        if not tags:
+            return 0.0
+
+        held = task.id in self._holders
+        if not held:
+            for tag in tags:
+                concurrency = self.limits[tag].concurrency
+                if concurrency is not None and (
+                        self._in_use[tag] >= concurrency):
+                    self._waiters.setdefault(tag, deque()).append(task)
+                    return None
+
+        delay = max((self._buckets[tag].delay()
+                     for tag in tags if tag in self._buckets), default=0.0)
+        if delay:
+            return delay
+
+        for tag in tags:
+            if tag in self._buckets:
+                self._buckets[tag].take()
+        if not held:
+            for tag in tags:
+                self._in_use[tag] += 1
+            self._holders[task.id] = tuple(tags)
+        return 0.0
+
+    def release(self, task: Job) -> list[Job]:
+        """
+        Освобождает места, занятые задачей.
+
+        Args:
+            task (Job): Завершённая или отложенная задача.
+
+        Returns:
+            list[Job]: Задачи из очередей ожидания освободившихся тегов,
+            которые нужно снова поставить в очередь планировщика.
+        """
+        woken = []
+        for tag in self._holders.pop(task.id, ()):
+            self._in_use[tag] -= 1
+            waiters = self._waiters.get(tag)
+            if waiters:
+                woken.append(waiters.popleft())
+        return woken
+
+    def __len__(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def __iter__(self) -> Iterator[Job]:
+        for waiters in self._waiters.values():
+            yield from waiters
@@ -0,0 +1,217 @@
+from multiprocessing import (resource_tracker,
+                             shared_memory)
+from typing import (Any,
+                    Optional)
+from uuid import UUID
+
+from custom_logger import logger
+
+# Результаты-буферы не меньше этого размера возвращаются из рабочих
+# процессов через общую память, а не через pickle.
+SHARED_THRESHOLD = 1 << 20
+
+
+class SharedPayload:
+    """
+    Байты в блоке общей памяти.
+
+    При передаче в другой процесс сериализуется только имя блока
+    и размер, а данные читаются из общей памяти без копирования.
+
+    Атрибуты:
+        name (str): Имя блока общей памяти.
+        size (int): Размер данных в байтах.
+    """
+
+    __slots__ = ('name', 'size', '_block')
+
+    def __init__(self, name: str, size: int) -> None:
+        self.name = name
+        self.size = size
+        self._block: Optional[shared_memory.SharedMemory] = None
+
+    @classmethod
+    def create(cls, data) -> 'SharedPayload':
+        """
+        Копирует буфер в новый блок общей памяти.
+
+        Args:
+            data: bytes, bytearray, memoryview или другой объект
+            с протоколом буфера.
+
+        Returns:
+            SharedPayload: Описание созданного блока.
+        """
+        data = memoryview(data).cast('B')
+        block = _untracked(shared_memory.SharedMemory(
+            create=True, size=max(data.nbytes, 1)
+        ))
+        block.buf[:data.nbytes] = data
+        payload = cls(block.name, data.nbytes)
+        payload._block = block
+        return payload
+
+    def view(self) -> memoryview:
+        """
+        Возвращает байты блока без копирования.
+        """
+        if self._block is None:
+            self._block = _untracked(shared_memory.SharedMemory(self.name))
+        return self._block.buf[:self.size]
+
+    def close(self) -> None:
+        """
+        Отключает блок от процесса, не удаляя его.
+        """
+        block, self._block = self._block, None
+        if block is None:
+            return
+        try:
+            block.close()
+        except BufferError:
+            # Кто-то ещё держит view(): память освободится вместе с ним.
+            logger.warning('Блок общей памяти %s ещё используется',
+                           self.name)
+
+    def unlink(self) -> None:
+        """
+        Удаляет блок общей памяти.
+        """
+        block = self._block or _untracked(
+            shared_memory.SharedMemory(self.name)
+        )
+        # SharedMemory.unlink снимает блок с учёта resource_tracker.
+        resource_tracker.register(block._name, 'shared_memory')
+        block.unlink()
+        self._block = block
+        self.close()
+
+    def __getstate__(self) -> tuple[str, int]:
+        return self.name, self.size
+
+    def __setstate__(self, state: tuple[str, int]) -> None:
+        self.name, self.size = state
+        self._block = None
+
+
+def _untracked(block: shared_memory.SharedMemory
+               ) -> shared_memory.SharedMemory:
+    # resource_tracker удаляет блоки, открытые процессом, при его выходе.
+    # Блоками результатов владеет ResultStore процесса планировщика,
+    # поэтому рабочий процесс не должен удалять их за него.
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def share(value: Any, threshold: int = SHARED_THRESHOLD) -> Any:
+    """
+    Переносит большой буфер в общую память; остальные значения
+    возвращает как есть.
+
+    Args:
+        value (Any): Результат задачи.
+        threshold (int): Минимальный размер буфера для общей памяти.
+
+    Returns:
+        Any: SharedPayload или исходное значение.
+    """
+    try:
+        size = memoryview(value).nbytes
+    except TypeError:
+        return value
+    if size < threshold:
+        return value
+    payload = SharedPayload.create(value)
+    # Блок удаляет процесс планировщика, а не рабочий процесс.
+    payload.close()
+    return payload
+
+
+def resolve(value: Any) -> Any:
+    """
+    Возвращает данные результата: для SharedPayload - memoryview
+    на общую память.
+    """
+    if isinstance(value, SharedPayload):
+        return value.view()
+    return value
+
+
+class ResultStore:
+    """
+    Хранит результаты задач, пока их не получат все зависимые задачи.
+
+    Потребители регистрируются заранее, пока задача ещё выполняется,
+    поэтому результат не теряется, даже если потребитель попадёт
+    в планировщик после её завершения. Когда последний потребитель
+    завершается, результат удаляется, а блок общей памяти освобождается.
+    """
+
+    def __init__(self) -> None:
+        # ID задачи -> [результат, количество потребителей].
+        self._results: dict[UUID, list] = {}
+        # ID потребителя -> ID задач, результаты которых он держит.
+        self._holders: dict[UUID, list[UUID]] = {}
+
+    def expect(self, task_id: UUID, consumer: UUID) -> None:
+        """
+        Регистрирует потребителя результата незавершённой задачи.
+        """
+        self.__hold(self._results.setdefault(task_id, [None, 0]),
+                    task_id, consumer)
+
+    def acquire(self, task_id: UUID, consumer: UUID) -> bool:
+        """
+        Регистрирует потребителя результата завершённой задачи.
+
+        Returns:
+            bool: False, если результат уже удалён.
+        """
+        entry = self._results.get(task_id)
+        if entry is None:
+            return False
+        self.__hold(entry, task_id, consumer)
+        return True
+
+    def __hold(self, entry: list, task_id: UUID, consumer: UUID) -> None:
+        holding = self._holders.setdefault(consumer, [])
+        if task_id not in holding:
+            holding.append(task_id)
+            entry[1] += 1
+
+    def put(self, task_id: UUID, value: Any) -> bool:
+        """
+        Сохраняет результат задачи, если у него есть потребители.
+
+        Returns:
+            bool: True, если результат сохранён.
+        """
+        entry = self._results.get(task_id)
+        if entry is None:
+            return False
+        entry[0] = value
+        return True
+
+    def get(self, task_id: UUID) -> Any:
+        """
+        Возвращает сохранённый результат или None.
+        """
+        entry = self._results.get(task_id)
+        return entry[0] if entry is not None else None
+
+    def release(self, consumer: UUID) -> None:
+        """
+        Освобождает результаты, которые держит завершившийся потребитель.
+        Результаты без потребителей удаляются.
+        """
+        for task_id in self._holders.pop(consumer, ()):
+            entry = self._results[task_id]
+            entry[1] -= 1
+            if entry[1]:
+                continue
+            del self._results[task_id]
+            if isinstance(entry[0], SharedPayload):
+                entry[0].unlink()
+
+    def __len__(self) -> int:
+        return len(self._results)
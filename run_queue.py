@@ -0,0 +1,56 @@
+import heapq
+from typing import Iterator
+
+from job import Job
+
+
+class RunQueue:
+    """
+    Очередь готовых к выполнению задач с учётом приоритета.
+
+    Задачи хранятся в мин-куче по ключу `номер добавления - приоритет *
+    aging`. Задача с большим приоритетом обгоняет не более
+    `приоритет * aging` задач, добавленных раньше неё, поэтому задачи
+    с низким приоритетом не голодают. Задачи с равным приоритетом
+    выбираются по кругу. Добавление и выбор задачи стоят O(log n).
+
+    Атрибуты:
+        aging (int): Сколько добавлений в очередь даёт одна единица
+        приоритета.
+    """
+
+    def __init__(self, aging: int = 10) -> None:
+        self.aging: int = aging
+        self._heap: list[tuple[int, int, Job]] = []
+        self._tick: int = 0
+
+    def push(self, task: Job, boost: int = 0) -> None:
+        """
+        Добавляет задачу в очередь.
+
+        Args:
+            task (Job): Готовая к выполнению задача.
+            boost (int): Надбавка к приоритету задачи, которую назначает
+            планировщик.
+        """
+        self._tick += 1
+        key = self._tick - (task.priority + boost) * self.aging
+        heapq.heappush(self._heap, (key, self._tick, task))
+
+    def pop(self) -> Job:
+        """
+        Извлекает задачу, которую следует выполнить следующей.
+
+        Returns:
+            Job: Задача с наименьшим ключом.
+
+        Raises:
+            IndexError: Если очередь пуста.
+        """
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[Job]:
+        return (task for _, _, task in sorted(self._heap))
@@ -1,17 +1,46 @@
-import pickle
+import heapq
 import time
-from collections import deque
+from concurrent.futures import (FIRST_COMPLETED,
+                                Future,
+                                wait)
+from collections import OrderedDict
+from collections.abc import Collection
+from itertools import count
 from uuid import UUID
-from typing import Generator
+from typing import (Generator,
+                    Iterable,
+                    Optional,
+                    Union)
 
 import requests
 
-from job import (Job,
+from cache import (ResultCache,
+                   cache_key)
+from dag import (critical_path,
+                 validate_graph)
+from executors import (BaseExecutor,
+                       create_executor)
+from metrics import (SchedulerMetrics,
+                     serve_metrics)
+from job import (FAILED_STATUSES,
+                 Job,
                  JobStatus)
+from persistence import (JobJournal,
+                         required_statuses)
+from resources import (ResourceLimit,
+                       ResourceManager)
+from results import (ResultStore,
+                     SharedPayload)
+from run_queue import RunQueue
+from tracing import Tracer
 from exceptions import (TaskTimeLimitError,
                         QueueFullOfElems)
 from custom_logger import logger
 
+# Сколько итоговых статусов недавно завершённых задач хранит
+# Scheduler по умолчанию.
+COMPLETED_WINDOW = 10_000
+
 
 class Scheduler:
     """
@@ -23,125 +52,658 @@ class Scheduler:
     перезапускать и сохранять состояние.
 
     Атрибуты:
-        queue (deque[Job, maxlen=10]): Очередь задач на выполнение
-        с максимальной длиной 10.
+        queue (RunQueue): Очередь готовых к выполнению задач,
+        упорядоченная по приоритету с учётом старения.
         dependency_map (dict[UUID, list[Job]]): Словарь задач-зависимостей.
-        file (str): Путь к файлу для сохранения состояния планировщика.
+        Ключ - ID задачи, значения - задачи, ожидающие её завершения.
+        file (str): Путь к журналу для сохранения состояния планировщика.
+        journal (bool): Если True, каждое изменение состояния задач
+        дописывается в журнал сразу; иначе журнал записывается в stop().
+        pool_size (int): Максимальное количество задач, одновременно
+        находящихся в планировщике (включая отложенные). Задачи, ждущие
+        места ресурсного тега, учитываются отдельно: их тоже не больше
+        pool_size.
+        executor: Исполнитель шагов задач. 'inline' выполняет шаги
+        в потоке планировщика, 'thread' - параллельно в пуле из
+        `workers` потоков, 'process' - выполняет задачи целиком
+        в пуле из `workers` процессов. Можно передать и готовый
+        исполнитель, например BrokerExecutor, раздающий задачи рабочим
+        процессам по сети. Каждая задача выполняет не более одного шага
+        одновременно.
+        ordering (str): Порядок выбора готовых задач. 'fifo' учитывает
+        только приоритет задач, 'critical-path' дополнительно повышает
+        приоритет задач с самым длинным путём до конца графа.
+        limits (dict[str, ResourceLimit]): Ограничения для задач
+        с ресурсными тегами: сколько таких задач выполняется
+        одновременно и сколько их шагов запускается в секунду.
+        cache (ResultCache, optional): Кэш результатов задач с cache=True.
+        Задача, результат которой есть в кэше, сразу считается
+        выполненной, и её цель не вызывается. Одинаковые задачи,
+        выбранные из очереди, пока такая же задача выполняется,
+        не запускаются, а получают её результат.
+        tracer (Tracer, optional): Трассировщик, записывающий шаги,
+        ожидания и перезапуски задач для просмотра на временной шкале.
+        Без трассировщика планировщик только проверяет, что его нет.
+        completed_window (int): Сколько итоговых статусов недавно
+        завершённых задач хранится для зависимостей, добавленных уже
+        после завершения родителя. Статусы более старых задач
+        вытесняются, чтобы память не росла с каждой задачей: зависимость
+        от вытесненной задачи считается неизвестной, и задача ждёт её,
+        как ждала бы задачу, которую ещё не добавили.
+
+    Повторяющаяся задача (с параметром recurrence) между запусками
+    лежит в куче таймеров под временем следующего запуска и не тратит
+    время планировщика. Когда время наступает, планировщик ставит
+    в очередь новый запуск и сразу вычисляет время следующего
+    от запланированного, а не фактического времени, поэтому расписание
+    не смещается. Пока в планировщике есть повторяющаяся задача без
+    ограничения max_runs, run() не завершается.
+
+    Результат выполненной задачи (значение return её генератора)
+    хранится, пока его не получат все зависимые задачи с pass_results,
+    и освобождается, когда последняя из них завершится.
     """
 
-    def __init__(self, pool_size: int = 10, file: str = 'jobs.pkl'):
-        self.queue: deque[Job] = deque(maxlen=pool_size)
+    def __init__(self,
+                 pool_size: int = 10,
+                 file: str = 'jobs.pkl',
+                 executor: Union[str, BaseExecutor] = 'inline',
+                 workers: Optional[int] = None,
+                 aging: int = 10,
+                 journal: bool = False,
+                 ordering: str = 'fifo',
+                 limits: Optional[dict[str, ResourceLimit]] = None,
+                 cache: Optional[ResultCache] = None,
+                 tracer: Optional[Tracer] = None,
+                 completed_window: int = COMPLETED_WINDOW):
+        if ordering not in ('fifo', 'critical-path'):
+            raise ValueError(f'Неизвестный порядок выполнения: {ordering}')
+        self.pool_size: int = pool_size
+        self.ordering: str = ordering
+        self.completed_window: int = completed_window
+        self.executor = create_executor(executor, workers, pool_size)
+        # Готовым исполнителем управляет вызывающий код.
+        self._owns_executor = not isinstance(executor, BaseExecutor)
+        self.queue: RunQueue = RunQueue(aging)
         self.file: str = file
+        self._journal: Optional[JobJournal] = (
+            JobJournal(file) if journal else None
+        )
+        # Восстановленные задачи, описания которых restart() уже записал
+        # в журнал при его сжатии.
+        self._restored: set[UUID] = set()
         self.dependency_map = {}
+        # Мин-куча отложенных задач: (время старта, порядковый номер, задача).
+        # Порядковый номер разрешает равенство времён без сравнения Job.
+        self._timers: list[tuple[float, int, Job]] = []
+        self._timer_seq = count()
+        # Задачи, ожидающие зависимости. Такие задачи не находятся
+        # в очереди и не тратят время планировщика.
+        self._waiting: dict[UUID, Job] = {}
+        # Итоговые статусы завершённых задач для зависимостей,
+        # добавленных в планировщик уже после завершения родителя,
+        # в порядке завершения. Хранятся не больше completed_window.
+        self._completed: OrderedDict[UUID, JobStatus] = OrderedDict()
+        # Шаги, выполняющиеся в исполнителе прямо сейчас, и крайние сроки
+        # (по time.monotonic) тех из них, что ограничены по времени.
+        self._running: dict[Future, Job] = {}
+        self._deadlines: dict[Future, float] = {}
+        # Брошенные шаги, которые до своего завершения занимают место
+        # в исполнителе (задачи в рабочих процессах).
+        self._abandoned: set[Future] = set()
+        # Задачи, ожидающие завершения отданного через yield Future.
+        self._io: dict[Future, Job] = {}
+        self._metrics = SchedulerMetrics()
+        self._tracer: Optional[Tracer] = tracer
+        # Длина самого длинного пути от задачи до конца графа
+        # для порядка 'critical-path'.
+        self._path_lengths: dict[UUID, int] = {}
+        # Ограничения ресурсных тегов и задачи, ожидающие ресурса.
+        self._resources = ResourceManager(limits)
+        # Повторяющиеся задачи по ID их выполняющихся запусков,
+        # количество выполняющихся запусков и отложенных политикой
+        # 'queue' запусков каждой повторяющейся задачи.
+        self._runs: dict[UUID, Job] = {}
+        self._active_runs: dict[UUID, int] = {}
+        self._queued_runs: dict[UUID, int] = {}
+        # Результаты задач, ожидающие своих потребителей.
+        self._results = ResultStore()
+        self.cache: Optional[ResultCache] = cache
+        # Ключи кэша запущенных задач с cache=True (None - задачу нельзя
+        # кэшировать) и задачи, ожидающие завершения такой же задачи.
+        self._cache_keys: dict[UUID, Optional[str]] = {}
+        self._duplicates: dict[str, list[Job]] = {}
+        # Количество задач в _duplicates; меняется только в потоке
+        # планировщика, чтобы не обходить словарь при каждом подсчёте.
+        self._duplicate_count = 0
         logger.info('Шедулер инициализирован')
 
-    def process_all_tasks(self, tasks: tuple[Job]) -> None:
+    def process_all_tasks(self,
+                          tasks: Iterable[Union[Job, dict]]) -> None:
         """
         Добавляет и обрабатывает все переданные задачи, учитывая ограничение
         на максимальное количество одновременно выполняемых задач,
         установленное параметром `pool_size`.
 
+        Задачи забираются из `tasks` по одной и только тогда, когда
+        в планировщике есть свободное место, поэтому `tasks` может быть
+        генератором сколь угодно большого числа задач. Все задачи
+        выполняются одним долгоживущим циклом `run()`.
+
+        Если `tasks` - коллекция (список, кортеж), граф зависимостей
+        проверяется целиком до запуска первой задачи, и задачи добавляются
+        в топологическом порядке: каждая после своих зависимостей.
+        При порядке 'critical-path' задачи на самом длинном пути графа
+        запускаются первыми. Задачи из генератора добавляются в том
+        порядке, в котором он их отдаёт.
+
         Параметры:
-            tasks (tuple[Job]): Кортеж задач для добавления и выполнения.
+            tasks (Iterable[Job | dict]): Задачи или словари с параметрами
+            конструктора Job.
+
+        Raises:
+            DependencyGraphError: Если в коллекции задач есть цикл
+            или зависимость от задачи, которой нет в планировщике.
+            QueueFullOfElems: Если планировщик заполнен задачами, которые
+            ждут ещё не добавленных зависимостей, и следующую задачу
+            нельзя добавить.
         """
-        idx = 0
+        if isinstance(tasks, Collection):
+            tasks = self.__prepare_graph(tasks)
+
+        loop = iter(self.run())
 
-        while idx < len(tasks):
-            try:
-                self.schedule(tasks[idx])
-                # Индекс инкрементируется после успешного добавления задачи.
-                idx += 1
-            except QueueFullOfElems:
-                # Если очередь заполнена, выполняем одну итерацию планировщика.
+        for task in tasks:
+            if isinstance(task, dict):
+                task = Job(**task)
+            while True:
                 try:
-                    next(self.run())
-                except StopIteration:
-                    # Если все задачи обработаны, завершаем работу.
+                    self.schedule(task)
                     break
+                except QueueFullOfElems:
+                    # Если очередь заполнена, ждём, пока освободится место.
+                    try:
+                        next(loop)
+                    except StopIteration:
+                        # Место не освободится: все задачи ждут
+                        # зависимости, которые ещё не добавлены.
+                        logger.error('Планировщик заполнен задачами, '
+                                     'которые не могут быть запущены.')
+                        raise QueueFullOfElems(
+                            'Планировщик заполнен задачами, ожидающими '
+                            'ещё не добавленные зависимости.'
+                        ) from None
 
         # Запускаем оставшиеся задачи в планировщике.
-        for _ in self.run():
+        for _ in loop:
             pass
 
+    def __prepare_graph(self, tasks: Collection[Union[Job, dict]]
+                        ) -> list[Job]:
+        """
+        Проверяет граф зависимостей коллекции задач.
+
+        Args:
+            tasks (Collection[Job | dict]): Добавляемые задачи.
+
+        Returns:
+            list[Job]: Задачи в топологическом порядке.
+
+        Raises:
+            DependencyGraphError: Если граф некорректен.
+        """
+        jobs = [Job(**task) if isinstance(task, dict) else task
+                for task in tasks]
+        known = set(self._completed)
+        known.update(task.id for task in self.__unfinished())
+        order = validate_graph(jobs, known)
+        if self.ordering == 'critical-path':
+            self._path_lengths.update(critical_path(order))
+        # Результаты нужно сохранить и для потребителей, которые попадут
+        # в планировщик уже после завершения своих зависимостей.
+        for task in jobs:
+            if task.pass_results:
+                for dependency in task.dependencies:
+                    if dependency not in self._completed:
+                        self._results.expect(dependency, task.id)
+        # Задачи добавляются по одной по мере освобождения места, поэтому
+        # зависимость должна попасть в планировщик раньше зависимой
+        # задачи, иначе зависимые задачи могут занять всё место.
+        position = {task.id: index for index, task in enumerate(order)}
+        jobs.sort(key=lambda task: position[task.id])
+        return jobs
+
     def schedule(self, task: Job) -> None:
         """
         Добавляет задачу в очередь на выполнение.
-        Если задача имеет зависимости, инициирует службу зависимостей.
+        Если у задачи есть незавершённые зависимости, она ожидает их вне
+        очереди и попадает в неё, когда счётчик зависимостей обнулится.
+        Если время старта задачи ещё не наступило, задача помещается
+        в кучу таймеров и не занимает планировщик до своего срока.
 
         Args:
             task (Job): Задача для добавления в очередь.
 
         Raises:
             QueueFullOfElems: Если очередь задач полна.
+            ValueError: Если ведётся журнал, а цель задачи
+            нельзя импортировать по имени.
         """
-        if len(self.queue) >= self.queue.maxlen:
+        if self.__full():
             raise QueueFullOfElems
 
-        self.queue.appendleft(task)
-        logger.info('%s добавлена в очередь', task.id)
-        if task.dependencies:
-            self.__start_dependency_service(task, self.dependency_map)
+        if self._journal is not None and task.id not in self._restored:
+            self._journal.record_submit(task)
+        self._restored.discard(task.id)
+
+        if task.dependencies and self.__dependency_failed(task):
+            self.__cancel(task)
+            self.__delete_dependency_task_from_map(task)
+            return
+
+        if task.dependencies and self.__start_dependency_service(task):
+            task.status = JobStatus.POSTPONED
+            self._waiting[task.id] = task
+            self._metrics.job_blocked(task)
+            if self._tracer is not None:
+                self._tracer.job_blocked(task)
+            logger.info('Задача %s отложена из-за невыполненных '
+                        'зависимостей.', task.id)
+            return
+
+        self.__enqueue(task)
 
     def run(self) -> Generator[None, None, None]:
         """
         Основной метод для исполнения всех задач в очереди.
-        """
-        while len(self.queue):
-            task = self.queue[-1]
 
-            if (self.___task_should_not_start(task, self.queue)
-                    or self.__dependencies_not_complete(task, self.queue)):
-                continue
+        Готовые задачи передаются исполнителю по одному шагу за раз.
+        Генератор отдаёт управление каждый раз, когда хотя бы одна задача
+        завершилась и освободила место в планировщике.
+
+        Если готовых к запуску задач нет, а отложенные есть, планировщик
+        засыпает до ближайшего времени старта вместо холостого цикла.
 
-            try:
-                logger.info('Выполнение %s', task.id)
-                task.run()
-            except StopIteration:
-                task.status = JobStatus.FINISHED
-                self.__delete_dependency_task_from_map(task)
-                self.queue.pop()
+        Шаг, превысивший step_timeout или остаток max_running_time,
+        бросается сразу по истечении срока и считается ошибкой
+        TaskTimeLimitError: задача перезапускается или проваливается,
+        а её место в исполнителе освобождается.
+
+        Задача, отдавшая через yield Future (например, операцию
+        ввода-вывода из file_io.submit), возвращается в очередь только
+        после его завершения и до тех пор не занимает исполнитель.
+        Ожидание такого Future не ограничено step_timeout
+        и max_running_time: срок ожидания задаёт сама операция
+        ввода-вывода (например, timeout запроса).
+        """
+        if self._tracer is not None:
+            self._tracer.run_started()
+        while self.queue or self._timers or self._running or self._io:
+            self.__count_jobs()
+            self.__release_due_timers()
+            if self.__dispatch_ready():
+                # Задачи с результатом из кэша или ждущие ресурса
+                # освободили место: новые задачи нужно сразу раздать.
                 yield
                 continue
-            except (TaskTimeLimitError,
-                    requests.ConnectionError,
-                    Exception) as e:
-                if task.max_restarts > task.restarts:
-                    task.restarts += 1
-                    self.queue.rotate(1)
-                else:
-                    task.status = JobStatus.FAILED
-                    self.__delete_dependency_task_from_map(task)
-                    self.queue.pop()
-                    yield
-                logger.error('Ошибка при выполнении %s: %s', task.id, e)
+            if not self._running and not self._io and not self._abandoned:
+                self.__sleep_until_next_timer()
                 continue
 
-            self.queue.rotate(1)
+            done, _ = wait(
+                self._running.keys() | self._io.keys() | self._abandoned,
+                timeout=self.__wait_timeout(),
+                return_when=FIRST_COMPLETED,
+            )
+            released = self.__collect(done)
+            released |= self.__abandon_expired_steps()
+            if released:
+                yield
 
+        self.__count_jobs()
+        if self._waiting:
+            logger.warning('Задачи %s не могут быть запущены: '
+                           'их зависимости не были добавлены в планировщик.',
+                           list(self._waiting))
+        if self._tracer is not None:
+            self._tracer.run_finished()
         logger.info('Все задачи обработаны')
 
-    def restart(self):
+    def __count_jobs(self) -> None:
+        """
+        Публикует в метриках количество задач в каждом состоянии.
+        """
+        self._metrics.jobs_counted({'ready': len(self.queue),
+                                    'delayed': len(self._timers),
+                                    'waiting': len(self._waiting),
+                                    'io': len(self._io),
+                                    'duplicates': self._duplicate_count,
+                                    'running': len(self._running)})
+
+    def __collect(self, done: set[Future]) -> bool:
+        """
+        Обрабатывает завершившиеся шаги и операции ввода-вывода.
+
+        Returns:
+            bool: True, если хотя бы одна задача покинула планировщик.
+        """
+        released = False
+        for future in done:
+            if future in self._io:
+                self.__push(self._io.pop(future))
+                continue
+            if future in self._abandoned:
+                self._abandoned.discard(future)
+                continue
+            task = self._running.pop(future)
+            self._deadlines.pop(future, None)
+            released |= self.__handle_step(task, future)
+        return released
+
+    def __dispatch_ready(self) -> bool:
+        """
+        Передаёт готовые задачи исполнителю, пока у него есть свободные
+        места.
+
+        Returns:
+            bool: True, если хотя бы одна задача освободила место
+            в планировщике: завершилась с результатом из кэша или
+            встала ждать места ресурсного тега, пока таких задач
+            меньше pool_size.
         """
-        Перезапускает все задачи и возвращает их в исходное состояние.
+        released = False
+        while self.queue and (len(self._running) + len(self._abandoned)
+                              < self.executor.capacity):
+            task = self.queue.pop()
+            if self.__take_from_cache(task):
+                released |= task.status == JobStatus.FINISHED
+                continue
+            delay = self._resources.acquire(task)
+            if delay is None:
+                # Задачу вернёт в очередь освобождение ресурса.
+                logger.debug('Задача %s ждёт освобождения ресурса', task.id)
+                released |= not self.__full()
+                continue
+            if delay:
+                self.__add_timer(task, time.time() + delay)
+                continue
+            logger.debug('Выполнение %s', task.id)
+            self._metrics.step_started(task)
+            if self._tracer is not None:
+                self._tracer.step_started(task)
+            budget = self.executor.time_budget(task)
+            future = self.executor.submit(task)
+            self._running[future] = task
+            if budget is not None:
+                self._deadlines[future] = time.monotonic() + budget
+        return released
+
+    def __take_from_cache(self, task: Job) -> bool:
         """
-        with open(self.file, 'rb') as file:
-            loaded_tasks = pickle.load(file)
+        Завершает задачу с результатом из кэша или откладывает её
+        до завершения такой же выполняющейся задачи.
 
-        for task in loaded_tasks:
-            task.status = JobStatus.NOT_STARTED
-            self.schedule(task)
+        Args:
+            task (Job): Задача, выбранная из очереди.
 
-        self.run()
+        Returns:
+            bool: True, если задачу не нужно запускать.
+        """
+        if self.cache is None or not task.cache or (
+                task.id in self._cache_keys):
+            return False
+        key = self._cache_keys[task.id] = cache_key(task)
+        if key is None:
+            return False
+
+        hit, value = self.cache.get(key)
+        if hit:
+            del self._cache_keys[task.id]
+            task.result = value
+            task.status = JobStatus.FINISHED
+            logger.info('Результат задачи %s взят из кэша', task.id)
+            if self._tracer is not None:
+                self._tracer.job_cached(task)
+            self.__delete_dependency_task_from_map(task)
+            return True
+        if key in self._duplicates:
+            del self._cache_keys[task.id]
+            self._duplicates[key].append(task)
+            self._duplicate_count += 1
+            logger.info('Задача %s ждёт результата такой же задачи',
+                        task.id)
+            return True
+        self._duplicates[key] = []
+        return False
+
+    def __wait_timeout(self) -> Optional[float]:
+        """
+        Возвращает, сколько можно ждать завершения шагов: до ближайшего
+        отложенного старта или до ближайшего крайнего срока шага.
+        """
+        delays = [self.__next_timer_delay()] if self._timers else []
+        if self._deadlines:
+            delays.append(max(min(self._deadlines.values())
+                              - time.monotonic(), 0))
+        return min(delays) if delays else None
+
+    def __abandon_expired_steps(self) -> bool:
+        """
+        Бросает шаги, крайний срок которых истёк.
+
+        Брошенный шаг может продолжать выполняться в фоне, но его результат
+        игнорируется, а при перезапуске задача начинается заново.
+        Если брошенный шаг занимает место в исполнителе (рабочий процесс),
+        новые шаги не запускаются на это место до его завершения.
+
+        Returns:
+            bool: True, если хотя бы одна задача покинула планировщик.
+        """
+        now = time.monotonic()
+        expired = [future for future, deadline in self._deadlines.items()
+                   if deadline <= now]
+        released = False
+        for future in expired:
+            del self._deadlines[future]
+            task = self._running.pop(future)
+            if self.executor.abandon(future):
+                self._abandoned.add(future)
+            task.reset()
+            self._metrics.step_finished(task)
+            if self._tracer is not None:
+                self._tracer.step_finished(task)
+            logger.error('Шаг задачи %s превысил отведённое время '
+                         'и был прерван.', task.id)
+            released |= self.__handle_failure(task, TaskTimeLimitError())
+        return released
+
+    def __handle_step(self, task: Job, future: Future) -> bool:
+        """
+        Обрабатывает результат шага задачи.
+
+        Args:
+            task (Job): Задача, шаг которой завершился.
+            future (Future): Результат шага.
+
+        Returns:
+            bool: True, если задача покинула планировщик
+            (выполнена или провалена), иначе False.
+        """
+        self._metrics.step_finished(task)
+        if self._tracer is not None:
+            self._tracer.step_finished(task)
+        try:
+            exhausted = self.executor.complete(task, future)
+        except (TaskTimeLimitError,
+                requests.ConnectionError,
+                Exception) as e:
+            logger.error('Ошибка при выполнении %s: %s', task.id, e)
+            return self.__handle_failure(task, e)
+
+        if exhausted:
+            task.status = JobStatus.FINISHED
+            self.__delete_dependency_task_from_map(task)
+            return True
+
+        if task.awaiting is not None:
+            self._io[task.awaiting] = task
+            task.awaiting = None
+            if self._tracer is not None:
+                self._tracer.job_awaiting(task)
+            return False
+        self.__push(task)
+        return False
+
+    def __handle_failure(self, task: Job, error: Exception) -> bool:
+        """
+        Перезапускает задачу после ошибки или проваливает её,
+        если перезапуски исчерпаны или ошибка не подходит под политику
+        повторов задачи.
+
+        Перезапущенная задача выполняется заново с начала. Если политика
+        задаёт задержку, задача ждёт её в куче таймеров и не занимает
+        исполнитель.
+
+        Args:
+            task (Job): Задача, шаг которой завершился ошибкой.
+            error (Exception): Ошибка шага.
+
+        Returns:
+            bool: True, если задача провалена и покинула планировщик.
+        """
+        if (task.max_restarts > task.restarts
+                and task.retry.should_retry(error)):
+            task.restarts += 1
+            task.running_time = 0
+            task.reset()
+            self._metrics.job_restarted()
+            if self._tracer is not None:
+                self._tracer.job_restarted(task, error)
+            if self._journal is not None:
+                self._journal.record_status(task)
+            delay = task.retry.delay(task.restarts)
+            if delay > 0:
+                logger.info('Задача %s будет перезапущена через %.3f с.',
+                            task.id, delay)
+                self.__release_resources(task)
+                self.__add_timer(task, time.time() + delay)
+            else:
+                self.__push(task)
+            return False
+        task.status = JobStatus.FAILED
+        self.__delete_dependency_task_from_map(task)
+        return True
+
+    def metrics(self) -> dict:
+        """
+        Возвращает снимок метрик планировщика.
+
+        Returns:
+            dict: Гистограммы длительности шагов по целям задач, ожидания
+            в очереди и ожидания зависимостей (в секундах), количество
+            перезапусков, завершённых задач и завершённых задач в секунду,
+            а также количество задач в каждом состоянии.
+
+        Метод можно вызывать из другого потока, например из serve_metrics:
+        количество задач в каждом состоянии поток планировщика публикует
+        на каждой итерации run(), и снимок не читает его структуры.
+        """
+        snapshot = self._metrics.snapshot()
+        if self.cache is not None:
+            snapshot['cache'] = {'hits': self.cache.hits,
+                                 'misses': self.cache.misses,
+                                 'entries': len(self.cache)}
+        return snapshot
+
+    def serve_metrics(self, port: int, host: str = '127.0.0.1'):
+        """
+        Отдаёт метрики в формате Prometheus по HTTP на адресе /metrics.
+
+        Args:
+            port (int): Порт; 0 - выбрать свободный.
+            host (str): Адрес, на котором принимаются подключения.
+
+        Returns:
+            ThreadingHTTPServer: Запущенный сервер; остановить его можно
+            методом shutdown().
+        """
+        return serve_metrics(self.metrics, port, host)
+
+    def restart(self) -> list[Job]:
+        """
+        Восстанавливает незавершённые задачи из журнала и выполняет их.
+
+        Генераторы нельзя сохранить, поэтому восстановленные задачи
+        выполняются с начала, сохраняя счётчики перезапусков и накопленное
+        время выполнения. Зависимости от задач, завершённых до остановки,
+        считаются выполненными. После восстановления журнал сжимается
+        и продолжает вестись.
+
+        Returns:
+            list[Job]: Восстановленные задачи.
+        """
+        if self._journal is None:
+            self._journal = JobJournal(self.file)
+        tasks, completed = self._journal.replay()
+        self._completed.update(completed)
+        # Задачи остаются в журнале, пока планировщик добавляет их
+        # по мере освобождения места: сбой в это время их не потеряет.
+        self._journal.compact(tasks, required_statuses(tasks, completed))
+        self._restored.update(task.id for task in tasks)
+        logger.info('Восстановлено задач из журнала: %s', len(tasks))
+
+        self.process_all_tasks(tasks)
+        return tasks
 
     def stop(self):
         """
-        Останавливает все задачи, сохраняя их текущее состояние в файл.
+        Останавливает все задачи, сохраняя их текущее состояние в журнал.
+
+        Если журнал ведётся, он уже содержит все изменения и только
+        закрывается. Иначе журнал записывается целиком из незавершённых
+        задач.
         """
-        for task in self.queue:
+        tasks = self.__unfinished()
+        for task in tasks:
             task.pause()
 
-        with open(self.file, 'wb') as file:
-            pickle.dump(self.queue, file, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._journal is not None:
+            self._journal.close()
+            return
+
+        JobJournal(self.file).compact(
+            tasks, required_statuses(tasks, self._completed)
+        )
+
+    def shutdown(self) -> None:
+        """
+        Останавливает пул потоков или процессов исполнителя, созданного
+        планировщиком. Переданный готовым исполнитель не закрывается.
+
+        Планировщик можно использовать как контекстный менеджер:
+        shutdown() вызывается при выходе из блока with.
+        """
+        if self._owns_executor:
+            self.executor.shutdown()
+
+    def __enter__(self) -> 'Scheduler':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    def __unfinished(self) -> list[Job]:
+        """
+        Возвращает все задачи, которые находятся в планировщике.
+        """
+        return [*self.queue,
+                *(task for _, _, task in self._timers),
+                *self._waiting.values(),
+                *self._resources,
+                *self._io.values(),
+                *(task for tasks in self._duplicates.values()
+                  for task in tasks),
+                *self._running.values()]
 
     @staticmethod
     def __update_dependency_status(task: Job, dependency_task: Job) -> None:
@@ -161,74 +723,313 @@ class Scheduler:
                 dependency_task.status
             )
 
-    @staticmethod
-    def __start_dependency_service(
-        task: Job,
-        dependency_map: dict[UUID, list[Job]]
-    ) -> None:
+    def __start_dependency_service(self, task: Job) -> int:
         """
         Добавляет зависимые задачи в словарь dependency_map.
 
-        Если основная задача имеет зависимости, этот метод добавляет их
-        в словарь для отслеживания.
+        Зависимости, которые уже завершились, сразу учитываются
+        в статусах задачи и не ожидаются повторно.
 
         Args:
             task (Job): Основная задача.
-            dependency_map (dict[UUID, list[Job]]): Словарь для отслеживания
-            зависимостей.
+
+        Returns:
+            int: Количество незавершённых зависимостей задачи.
         """
+        unresolved = 0
         for dependency in task.dependencies:
+            if dependency in self._completed:
+                task.dependency_statuses[dependency] = (
+                    self._completed[dependency]
+                )
+                if (task.pass_results
+                        and self._completed[dependency] == JobStatus.FINISHED
+                        and not self._results.acquire(dependency, task.id)):
+                    logger.warning('Результат задачи %s уже освобождён: '
+                                   'задача %s получит None.',
+                                   dependency, task.id)
+                continue
             logger.info('Найдена зависимая задача - %s. '
                         'Ожидание выполнения...', dependency)
-            if dependency not in dependency_map:
-                dependency_map[dependency] = []
-            dependency_map[dependency].append(task)
+            if task.pass_results:
+                self._results.expect(dependency, task.id)
+            self.dependency_map.setdefault(dependency, []).append(task)
+            unresolved += 1
+        if unresolved:
+            task.unresolved = unresolved
+        return unresolved
+
+    def __dependency_failed(self, task: Job) -> bool:
+        """
+        Проверяет, провалена ли или пропущена одна из уже завершённых
+        зависимостей задачи, которая не должна выполняться в этом случае.
+        """
+        return task.on_dependency_failure != 'run' and any(
+            self._completed.get(dependency) in FAILED_STATUSES
+            for dependency in task.dependencies
+        )
 
     @staticmethod
-    def ___task_should_not_start(task: Job, queue: deque[Job]) -> bool:
+    def __cancel(task: Job) -> None:
+        """
+        Пропускает или проваливает задачу, не запуская её,
+        согласно её политике on_dependency_failure.
         """
-        Проверяет, следует ли начинать выполнение задачи
-        на основе времени старта.
+        if task.on_dependency_failure == 'skip':
+            task.status = JobStatus.SKIPPED
+        else:
+            task.status = JobStatus.FAILED
+        logger.warning('Задача %s не будет запущена: её зависимость '
+                       'провалена. Статус задачи - %s.',
+                       task.id, task.status.value)
 
-        Args:
-            task (Job): Задача для проверки.
-            queue (deque[Job]): Текущая очередь задач.
+    def __full(self) -> bool:
+        """
+        Проверяет, что в планировщик нельзя добавить задачу.
 
-        Returns:
-            bool: Возвращает True, если задача не
-            должна начинаться, иначе False.
+        Задачи, ждущие места ресурсного тега, ограничиваются отдельно
+        от остальных: иначе задачи без тегов ждали бы, пока освободится
+        чужой ресурс, а без ограничения поток задач с занятым тегом
+        целиком переместился бы в ожидание ресурса.
+        """
+        return (self.__occupied() >= self.pool_size
+                or len(self._resources) >= self.pool_size)
+
+    def __occupied(self) -> int:
+        """
+        Возвращает количество задач, занимающих место в планировщике,
+        не считая задач, ждущих места ресурсного тега.
+        """
+        return (len(self.queue) + len(self._timers) + len(self._waiting)
+                + len(self._io) + len(self._running)
+                + self._duplicate_count)
+
+    def __enqueue(self, task: Job) -> None:
+        """
+        Ставит готовую задачу в очередь или в кучу таймеров,
+        если время её старта ещё не наступило.
+
+        Args:
+            task (Job): Задача без незавершённых зависимостей.
         """
-        if task.start_at and time.time() < task.start_at:
+        if task.pass_results:
+            task.inputs = tuple(self._results.get(dependency)
+                                for dependency in task.dependencies)
+        if task.recurrence is not None:
+            due = task.recurrence.schedule.first_fire(task.start_at
+                                                      or time.time())
+            self.__add_timer(task, due)
+            logger.info('Повторяющаяся задача %s запланирована. '
+                        'Первый запуск через %.3f с.',
+                        task.id, max(due - time.time(), 0))
+        elif task.start_at and time.time() < task.start_at:
+            self.__add_timer(task, task.start_at)
             logger.info('Задача %s отложена. Время начала ещё не наступило.',
                         task.id)
-            queue.rotate(1)
-            return True
-        return False
+        else:
+            self.__push(task)
+            logger.info('%s добавлена в очередь', task.id)
 
-    @staticmethod
-    def __dependencies_not_complete(task: Job, queue: deque[Job]) -> bool:
+    def __push(self, task: Job) -> None:
         """
-        Проверяет, завершены ли все зависимые задачи для основной задачи.
+        Ставит готовую к выполнению задачу в очередь.
 
         Args:
-            task (Job): Основная задача.
-            queue (deque[Job]): Текущая очередь задач.
+            task (Job): Готовая задача.
+        """
+        self._metrics.job_ready(task)
+        if self._tracer is not None:
+            self._tracer.job_ready(task)
+        self.queue.push(task, self._path_lengths.get(task.id, 0))
+
+    def __add_timer(self, task: Job, due: float) -> None:
+        """
+        Помещает задачу в кучу таймеров до наступления времени `due`.
+
+        Args:
+            task (Job): Отложенная задача.
+            due (float): Временная метка, после которой задачу можно
+            запускать.
+        """
+        heapq.heappush(self._timers, (due, next(self._timer_seq), task))
+        if self._tracer is not None:
+            self._tracer.job_delayed(task, due - time.time())
+
+    def __release_due_timers(self) -> None:
+        """
+        Переносит в очередь все задачи, время старта которых наступило.
+        """
+        now = time.time()
+        while self._timers and self._timers[0][0] <= now:
+            due, _, task = heapq.heappop(self._timers)
+            if task.recurrence is not None:
+                self.__fire(task, due, now)
+                continue
+            self.__push(task)
+            logger.info('%s добавлена в очередь', task.id)
+
+    def __fire(self, task: Job, due: float, now: float) -> None:
+        """
+        Запускает повторяющуюся задачу, время которой наступило,
+        с учётом её политики перекрытия запусков, и возвращает её
+        в кучу таймеров под временем следующего запуска.
+
+        Args:
+            task (Job): Повторяющаяся задача.
+            due (float): Запланированное время этого запуска.
+            now (float): Текущее время.
+        """
+        recurrence = task.recurrence
+        if (self._active_runs.get(task.id)
+                and recurrence.overlap != 'parallel'):
+            if recurrence.overlap == 'queue':
+                self._queued_runs[task.id] = (
+                    self._queued_runs.get(task.id, 0) + 1
+                )
+            else:
+                logger.info('Запуск задачи %s пропущен: предыдущий запуск '
+                            'ещё выполняется.', task.id)
+        else:
+            self.__start_run(task)
+
+        if not recurrence.exhausted(self._queued_runs.get(task.id, 0)):
+            self.__add_timer(task, recurrence.schedule.next_fire(due, now))
+
+    def __start_run(self, task: Job) -> None:
+        """
+        Ставит в очередь очередной запуск повторяющейся задачи.
+        """
+        run = task.spawn()
+        task.status = JobStatus.STARTED
+        task.recurrence.runs += 1
+        self._runs[run.id] = task
+        self._active_runs[task.id] = self._active_runs.get(task.id, 0) + 1
+        self.__push(run)
+        logger.info('Запуск %s задачи %s добавлен в очередь как %s',
+                    task.recurrence.runs, task.id, run.id)
+
+    def __finish_run(self, task: Job, run: Job) -> Optional[Job]:
+        """
+        Учитывает завершение запуска повторяющейся задачи.
+
+        Args:
+            task (Job): Повторяющаяся задача.
+            run (Job): Завершившийся запуск.
 
         Returns:
-            bool: Возвращает True, если зависимые
-            задачи не завершены, иначе False.
+            Job | None: Повторяющаяся задача, если это был её последний
+            запуск; её статус - статус последнего запуска.
         """
-        dependencies_completed = all(
-            status in (JobStatus.FINISHED, JobStatus.FAILED)
-            for status in task.dependency_statuses.values()
-        )
-        if not dependencies_completed:
-            logger.info(f'Задача {task.id} отложена из-за '
-                        'невыполненных зависимостей.')
-            task.status = JobStatus.POSTPONED
-            queue.rotate(1)
-            return True
-        return False
+        self._active_runs[task.id] -= 1
+        if self._queued_runs.get(task.id):
+            self._queued_runs[task.id] -= 1
+            self.__start_run(task)
+            return None
+        if self._active_runs[task.id] or not task.recurrence.exhausted():
+            return None
+        del self._active_runs[task.id]
+        self._queued_runs.pop(task.id, None)
+        task.status = run.status
+        return task
+
+    def __next_timer_delay(self) -> Optional[float]:
+        """
+        Возвращает время до старта ближайшей отложенной задачи
+        или None, если отложенных задач нет.
+        """
+        if not self._timers:
+            return None
+        return max(self._timers[0][0] - time.time(), 0)
+
+    def __sleep_until_next_timer(self) -> None:
+        """
+        Усыпляет планировщик до ближайшего времени старта отложенной задачи.
+        """
+        delay = self.__next_timer_delay()
+        if delay:
+            time.sleep(delay)
+
+    def __release_resources(self, task: Job) -> None:
+        """
+        Освобождает ресурсы задачи и возвращает в очередь задачи,
+        которые их ждали.
+        """
+        for waiting_task in self._resources.release(task):
+            self.__push(waiting_task)
+
+    def __unblock(self, task: Job) -> None:
+        """
+        Убирает задачу из ожидающих зависимостей.
+        """
+        del self._waiting[task.id]
+        self._metrics.job_unblocked(task)
+        if self._tracer is not None:
+            self._tracer.job_unblocked(task)
+
+    def __record_completion(self, task: Job) -> list[Job]:
+        """
+        Запоминает итоговый статус и результат завершённой задачи
+        и освобождает результаты её зависимостей.
+
+        Returns:
+            list[Job]: Одинаковые с ней задачи, которые завершаются
+            с тем же результатом.
+        """
+        self._completed[task.id] = task.status
+        if len(self._completed) > self.completed_window:
+            self._completed.popitem(last=False)
+        if self._journal is not None:
+            self._journal.record_status(task)
+        if task.status == JobStatus.FINISHED:
+            self.__store_result(task)
+        self._results.release(task.id)
+        key = self._cache_keys.pop(task.id, None)
+        if key is None:
+            return []
+        return self.__resolve_duplicates(task, key)
+
+    def __resolve_duplicates(self, task: Job, key: str) -> list[Job]:
+        """
+        Сохраняет результат выполненной задачи в кэш и передаёт его
+        ожидавшим её одинаковым задачам. Если задача провалена,
+        одинаковые задачи возвращаются в очередь: одна из них
+        выполнится вместо неё.
+
+        Returns:
+            list[Job]: Одинаковые задачи, завершённые с её результатом.
+        """
+        duplicates = self._duplicates.pop(key)
+        self._duplicate_count -= len(duplicates)
+        if task.status != JobStatus.FINISHED:
+            for duplicate in duplicates:
+                self.__push(duplicate)
+            return []
+
+        result = task.result
+        if not isinstance(result, SharedPayload):
+            self.cache.put(key, result)
+        elif duplicates:
+            # Общую память освобождают потребители задачи, поэтому
+            # одинаковые задачи получают копию.
+            result = bytes(result.view())
+        for duplicate in duplicates:
+            duplicate.result = result
+            duplicate.status = JobStatus.FINISHED
+        return duplicates
+
+    def __store_result(self, task: Job) -> None:
+        """
+        Сохраняет результат выполненной задачи, если его ждут
+        зависимые задачи с pass_results.
+        """
+        if self._results.put(task.id, task.result):
+            return
+        if isinstance(task.result, SharedPayload):
+            # Результат никому не передаётся: копируем его из общей
+            # памяти, чтобы он остался доступен в task.result.
+            payload = task.result
+            task.result = bytes(payload.view())
+            payload.unlink()
 
     def __delete_dependency_task_from_map(self, task: Job) -> None:
         """
@@ -236,13 +1037,46 @@ class Scheduler:
         зависимостей после её выполнения.
 
         После успешного завершения задачи, удаляет её из словаря зависимостей и
-        обновляет статусы всех задач, которые от неё зависели.
+        обновляет статусы всех задач, которые от неё зависели. Задачи,
+        у которых не осталось незавершённых зависимостей, ставятся в очередь.
+
+        Если задача провалена или пропущена, зависимые задачи с политикой
+        'skip' или 'fail' завершаются сразу, не дожидаясь остальных
+        зависимостей, и то же повторяется для всего графа ниже них.
 
         Args:
             task (Job): Задача для удаления.
         """
-        if task.id in self.dependency_map:
-            dependent_tasks = self.dependency_map[task.id]
-            for dependent_task in dependent_tasks:
+        stack = [task]
+        while stack:
+            task = stack.pop()
+            recurring = self._runs.pop(task.id, None)
+            if recurring is None:
+                stack.extend(self.__record_completion(task))
+            self._path_lengths.pop(task.id, None)
+            self.__release_resources(task)
+            self._metrics.job_completed(task)
+            if self._tracer is not None:
+                self._tracer.job_completed(task)
+            if recurring is not None:
+                # От запусков никто не зависит, и они не хранятся
+                # в _completed, чтобы память не росла с каждым запуском.
+                finished = self.__finish_run(recurring, task)
+                if finished is not None:
+                    stack.append(finished)
+                continue
+            failed = task.status in FAILED_STATUSES
+            for dependent_task in self.dependency_map.pop(task.id, ()):
+                if dependent_task.id not in self._waiting:
+                    # Задача уже отменена из-за другой зависимости.
+                    continue
                 self.__update_dependency_status(dependent_task, task)
-            del self.dependency_map[task.id]
+                if failed and dependent_task.on_dependency_failure != 'run':
+                    self.__unblock(dependent_task)
+                    self.__cancel(dependent_task)
+                    stack.append(dependent_task)
+                    continue
+                dependent_task.unresolved -= 1
+                if not dependent_task.unresolved:
+                    self.__unblock(dependent_task)
+                    self.__enqueue(dependent_task)
@@ -1,13 +1,42 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
 import unittest
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
 from uuid import UUID
-from time import sleep
+from time import sleep, time, process_time
 from unittest.mock import Mock, patch
+from urllib.request import urlopen
 
+import benchmarks
+from cache import (ResultCache,
+                   cache_key)
+import file_io
+import http_client
+from async_scheduler import AsyncScheduler
+from broker import BrokerExecutor, parse_address
+from custom_logger import RateLimitFilter, setup_logging, stop_logging
 from scheduler import Scheduler
-from job import Job, JobStatus
-from exceptions import QueueFullOfElems
+from job import Job, JobStatus, RetryPolicy
+from persistence import JobJournal
+from recurrence import Cron, Recurrence
+from results import SharedPayload
+from resources import ResourceLimit
+from run_queue import RunQueue
+from tracing import Tracer
+from dag import critical_path, validate_graph
+from executors import StepThreads, ThreadExecutor
+from exceptions import DependencyGraphError, QueueFullOfElems
 from exceptions import TaskTimeLimitError
 from utils import measure_execution_time
+from work_stealing import WorkStealingScheduler
+import worker
+from worker import run_worker
 
 
 def yield_none_generator():
@@ -15,6 +44,62 @@ def yield_none_generator():
         yield None
 
 
+def cpu_bound_generator(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+        yield
+
+
+def sleep_generator(seconds):
+    sleep(seconds)
+    yield
+
+
+def failing_generator():
+    yield
+    raise RuntimeError('boom')
+
+
+def wait_for_io_generator(finished):
+    future = file_io.submit(sleep, 0.2)
+    yield future
+    future.result()
+    finished.append(('io', time()))
+
+
+def quick_generator(finished):
+    for _ in range(3):
+        yield
+    finished.append(('quick', time()))
+
+
+def crash_once_generator(marker):
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    yield
+
+
+def produce_payload(size):
+    yield
+    return bytes(range(256)) * (size // 256)
+
+
+def consume_payload(data):
+    yield
+    return type(data).__name__, len(data), bytes(data[:2])
+
+
+SQUARED = []
+
+
+def counted_square(x):
+    SQUARED.append(x)
+    yield
+    return x * x
+
+
 class TestJob(unittest.TestCase):
     def test_job_initialization(self):
         mock_function = Mock(side_effect=yield_none_generator)
@@ -27,6 +112,18 @@ class TestJob(unittest.TestCase):
         self.assertEqual(job.status, JobStatus.NOT_STARTED)
         self.assertIsNotNone(job.coroutine)
 
+    def test_job_is_compact_and_lazy(self):
+        mock_function = Mock(side_effect=yield_none_generator)
+        job = Job(target=mock_function, dependencies=[UUID(int=1)])
+
+        self.assertFalse(hasattr(job, '__dict__'))
+        mock_function.assert_not_called()
+        job.run()
+        mock_function.assert_called_once_with()
+        job.reset()
+        job.run()
+        self.assertEqual(mock_function.call_count, 2)
+
     def test_job_run(self):
         mock_function = Mock(side_effect=yield_none_generator)
         job = Job(target=mock_function)
@@ -93,6 +190,8 @@ class TestScheduler(unittest.TestCase):
         self.mock_job.start_at = None
         self.mock_job.dependency_statuses = {}
         self.mock_job.status = JobStatus.NOT_STARTED
+        self.mock_job.priority = 0
+        self.mock_job.recurrence = None
 
     def test_initialization(self):
         self.assertEqual(len(self.scheduler.queue), 0)
@@ -117,16 +216,1245 @@ class TestScheduler(unittest.TestCase):
             self.scheduler.schedule(self.mock_job)
 
     def test_stop(self):
-        with patch('builtins.open', unittest.mock.mock_open()) as mock_open:
-            self.scheduler.stop()
-            mock_open.assert_called_with('jobs.pkl', 'wb')
+        job = Job(target=yield_none_generator)
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'jobs.pkl')
+            scheduler = Scheduler(pool_size=2, file=file)
+            scheduler.schedule(job)
+            scheduler.stop()
+
+            tasks, _ = JobJournal(file).replay()
+        self.assertEqual(job.status, JobStatus.PAUSED)
+        self.assertEqual([task.id for task in tasks], [job.id])
 
     def test_restart(self):
-        self.mock_job.status = JobStatus.FINISHED
-        with (patch('builtins.open', unittest.mock.mock_open(read_data=b"")),
-              patch('pickle.load', return_value=[self.mock_job])):
-            self.scheduler.restart()
-            self.assertEqual(self.mock_job.status, JobStatus.NOT_STARTED)
+        first = Job(target=yield_none_generator)
+        second = Job(target=yield_none_generator, dependencies=[first.id])
+        third = Job(target=yield_none_generator)
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'jobs.pkl')
+            scheduler = Scheduler(pool_size=3, file=file, journal=True)
+            for job in (first, second, third):
+                scheduler.schedule(job)
+            next(scheduler.run())
+            scheduler.stop()
+
+            restored = Scheduler(pool_size=1, file=file).restart()
+            self.assertEqual(Scheduler(file=file).restart(), [])
+
+        self.assertEqual(first.status, JobStatus.FINISHED)
+        self.assertEqual([job.id for job in restored],
+                         [second.id, third.id])
+        self.assertTrue(all(job.status == JobStatus.FINISHED
+                            for job in restored))
+
+    def test_crash_during_restart_keeps_jobs(self):
+        jobs = [Job(target=yield_none_generator) for _ in range(10)]
+        schedule = Scheduler.schedule
+        calls = []
+
+        def crash_on_third(scheduler, task):
+            calls.append(task.id)
+            if len(calls) == 3:
+                raise RuntimeError('сбой')
+            schedule(scheduler, task)
+
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'jobs.pkl')
+            JobJournal(file).compact(jobs, {})
+            with patch.object(Scheduler, 'schedule', crash_on_third), \
+                    self.assertRaises(RuntimeError):
+                Scheduler(pool_size=2, file=file).restart()
+
+            tasks, completed = JobJournal(file).replay()
+            restored = Scheduler(pool_size=2, file=file).restart()
+            self.assertEqual(JobJournal(file).replay()[0], [])
+
+        self.assertEqual({task.id for task in tasks} | set(completed),
+                         {job.id for job in jobs})
+        self.assertEqual(len(restored), len(tasks))
+        self.assertTrue(all(job.status == JobStatus.FINISHED
+                            for job in restored))
+
+
+class TestSchedulerTimers(unittest.TestCase):
+    def test_delayed_job_starts_on_time_without_spinning(self):
+        started_at = []
+
+        def delayed():
+            started_at.append(time())
+            yield
+
+        start_at = time() + 0.3
+        scheduler = Scheduler(pool_size=2)
+        scheduler.schedule(Job(target=delayed, start_at=start_at))
+
+        self.assertEqual(len(scheduler.queue), 0)
+        cpu_before = process_time()
+        for _ in scheduler.run():
+            pass
+
+        self.assertLess(process_time() - cpu_before, 0.1)
+        self.assertGreaterEqual(started_at[0], start_at)
+        self.assertLess(started_at[0] - start_at, 0.05)
+
+    def test_delayed_jobs_occupy_pool(self):
+        scheduler = Scheduler(pool_size=1)
+        scheduler.schedule(Job(target=yield_none_generator,
+                               start_at=time() + 60))
+        with self.assertRaises(QueueFullOfElems):
+            scheduler.schedule(Job(target=yield_none_generator))
+
+
+class TestSchedulerDependencies(unittest.TestCase):
+    def test_blocked_job_waits_outside_queue(self):
+        order = []
+
+        def step(name):
+            order.append(name)
+            yield
+
+        parent = Job(target=step, args=('parent',))
+        child = Job(target=step, args=('child',), dependencies=[parent.id])
+        scheduler = Scheduler(pool_size=2)
+        scheduler.schedule(child)
+        scheduler.schedule(parent)
+
+        self.assertEqual(list(scheduler.queue), [parent])
+        self.assertEqual(child.status, JobStatus.POSTPONED)
+        for _ in scheduler.run():
+            pass
+
+        self.assertEqual(order, ['parent', 'child'])
+        self.assertEqual(child.dependency_statuses[parent.id],
+                         JobStatus.FINISHED)
+        self.assertEqual(child.status, JobStatus.FINISHED)
+
+    def test_dependency_finished_before_submission(self):
+        parent = Job(target=yield_none_generator)
+        scheduler = Scheduler(pool_size=1)
+        scheduler.process_all_tasks((parent,))
+
+        child = Job(target=yield_none_generator, dependencies=[parent.id])
+        scheduler.process_all_tasks((child,))
+        self.assertEqual(child.status, JobStatus.FINISHED)
+
+
+class TestThreadExecutor(unittest.TestCase):
+    def test_steps_of_different_jobs_overlap(self):
+        active = {}
+        overlaps = []
+
+        def sleeper(name):
+            for _ in range(2):
+                active[name] = active.get(name, 0) + 1
+                overlaps.append(active[name])
+                sleep(0.2)
+                active[name] -= 1
+                yield
+
+        jobs = tuple(Job(target=sleeper, args=(i,)) for i in range(4))
+        scheduler = Scheduler(pool_size=4, executor='thread', workers=4)
+        started = time()
+        scheduler.process_all_tasks(jobs)
+
+        self.assertLess(time() - started, 0.8)
+        self.assertEqual(max(overlaps), 1)
+        for job in jobs:
+            self.assertEqual(job.status, JobStatus.FINISHED)
+
+    def test_owned_pool_is_shut_down(self):
+        with Scheduler(pool_size=2, executor='thread') as scheduler:
+            scheduler.process_all_tasks((Job(target=yield_none_generator),))
+        with self.assertRaises(RuntimeError):
+            scheduler.executor.submit(Job(target=yield_none_generator))
+
+        executor = ThreadExecutor(2)
+        self.addCleanup(executor.shutdown)
+        with Scheduler(pool_size=2, executor=executor) as scheduler:
+            scheduler.process_all_tasks((Job(target=yield_none_generator),))
+        # Переданный готовым исполнитель продолжает работать.
+        self.assertFalse(
+            executor.submit(Job(target=yield_none_generator)).result()
+        )
+
+    def test_unknown_executor(self):
+        with self.assertRaises(ValueError):
+            Scheduler(executor='fiber')
+
+
+class TestProcessExecutor(unittest.TestCase):
+    def test_jobs_run_in_worker_processes(self):
+        parent = Job(target=cpu_bound_generator, args=(1000,))
+        child = Job(target=cpu_bound_generator, kwargs={'n': 10},
+                    max_running_time=10, dependencies=[parent.id])
+        broken = Job(target=failing_generator, max_restarts=1)
+        scheduler = Scheduler(pool_size=3, executor='process', workers=2)
+        scheduler.process_all_tasks((parent, child, broken))
+
+        self.assertEqual(parent.status, JobStatus.FINISHED)
+        self.assertEqual(child.status, JobStatus.FINISHED)
+        self.assertGreater(child.running_time, 0)
+        self.assertEqual(broken.status, JobStatus.FAILED)
+        self.assertEqual(broken.restarts, 1)
+
+    def test_not_importable_target_fails(self):
+        job = Job(target=lambda: (yield))
+        scheduler = Scheduler(pool_size=1, executor='process', workers=1)
+        scheduler.process_all_tasks((job,))
+        self.assertEqual(job.status, JobStatus.FAILED)
+
+
+class TestAsyncScheduler(unittest.TestCase):
+    def test_many_io_bound_jobs_run_concurrently(self):
+        async def io_bound():
+            await asyncio.sleep(0.2)
+
+        async def streaming():
+            for _ in range(2):
+                await asyncio.sleep(0.1)
+                yield
+
+        jobs = [Job(target=io_bound) for _ in range(500)]
+        jobs += [Job(target=streaming) for _ in range(500)]
+        scheduler = AsyncScheduler(pool_size=1000)
+        started = time()
+        scheduler.process_all_tasks(jobs)
+
+        self.assertLess(time() - started, 1.5)
+        self.assertTrue(all(job.status == JobStatus.FINISHED
+                            for job in jobs))
+
+    def test_dependencies_restarts_and_timeouts(self):
+        order = []
+        attempts = []
+
+        async def record(name):
+            order.append(name)
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise RuntimeError('boom')
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        parent = Job(target=record, args=('parent',))
+        child = Job(target=record, args=('child',),
+                    dependencies=[parent.id])
+        retried = Job(target=flaky, max_restarts=1)
+        timed_out = Job(target=slow, max_running_time=0.1)
+        orphan = Job(target=record, args=('orphan',),
+                     dependencies=[timed_out.id, UUID(int=0)])
+        AsyncScheduler(pool_size=2).process_all_tasks(
+            [child, parent, retried, timed_out, orphan]
+        )
+
+        self.assertEqual(order, ['parent', 'child'])
+        self.assertEqual(child.dependency_statuses[parent.id],
+                         JobStatus.FINISHED)
+        self.assertEqual(retried.status, JobStatus.FINISHED)
+        self.assertEqual(retried.restarts, 1)
+        self.assertEqual(timed_out.status, JobStatus.FAILED)
+        self.assertEqual(orphan.status, JobStatus.POSTPONED)
+
+
+class TestRunQueue(unittest.TestCase):
+    def test_urgent_job_runs_first(self):
+        order = []
+
+        def step(name):
+            for _ in range(3):
+                order.append(name)
+                yield
+
+        background = [Job(target=step, args=(i,)) for i in range(9)]
+        urgent = Job(target=step, args=('urgent',), priority=5)
+        scheduler = Scheduler(pool_size=10)
+        scheduler.process_all_tasks((*background, urgent))
+
+        self.assertEqual(order[0], 'urgent')
+
+    def test_aging_prevents_starvation(self):
+        queue = RunQueue(aging=2)
+        low = Job(target=yield_none_generator, priority=0)
+        high = Job(target=yield_none_generator, priority=3)
+        queue.push(low)
+
+        picks = []
+        for _ in range(10):
+            queue.push(high)
+            picks.append(queue.pop())
+        self.assertIn(low, picks)
+        self.assertLessEqual(picks.index(low), 3 * queue.aging)
+
+
+class TestStreamingSubmission(unittest.TestCase):
+    def test_jobs_are_pulled_only_when_slot_is_free(self):
+        pulled = []
+        in_memory = []
+
+        def specs():
+            for _ in range(200):
+                in_memory.append(sum(
+                    job.status != JobStatus.FINISHED for job in pulled
+                ))
+                job = Job(target=yield_none_generator)
+                pulled.append(job)
+                yield job
+            yield {'target': yield_none_generator}
+
+        scheduler = Scheduler(pool_size=5)
+        with patch.object(scheduler, 'run', wraps=scheduler.run) as run:
+            scheduler.process_all_tasks(specs())
+
+        run.assert_called_once()
+        self.assertEqual(len(pulled), 200)
+        self.assertLessEqual(max(in_memory), 6)
+        self.assertTrue(all(job.status == JobStatus.FINISHED
+                            for job in pulled))
+
+    def test_completed_statuses_are_bounded(self):
+        def specs():
+            previous = None
+            for _ in range(2000):
+                job = Job(target=yield_none_generator,
+                          dependencies=[previous] if previous else None)
+                previous = job.id
+                yield job
+
+        scheduler = Scheduler(pool_size=5, completed_window=100)
+        scheduler.process_all_tasks(specs())
+
+        self.assertEqual(len(scheduler._completed), 100)
+        self.assertFalse(scheduler.dependency_map)
+        self.assertFalse(scheduler._waiting)
+        self.assertEqual(
+            scheduler.metrics()['jobs_completed']['FINISHED'], 2000
+        )
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_queued_job_memory(self):
+        result = benchmarks.measure_queued_job_memory(1000, 'chain')
+        self.assertEqual(result['jobs'], 1000)
+        self.assertGreater(result['bytes_per_job'], 0)
+
+    def test_dag_shapes_on_every_engine(self):
+        for engine in ('inline', 'thread', 'async', 'stealing'):
+            for shape in benchmarks.SHAPES:
+                result = benchmarks.measure_dag(engine, shape, 30,
+                                                pool_size=5,
+                                                trace_memory=False)
+                self.assertEqual(result['steps'], result['nodes'] * 2)
+                self.assertGreater(result['scheduler_us_per_step'], 0)
+
+    def test_contention(self):
+        for design in ('stealing', 'global'):
+            result = benchmarks.measure_contention(design, 4, nodes=100)
+            self.assertEqual(result['steps'], 1100)
+
+
+class TestLogging(unittest.TestCase):
+    def test_rate_limit_filter_samples_repeated_messages(self):
+        rate_limit = RateLimitFilter(interval=60, burst=2)
+        records = [logging.LogRecord('scheduler', logging.INFO, __file__, 0,
+                                     'Задача %s отложена', (i,), None)
+                   for i in range(5)]
+        error = logging.LogRecord('scheduler', logging.ERROR, __file__, 0,
+                                  'Задача %s отложена', (0,), None)
+
+        passed = [rate_limit.filter(record) for record in records]
+        self.assertEqual(passed, [True, True, False, False, False])
+        self.assertTrue(rate_limit.filter(error))
+
+    def test_queued_logging_writes_in_background(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'program.log')
+            try:
+                setup_logging(level=logging.INFO, filename=file, queued=True)
+                logging.getLogger('scheduler').debug('скрыто')
+                logging.getLogger('scheduler').info('видно %s', 1)
+                stop_logging()
+                root.handlers[0].close()
+            finally:
+                root.handlers[:] = handlers
+                root.setLevel(level)
+
+            with open(file) as log:
+                content = log.read()
+        self.assertIn('INFO, видно 1', content)
+        self.assertNotIn('скрыто', content)
+
+
+class TestMetrics(unittest.TestCase):
+    def test_snapshot_and_prometheus_export(self):
+        parent = Job(target=yield_none_generator)
+        child = Job(target=yield_none_generator, dependencies=[parent.id])
+        broken = Job(target=failing_generator, max_restarts=1)
+        scheduler = Scheduler(pool_size=3)
+        scheduler.process_all_tasks((parent, child, broken))
+
+        snapshot = scheduler.metrics()
+        latency = snapshot['step_latency']['tests.yield_none_generator']
+        self.assertEqual(latency['count'], 8)
+        self.assertEqual(latency['buckets'][float('inf')], 8)
+        self.assertEqual(snapshot['dependency_wait']['count'], 1)
+        self.assertEqual(snapshot['restarts'], 1)
+        self.assertEqual(sum(snapshot['jobs_completed'].values()), 3)
+        self.assertEqual(snapshot['jobs']['running'], 0)
+
+        server = scheduler.serve_metrics(port=0)
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+            with urlopen(url) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn('scheduler_step_duration_seconds_bucket{target='
+                      '"tests.yield_none_generator",le="+Inf"} 8', body)
+        self.assertIn('scheduler_job_restarts_total 1', body)
+
+    def test_snapshot_from_another_thread(self):
+        snapshots = []
+        errors = []
+        done = threading.Event()
+
+        def poll():
+            while not done.is_set():
+                try:
+                    snapshots.append(scheduler.metrics()['jobs'])
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        scheduler = Scheduler(pool_size=20, executor='thread', workers=4,
+                              cache=ResultCache())
+        poller = threading.Thread(target=poll)
+        poller.start()
+        try:
+            scheduler.process_all_tasks(
+                Job(target=counted_square, args=(i % 5,), cache=True)
+                for i in range(2000)
+            )
+        finally:
+            done.set()
+            poller.join()
+            scheduler.shutdown()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(any(jobs.get('ready') for jobs in snapshots))
+        self.assertEqual(scheduler.metrics()['jobs']['running'], 0)
+
+
+class TestWatchdog(unittest.TestCase):
+    def test_step_threads_are_reused(self):
+        def steps():
+            for _ in range(50):
+                yield
+
+        def hung():
+            sleep(0.3)
+            yield
+
+        threads = StepThreads()
+        with patch('threading.Thread', wraps=threading.Thread) as thread:
+            coroutine = steps()
+            for _ in range(50):
+                threads.submit(coroutine).result()
+            self.assertEqual(thread.call_count, 1)
+
+            # Поток занят зависшим шагом: для следующего шага
+            # создаётся замена.
+            threads.submit(hung())
+            threads.submit(steps()).result()
+            self.assertEqual(thread.call_count, 2)
+
+    def test_hung_step_is_abandoned(self):
+        finished = []
+
+        def hung():
+            yield
+            sleep(5)
+            yield
+
+        def quick():
+            for _ in range(3):
+                sleep(0.05)
+                yield
+            finished.append(time())
+
+        for executor in ('inline', 'thread'):
+            with self.subTest(executor=executor):
+                stuck = Job(target=hung, step_timeout=0.2, max_restarts=1)
+                other = Job(target=quick)
+                scheduler = Scheduler(pool_size=2, executor=executor,
+                                      workers=2)
+                started = time()
+                scheduler.process_all_tasks((stuck, other))
+
+                self.assertLess(time() - started, 1)
+                self.assertEqual(stuck.status, JobStatus.FAILED)
+                self.assertEqual(stuck.restarts, 1)
+                self.assertEqual(other.status, JobStatus.FINISHED)
+
+    def test_running_time_budget_is_enforced_during_the_step(self):
+        def slow():
+            sleep(5)
+            yield
+
+        job = Job(target=slow, max_running_time=0.2)
+        started = time()
+        Scheduler(pool_size=1).process_all_tasks((job,))
+
+        self.assertLess(time() - started, 1)
+        self.assertEqual(job.status, JobStatus.FAILED)
+
+    def test_abandoned_step_does_not_touch_retry(self):
+        def hangs_once(attempts):
+            attempts.append(None)
+            if len(attempts) == 1:
+                sleep(0.6)
+                yield
+                return 'abandoned'
+            for _ in range(4):
+                sleep(0.1)
+                yield
+            return 'retry'
+
+        for executor in ('inline', 'thread'):
+            with self.subTest(executor=executor):
+                job = Job(target=hangs_once, args=([],), step_timeout=0.2,
+                          max_running_time=0.8, max_restarts=1)
+                Scheduler(pool_size=1, executor=executor,
+                          workers=1).process_all_tasks((job,))
+                # Брошенный шаг заканчивается во время повтора,
+                # но его 0.6 с не добавляются ко времени новой попытки.
+                sleep(0.3)
+
+                self.assertEqual(job.status, JobStatus.FINISHED)
+                self.assertEqual(job.restarts, 1)
+                self.assertEqual(job.result, 'retry')
+                self.assertLess(job.running_time, 0.8)
+
+    def test_abandoned_process_keeps_its_worker(self):
+        stuck = Job(target=sleep_generator, args=(1,), max_running_time=0.3)
+        other = Job(target=sleep_generator, args=(0.1,),
+                    max_running_time=0.5)
+        scheduler = Scheduler(pool_size=2, executor='process', workers=1)
+        scheduler.process_all_tasks((stuck, other))
+
+        self.assertEqual(stuck.status, JobStatus.FAILED)
+        # Задача ждала, пока освободится рабочий процесс брошенной
+        # задачи, и её срок не шёл в очереди пула.
+        self.assertEqual(other.status, JobStatus.FINISHED)
+
+
+class TestRetry(unittest.TestCase):
+    def test_backoff_delay(self):
+        policy = RetryPolicy(base=1, factor=2, cap=5, jitter=0)
+        self.assertEqual([policy.delay(n) for n in range(1, 5)],
+                         [1, 2, 4, 5])
+
+        policy = RetryPolicy(base=1, jitter=0.5)
+        for _ in range(100):
+            self.assertTrue(0.5 <= policy.delay(1) <= 1.5)
+
+    def test_retry_starts_target_again(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(time())
+            yield
+            if len(attempts) == 1:
+                raise ConnectionError('нет соединения')
+            yield
+
+        def quick():
+            yield
+
+        job = Job(target=flaky, max_restarts=2,
+                  retry=RetryPolicy(base=0.3, jitter=0))
+        other = Job(target=quick)
+        scheduler = Scheduler(pool_size=2)
+        scheduler.process_all_tasks((job, other))
+
+        self.assertEqual(job.status, JobStatus.FINISHED)
+        self.assertEqual(job.restarts, 1)
+        self.assertEqual(len(attempts), 2)
+        self.assertGreaterEqual(attempts[1] - attempts[0], 0.3)
+        self.assertEqual(other.status, JobStatus.FINISHED)
+
+    def test_retry_on_filters_errors(self):
+        job = Job(target=failing_generator, max_restarts=3,
+                  retry=RetryPolicy(retry_on=(ConnectionError,)))
+        Scheduler(pool_size=1).process_all_tasks((job,))
+
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertEqual(job.restarts, 0)
+
+    def test_async_scheduler_backoff(self):
+        job = Job(target=failing_generator, max_restarts=2,
+                  retry=RetryPolicy(base=0.1, jitter=0))
+        started = time()
+        AsyncScheduler(pool_size=1).process_all_tasks((job,))
+
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertEqual(job.restarts, 2)
+        self.assertGreaterEqual(time() - started, 0.3)
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_validate_graph(self):
+        first = Job(target=yield_none_generator)
+        second = Job(target=yield_none_generator, dependencies=[first.id])
+        order = validate_graph([second, first])
+        self.assertEqual(order, [first, second])
+
+        orphan = Job(target=yield_none_generator, dependencies=[first.id])
+        with self.assertRaises(DependencyGraphError):
+            validate_graph([orphan])
+        self.assertEqual(validate_graph([orphan], known={first.id}),
+                         [orphan])
+
+        third = Job(target=yield_none_generator)
+        fourth = Job(target=yield_none_generator, dependencies=[third.id])
+        third.dependencies = (fourth.id,)
+        with self.assertRaises(DependencyGraphError):
+            validate_graph([first, third, fourth])
+
+    def test_critical_path(self):
+        jobs = benchmarks.diamonds(7)
+        lengths = critical_path(validate_graph(jobs))
+        self.assertEqual([lengths[job.id] for job in jobs],
+                         [5, 4, 4, 3, 2, 2, 1])
+
+    def test_dependents_listed_first_are_added_after_dependency(self):
+        a = Job(target=yield_none_generator)
+        b = Job(target=yield_none_generator, dependencies=[a.id])
+        c = Job(target=yield_none_generator, dependencies=[a.id])
+        Scheduler(pool_size=2).process_all_tasks([b, c, a])
+        self.assertTrue(all(job.status == JobStatus.FINISHED
+                            for job in (a, b, c)))
+
+        a = Job(target=yield_none_generator)
+        b = Job(target=yield_none_generator, dependencies=[a.id])
+        c = Job(target=yield_none_generator, dependencies=[a.id])
+        with self.assertRaises(QueueFullOfElems):
+            Scheduler(pool_size=2).process_all_tasks(
+                job for job in (b, c, a)
+            )
+
+    def test_invalid_graph_is_rejected_before_running(self):
+        job = Job(target=yield_none_generator)
+        job.dependencies = (job.id,)
+        scheduler = Scheduler(pool_size=1)
+        with self.assertRaises(DependencyGraphError):
+            scheduler.process_all_tasks([job])
+        self.assertEqual(job.status, JobStatus.NOT_STARTED)
+        with self.assertRaises(DependencyGraphError):
+            AsyncScheduler(pool_size=1).process_all_tasks([job])
+
+    def test_critical_path_runs_first(self):
+        started = []
+
+        def record(name):
+            started.append(name)
+            yield
+
+        for ordering, expected in (('fifo', 'short'),
+                                   ('critical-path', 'long')):
+            with self.subTest(ordering=ordering):
+                started.clear()
+                short = Job(target=record, args=('short',))
+                long = benchmarks.chain(3)
+                long[0] = Job(target=record, args=('long',))
+                long[1].dependencies = (long[0].id,)
+                Scheduler(pool_size=4, ordering=ordering).process_all_tasks(
+                    [short, *long]
+                )
+                self.assertEqual(started[0], expected)
+
+
+class TestDependencyFailure(unittest.TestCase):
+    def build(self):
+        root = Job(target=failing_generator)
+        skipped = Job(target=yield_none_generator, dependencies=[root.id],
+                      on_dependency_failure='skip')
+        failed = Job(target=yield_none_generator, dependencies=[skipped.id],
+                     on_dependency_failure='fail')
+        runs = Job(target=yield_none_generator, dependencies=[skipped.id])
+        slow = Job(target=cpu_bound_generator, args=(1000,))
+        joined = Job(target=yield_none_generator,
+                     dependencies=[slow.id, failed.id],
+                     on_dependency_failure='skip')
+        return root, skipped, failed, runs, slow, joined
+
+    def test_failure_cascades(self):
+        root, skipped, failed, runs, slow, joined = self.build()
+        scheduler = Scheduler(pool_size=6)
+        scheduler.process_all_tasks((root, skipped, failed, runs, slow,
+                                     joined))
+
+        self.assertEqual(root.status, JobStatus.FAILED)
+        self.assertEqual(skipped.status, JobStatus.SKIPPED)
+        self.assertEqual(failed.status, JobStatus.FAILED)
+        self.assertEqual(runs.status, JobStatus.FINISHED)
+        self.assertEqual(joined.status, JobStatus.SKIPPED)
+        self.assertEqual(slow.status, JobStatus.FINISHED)
+        # Задача отменена сразу, не дожидаясь второй зависимости.
+        completed = list(scheduler._completed)
+        self.assertLess(completed.index(joined.id), completed.index(slow.id))
+
+        late = Job(target=yield_none_generator, dependencies=[root.id],
+                   on_dependency_failure='skip')
+        scheduler.process_all_tasks((late,))
+        self.assertEqual(late.status, JobStatus.SKIPPED)
+
+    def test_async_scheduler(self):
+        root, skipped, failed, runs, slow, joined = self.build()
+        AsyncScheduler(pool_size=6).process_all_tasks(
+            (root, skipped, failed, runs, slow, joined)
+        )
+
+        self.assertEqual(skipped.status, JobStatus.SKIPPED)
+        self.assertEqual(failed.status, JobStatus.FAILED)
+        self.assertEqual(runs.status, JobStatus.FINISHED)
+        self.assertEqual(joined.status, JobStatus.SKIPPED)
+
+
+class TestBroker(unittest.TestCase):
+    def start(self, workers, address=('127.0.0.1', 0)):
+        broker = BrokerExecutor(address)
+        processes = [multiprocessing.Process(target=run_worker,
+                                             args=(broker.address,
+                                                   broker.authkey))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        self.addCleanup(self.stop, broker, processes)
+        deadline = time() + 5
+        while broker.workers() < workers and time() < deadline:
+            sleep(0.01)
+        self.assertEqual(broker.workers(), workers)
+        return broker
+
+    @staticmethod
+    def stop(broker, processes):
+        broker.shutdown()
+        for process in processes:
+            process.join(5)
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address('localhost:5000'), ('localhost', 5000))
+        self.assertEqual(parse_address('/tmp/broker.sock'),
+                         '/tmp/broker.sock')
+
+    def test_connection_requires_broker_key(self):
+        broker = BrokerExecutor()
+        self.addCleanup(broker.shutdown)
+        other = BrokerExecutor()
+        self.addCleanup(other.shutdown)
+
+        self.assertNotEqual(broker.authkey, other.authkey)
+        with self.assertRaises(multiprocessing.AuthenticationError):
+            run_worker(broker.address, other.authkey)
+        with patch.dict(os.environ, clear=True), \
+                patch('sys.argv', ['worker.py', 'localhost:5000']), \
+                self.assertRaises(SystemExit):
+            worker.main()
+
+    def test_workers_run_dag(self):
+        broker = self.start(2)
+        first = Job(target=cpu_bound_generator, args=(1000,))
+        second = Job(target=cpu_bound_generator, args=(1000,),
+                     dependencies=[first.id])
+        broken = Job(target=failing_generator, max_restarts=1)
+        Scheduler(pool_size=3, executor=broker).process_all_tasks(
+            (first, second, broken)
+        )
+
+        self.assertEqual(first.status, JobStatus.FINISHED)
+        self.assertEqual(second.status, JobStatus.FINISHED)
+        self.assertEqual(broken.status, JobStatus.FAILED)
+        self.assertEqual(broken.restarts, 1)
+
+    def test_jobs_of_dead_worker_are_requeued(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        broker = self.start(2, os.path.join(directory.name, 'broker.sock'))
+        job = Job(target=crash_once_generator,
+                  args=(os.path.join(directory.name, 'marker'),))
+        Scheduler(pool_size=1, executor=broker).process_all_tasks((job,))
+
+        self.assertEqual(job.status, JobStatus.FINISHED)
+        self.assertEqual(job.restarts, 0)
+        self.assertEqual(broker.workers(), 1)
+
+
+class TestWorkStealing(unittest.TestCase):
+    def test_dag_runs_on_every_design(self):
+        for stealing in (True, False):
+            with self.subTest(stealing=stealing):
+                jobs = benchmarks.random_dag(500, steps_per_job=3)
+                WorkStealingScheduler(workers=4, stealing=stealing
+                                      ).process_all_tasks(jobs)
+                self.assertTrue(all(job.status == JobStatus.FINISHED
+                                    for job in jobs))
+
+    def test_failures_and_timers(self):
+        broken = Job(target=failing_generator, max_restarts=1)
+        skipped = Job(target=yield_none_generator,
+                      dependencies=[broken.id],
+                      on_dependency_failure='skip')
+        delayed = Job(target=yield_none_generator, start_at=time() + 0.2)
+        started = time()
+        WorkStealingScheduler(workers=2).process_all_tasks(
+            (broken, skipped, delayed)
+        )
+
+        self.assertGreaterEqual(time() - started, 0.2)
+        self.assertEqual(broken.status, JobStatus.FAILED)
+        self.assertEqual(broken.restarts, 1)
+        self.assertEqual(skipped.status, JobStatus.SKIPPED)
+        self.assertEqual(delayed.status, JobStatus.FINISHED)
+
+
+class TestResourceLimits(unittest.TestCase):
+    def test_concurrency_limit(self):
+        running = []
+        peak = {'api': 0, None: 0}
+
+        def call(tag):
+            running.append(tag)
+            peak[tag] = max(peak[tag], running.count(tag))
+            sleep(0.05)
+            yield
+            sleep(0.05)
+            running.remove(tag)
+
+        jobs = [Job(target=call, args=('api',), resources=['api'])
+                for _ in range(6)]
+        jobs += [Job(target=call, args=(None,)) for _ in range(4)]
+        scheduler = Scheduler(pool_size=10, executor='thread', workers=10,
+                              limits={'api': ResourceLimit(concurrency=2)})
+        scheduler.process_all_tasks(jobs)
+
+        self.assertTrue(all(job.status == JobStatus.FINISHED for job in jobs))
+        self.assertEqual(peak['api'], 2)
+        self.assertEqual(peak[None], 4)
+
+    def test_saturated_tag_does_not_delay_untagged_jobs(self):
+        finished = {}
+
+        def call(name):
+            sleep(0.25)
+            yield
+            finished[name] = time()
+
+        jobs = [Job(target=call, args=(f'api-{index}',), resources=['api'])
+                for index in range(4)]
+        jobs.append(Job(target=call, args=('untagged',)))
+        scheduler = Scheduler(pool_size=4, executor='thread', workers=4,
+                              limits={'api': ResourceLimit(concurrency=1)})
+        started = time()
+        scheduler.process_all_tasks(jobs)
+
+        self.assertTrue(all(job.status == JobStatus.FINISHED for job in jobs))
+        # Задачи с тегом выполняются по одной, а задача без тега -
+        # сразу на свободном потоке.
+        self.assertLess(finished['untagged'] - started, 0.5)
+        self.assertGreaterEqual(max(finished.values()) - started, 1.0)
+
+    def test_jobs_waiting_for_tag_are_bounded(self):
+        scheduler = Scheduler(pool_size=4,
+                              limits={'api': ResourceLimit(concurrency=1)})
+        parked = []
+
+        def jobs():
+            for _ in range(2000):
+                parked.append(len(scheduler._resources))
+                yield Job(target=yield_none_generator, resources=['api'])
+
+        scheduler.process_all_tasks(jobs())
+
+        self.assertEqual(len(parked), 2000)
+        self.assertLessEqual(max(parked), 4)
+
+    def test_rate_limit(self):
+        jobs = [Job(target=yield_none_generator, resources=['api'])
+                for _ in range(2)]
+        scheduler = Scheduler(pool_size=2,
+                              limits={'api': ResourceLimit(rate=20)})
+        started = time()
+        scheduler.process_all_tasks(jobs)
+
+        # 8 шагов, 20 токенов в секунду, первые 20 без ожидания.
+        self.assertLess(time() - started, 0.2)
+        jobs = [Job(target=yield_none_generator, resources=['api'])
+                for _ in range(2)]
+        scheduler = Scheduler(pool_size=2,
+                              limits={'api': ResourceLimit(rate=20, burst=1)})
+        started = time()
+        scheduler.process_all_tasks(jobs)
+        self.assertGreaterEqual(time() - started, 0.3)
+        self.assertTrue(all(job.status == JobStatus.FINISHED for job in jobs))
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        connections = self.connections = []
+
+        class Handler(benchmarks.OkHandler):
+            def setup(self):
+                connections.append(self.client_address)
+                super().setup()
+
+        self.server = benchmarks.ThreadingHTTPServer(('127.0.0.1', 0),
+                                                     Handler)
+        benchmarks.threading.Thread(target=self.server.serve_forever,
+                                    daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(http_client.close)
+
+    def test_connections_are_reused(self):
+        job = Job(target=benchmarks.fetch, args=(self.url, 10, True))
+        Scheduler(pool_size=1).process_all_tasks((job,))
+
+        self.assertEqual(job.status, JobStatus.FINISHED)
+        self.assertIs(http_client.session(), http_client.session())
+        self.assertEqual(len(self.connections), 1)
+
+    def test_async_request(self):
+        async def get():
+            response = await http_client.request('GET', self.url)
+            self.assertEqual(response.text, 'ok')
+            yield
+
+        job = Job(target=get)
+        AsyncScheduler(pool_size=1).process_all_tasks((job,))
+        self.assertEqual(job.status, JobStatus.FINISHED)
+
+
+class TestFileIO(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_write_batch(self):
+        with open(self.path('old.txt'), 'w') as file:
+            file.write('old\n')
+        batch = file_io.WriteBatch()
+        batch.append(self.path('old.txt'), 'one\n')
+        batch.append(self.path('old.txt'), 'two\n')
+        batch.append(self.path('new.bin'), b'skipped')
+        batch.write(self.path('new.bin'), b'data')
+        self.assertEqual(batch.flush(), 2)
+        self.assertEqual(len(batch), 0)
+
+        self.assertEqual(file_io.read_file(self.path('old.txt')),
+                         b'old\none\ntwo\n')
+        self.assertEqual(file_io.read_file(self.path('new.bin')), b'data')
+
+    def test_copy_and_mapped_read(self):
+        data = os.urandom(3 << 20)
+        with open(self.path('large'), 'wb') as file:
+            file.write(data)
+        os.chmod(self.path('large'), 0o640)
+        copied = file_io.copy_file(self.path('large'), self.path('copy'))
+
+        self.assertEqual(copied, len(data))
+        self.assertEqual(os.stat(self.path('copy')).st_mode & 0o777, 0o640)
+        self.assertEqual(file_io.read_file(self.path('copy')), data)
+        with file_io.map_file(self.path('copy')) as mapped:
+            self.assertEqual(mapped[:16], data[:16])
+        open(self.path('empty'), 'w').close()
+        with file_io.map_file(self.path('empty')) as mapped:
+            self.assertEqual(mapped, b'')
+
+    def test_engines_wait_for_yielded_future(self):
+        engines = {
+            'scheduler': lambda jobs: Scheduler(pool_size=2)
+            .process_all_tasks(jobs),
+            'async': lambda jobs: AsyncScheduler(pool_size=2)
+            .process_all_tasks(jobs),
+            'stealing': lambda jobs: WorkStealingScheduler(workers=1)
+            .process_all_tasks(jobs),
+        }
+        for name, run in engines.items():
+            with self.subTest(engine=name):
+                finished = []
+                jobs = [Job(target=wait_for_io_generator, args=(finished,)),
+                        Job(target=quick_generator, args=(finished,))]
+                run(jobs)
+
+                self.assertTrue(all(job.status == JobStatus.FINISHED
+                                    for job in jobs))
+                # Пока первая задача ждёт ввода-вывода, вторая выполняется.
+                self.assertEqual([name for name, _ in finished],
+                                 ['quick', 'io'])
+
+
+class TestRecurrence(unittest.TestCase):
+    @staticmethod
+    def timestamp(*args):
+        return datetime(*args).timestamp()
+
+    def test_cron_next_fire(self):
+        cases = [
+            ('*/15 * * * *', (2024, 5, 10, 10, 7), (2024, 5, 10, 10, 15)),
+            ('0 9 * * 1-5', (2024, 5, 10, 10, 0), (2024, 5, 13, 9, 0)),
+            ('30 23 31 * *', (2024, 4, 1, 0, 0), (2024, 5, 31, 23, 30)),
+            ('0 0 29 2 *', (2023, 3, 1, 0, 0), (2024, 2, 29, 0, 0)),
+            ('0 12 1 * 0', (2024, 5, 10, 13, 0), (2024, 5, 12, 12, 0)),
+            # 7 - тоже воскресенье, в том числе на конце диапазона.
+            ('0 0 * * 5-7', (2024, 5, 11, 1, 0), (2024, 5, 12, 0, 0)),
+            ('0 0 * * 1-7', (2024, 5, 12, 1, 0), (2024, 5, 13, 0, 0)),
+            ('0 0 * * */7', (2024, 5, 10, 1, 0), (2024, 5, 12, 0, 0)),
+            ('0 0 * * 1,7', (2024, 5, 10, 1, 0), (2024, 5, 12, 0, 0)),
+        ]
+        for expression, now, expected in cases:
+            with self.subTest(expression=expression):
+                now = self.timestamp(*now)
+                self.assertEqual(Cron(expression).next_fire(now, now),
+                                 self.timestamp(*expected))
+
+        start = self.timestamp(2024, 5, 10, 10, 15)
+        self.assertEqual(Cron('*/15 * * * *').first_fire(start), start)
+        with self.assertRaises(ValueError):
+            Cron('0 0 31 2 *').next_fire(start, start)
+        with self.assertRaises(ValueError):
+            Cron('60 * * * *')
+        with self.assertRaises(ValueError):
+            Recurrence(every=1, cron='* * * * *')
+
+    def test_interval_does_not_drift(self):
+        schedule = Recurrence(every=10).schedule
+        # Запуск обработан с опозданием: следующий всё равно в срок.
+        self.assertEqual(schedule.next_fire(100, 103), 110)
+        # Пропущенные запуски не наверстываются.
+        self.assertEqual(schedule.next_fire(100, 135), 140)
+
+    def test_recurring_job(self):
+        fired = []
+
+        def tick():
+            fired.append(time())
+            yield
+
+        job = Job(target=tick,
+                  recurrence=Recurrence(every=0.05, max_runs=4))
+        scheduler = Scheduler(pool_size=1)
+        started = time()
+        scheduler.process_all_tasks([job])
+
+        self.assertEqual(job.status, JobStatus.FINISHED)
+        self.assertEqual(len(fired), 4)
+        for index, moment in enumerate(fired):
+            self.assertAlmostEqual(moment - started, index * 0.05,
+                                   delta=0.03)
+        # Четыре запуска и сама повторяющаяся задача.
+        self.assertEqual(
+            scheduler.metrics()['jobs_completed']['FINISHED'], 5
+        )
+
+    def test_overlap_policies(self):
+        expected = {'skip': 0.3, 'queue': 0.25, 'parallel': 0.1}
+        for overlap, second_start in expected.items():
+            with self.subTest(overlap=overlap):
+                fired = []
+
+                def slow():
+                    fired.append(time())
+                    sleep(0.25)
+                    yield
+
+                job = Job(target=slow,
+                          recurrence=Recurrence(every=0.1, max_runs=2,
+                                                overlap=overlap))
+                scheduler = Scheduler(pool_size=1, executor='thread',
+                                      workers=2)
+                scheduler.process_all_tasks([job])
+
+                self.assertEqual(job.status, JobStatus.FINISHED)
+                self.assertEqual(len(fired), 2)
+                self.assertAlmostEqual(fired[1] - fired[0], second_start,
+                                       delta=0.04)
+
+
+class TestDataflow(unittest.TestCase):
+    def test_results_passed_to_dependents(self):
+        def produce(value):
+            yield
+            return value
+
+        def add(*values):
+            yield
+            return sum(value or 0 for value in values)
+
+        first = Job(target=produce, args=(20,))
+        second = Job(target=produce, args=(22,))
+        total = Job(target=add, dependencies=[first.id, second.id],
+                    pass_results=True)
+        failed = Job(target=failing_generator)
+        after_failure = Job(target=add, args=(1,),
+                            dependencies=[failed.id], pass_results=True)
+        scheduler = Scheduler(pool_size=5)
+        scheduler.process_all_tasks([first, second, total,
+                                     failed, after_failure])
+
+        self.assertEqual(total.inputs, (20, 22))
+        self.assertEqual(total.result, 42)
+        self.assertEqual(after_failure.result, 1)
+        # Все результаты получены, хранить больше нечего.
+        self.assertEqual(len(scheduler._results), 0)
+
+    def test_large_result_through_shared_memory(self):
+        size = 2 << 20
+        producer = Job(target=produce_payload, args=(size,))
+        consumer = Job(target=consume_payload,
+                       dependencies=[producer.id], pass_results=True)
+        sink = Job(target=produce_payload, args=(size,))
+        scheduler = Scheduler(pool_size=3, executor='process', workers=2)
+        scheduler.process_all_tasks([producer, consumer, sink])
+        scheduler.executor.shutdown()
+
+        self.assertEqual(consumer.result, ('memoryview', size, b'\x00\x01'))
+        self.assertIsInstance(producer.result, SharedPayload)
+        # Последний потребитель завершился - блок удалён.
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(producer.result.name)
+        # Результат без потребителей скопирован из общей памяти.
+        self.assertEqual(sink.result, bytes(range(256)) * (size // 256))
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        SQUARED.clear()
+
+    def test_hits_and_duplicates(self):
+        cache = ResultCache()
+        first = Job(target=counted_square, args=(3,), cache=True)
+        duplicate = Job(target=counted_square, args=(3,), cache=True)
+        other = Job(target=counted_square, args=(4,), cache=True)
+        dependent = Job(target=counted_square, dependencies=[duplicate.id],
+                        pass_results=True)
+        Scheduler(pool_size=4, cache=cache).process_all_tasks(
+            [first, duplicate, other, dependent]
+        )
+
+        # Одинаковая задача не выполнялась, но передала результат дальше.
+        self.assertEqual(SQUARED, [3, 4, 9])
+        self.assertEqual((duplicate.status, duplicate.result),
+                         (JobStatus.FINISHED, 9))
+        self.assertEqual(dependent.result, 81)
+
+        SQUARED.clear()
+        again = Job(target=counted_square, args=(4,), cache=True)
+        dependent = Job(target=counted_square, dependencies=[again.id],
+                        pass_results=True)
+        scheduler = Scheduler(pool_size=1, cache=cache)
+        scheduler.process_all_tasks([again, dependent])
+
+        self.assertEqual(SQUARED, [16])
+        self.assertEqual((again.status, again.result),
+                         (JobStatus.FINISHED, 16))
+        self.assertEqual(scheduler.metrics()['cache'],
+                         {'hits': 1, 'misses': 3, 'entries': 2})
+
+    def test_key_ignores_set_order(self):
+        def key(*args):
+            return cache_key(Job(target=counted_square, args=args))
+
+        # 1 и 9 попадают в одну ячейку: порядок обхода зависит от вставки.
+        self.assertNotEqual(list({1, 9}), list({9, 1}))
+        self.assertEqual(key({1, 9}, [frozenset({1, 9})]),
+                         key({9, 1}, [frozenset({9, 1})]))
+        self.assertNotEqual(key({1, 9}), key(frozenset({1, 9})))
+        self.assertNotEqual(key({1}), key(('set', 1)))
+
+    def test_failed_job_is_not_cached(self):
+        cache = ResultCache()
+        jobs = [Job(target=failing_generator, cache=True) for _ in range(2)]
+        Scheduler(pool_size=2, cache=cache).process_all_tasks(jobs)
+
+        self.assertTrue(all(job.status == JobStatus.FAILED for job in jobs))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_and_ttl(self):
+        cache = ResultCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(cache.get('b'), (False, None))
+        self.assertEqual(cache.get('a'), (True, 1))
+
+        cache = ResultCache(ttl=0.05)
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a'), (True, 1))
+        sleep(0.06)
+        self.assertEqual(cache.get('a'), (False, None))
+        self.assertEqual(len(cache), 0)
+
+    def test_disk_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results')
+            cache = ResultCache(path=path)
+            cache.put('a', {'value': 1})
+            cache.close()
+
+            cache = ResultCache(path=path)
+            self.assertEqual(cache.get('a'), (True, {'value': 1}))
+            cache.close()
+
+
+class TestTracing(unittest.TestCase):
+    def test_chrome_trace(self):
+        tracer = Tracer()
+        first = Job(target=yield_none_generator)
+        second = Job(target=failing_generator, dependencies=[first.id],
+                     max_restarts=1)
+        delayed = Job(target=yield_none_generator, start_at=time() + 0.05)
+        Scheduler(pool_size=3, tracer=tracer).process_all_tasks(
+            [first, second, delayed]
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            tracer.dump(path)
+            with open(path) as file:
+                events = json.load(file)['traceEvents']
+
+        names = {event['name'] for event in events}
+        self.assertTrue({'run', 'step', 'queued', 'waiting', 'delayed',
+                         'retry', 'FINISHED', 'FAILED'} <= names)
+        spans = [event for event in events if event['ph'] == 'X']
+        self.assertTrue(all(event['dur'] >= 0 for event in spans))
+        # По четыре шага first и delayed (последний шаг завершает
+        # генератор) и по два шага на каждую из двух попыток second.
+        self.assertEqual(sum(event['name'] == 'step' for event in spans),
+                         12)
+        tracks = {event['tid'] for event in spans if event['name'] == 'step'}
+        self.assertEqual(len(tracks), 3)
+
+    def test_ring_buffer(self):
+        tracer = Tracer(capacity=10)
+        jobs = [Job(target=yield_none_generator) for _ in range(5)]
+        Scheduler(pool_size=5, tracer=tracer).process_all_tasks(jobs)
+
+        self.assertEqual(len(tracer), 10)
+        self.assertEqual(tracer.events()[-1]['name'], 'run')
 
 
 if __name__ == "__main__":
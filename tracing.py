@@ -0,0 +1,174 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Optional
+from uuid import UUID
+
+from job import Job
+from metrics import target_name
+
+# Сколько событий хранит трассировщик по умолчанию.
+TRACE_CAPACITY = 100_000
+
+
+class Tracer:
+    """
+    Записывает события выполнения задач в кольцевой буфер
+    и выгружает их в формате Chrome Trace Event (JSON), который
+    открывается в chrome://tracing и ui.perfetto.dev.
+
+    Работа Scheduler.run() записывается на отдельную дорожку
+    планировщика. У каждой задачи своя дорожка на временной шкале: на ней видны
+    ожидание зависимостей, ожидание времени старта, ожидание
+    ввода-вывода, ожидание в очереди, шаги и мгновенные события
+    (перезапуски, результат из кэша, завершение). Когда буфер заполнен,
+    самые старые события вытесняются.
+
+    Атрибуты:
+        capacity (int): Максимальное количество хранимых событий.
+    """
+
+    def __init__(self, capacity: int = TRACE_CAPACITY) -> None:
+        self.capacity: int = capacity
+        # События хранятся кортежами и превращаются в словари
+        # только при выгрузке.
+        self._events: deque[tuple] = deque(maxlen=capacity)
+        self._origin = time.perf_counter()
+        self._pid = 1
+        self._tracks: dict[UUID, int] = {}
+        self._next_track = 1
+        self._lock = threading.Lock()
+        # Начала незакрытых промежутков: (ID задачи, название) -> время.
+        # Промежуток работы планировщика записывается с ID None.
+        self._open: dict[tuple[Optional[UUID], str], float] = {}
+
+    def run_started(self) -> None:
+        self._open[(None, 'run')] = self.__now()
+
+    def run_finished(self) -> None:
+        start = self._open.pop((None, 'run'), None)
+        if start is not None:
+            self._events.append(('X', 'run', 'scheduler', start,
+                                 self.__now() - start, 0, None))
+
+    def job_blocked(self, task: Job) -> None:
+        self.__begin(task, 'waiting')
+
+    def job_unblocked(self, task: Job) -> None:
+        self.__end(task, 'waiting', 'dependencies')
+
+    def job_delayed(self, task: Job, delay: float) -> None:
+        self.__begin(task, 'delayed')
+        self.__instant(task, 'delayed', 'timer', {'delay_s': round(delay, 6)})
+
+    def job_awaiting(self, task: Job) -> None:
+        self.__begin(task, 'io')
+
+    def job_ready(self, task: Job) -> None:
+        self.__end(task, 'delayed', 'timer')
+        self.__end(task, 'io', 'io')
+        self.__begin(task, 'queued')
+
+    def step_started(self, task: Job) -> None:
+        self.__end(task, 'queued', 'queue')
+        self.__begin(task, 'step')
+
+    def step_finished(self, task: Job) -> None:
+        self.__end(task, 'step', 'step',
+                   {'running_time': task.running_time})
+
+    def job_restarted(self, task: Job, error: Exception) -> None:
+        self.__instant(task, 'retry', 'retry',
+                       {'restarts': task.restarts, 'error': repr(error)})
+
+    def job_cached(self, task: Job) -> None:
+        self.__instant(task, 'cache hit', 'cache')
+
+    def job_completed(self, task: Job) -> None:
+        for name in ('waiting', 'delayed', 'io', 'queued', 'step'):
+            self._open.pop((task.id, name), None)
+        self.__instant(task, task.status.value, 'job')
+        self._tracks.pop(task.id, None)
+
+    def events(self) -> list[dict]:
+        """
+        Возвращает записанные события в формате Chrome Trace Event.
+        """
+        events = [{'name': name, 'ph': 'M', 'pid': self._pid, 'tid': 0,
+                   'args': {'name': 'Scheduler'}}
+                  for name in ('process_name', 'thread_name')]
+        for phase, name, category, start, duration, track, args in list(
+                self._events):
+            event = {'name': name, 'cat': category, 'ph': phase,
+                     'ts': round(start * 1e6, 3), 'pid': self._pid,
+                     'tid': track}
+            if phase == 'X':
+                event['dur'] = round(duration * 1e6, 3)
+            elif phase == 'i':
+                event['s'] = 't'
+            if args:
+                event['args'] = args
+            events.append(event)
+        return events
+
+    def dump(self, path: str) -> None:
+        """
+        Записывает события в JSON-файл.
+
+        Args:
+            path (str): Путь к файлу.
+        """
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.events(),
+                       'displayTimeUnit': 'ms'}, file)
+
+    def clear(self) -> None:
+        """
+        Удаляет все записанные события.
+        """
+        self._events.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __now(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def __track(self, task: Job) -> int:
+        """
+        Возвращает номер дорожки задачи, создавая её при первом событии.
+        """
+        track = self._tracks.get(task.id)
+        if track is None:
+            with self._lock:
+                track = self._next_track
+                self._next_track += 1
+            self._tracks[task.id] = track
+            self._events.append(
+                ('M', 'thread_name', '', 0.0, 0.0, track,
+                 {'name': f'{target_name(task)} {str(task.id)[:8]}'})
+            )
+        return track
+
+    def __begin(self, task: Job, name: str) -> None:
+        self._open[(task.id, name)] = self.__now()
+
+    def __end(self,
+              task: Job,
+              name: str,
+              category: str,
+              args: Optional[dict] = None) -> None:
+        start = self._open.pop((task.id, name), None)
+        if start is None:
+            return
+        self._events.append(('X', name, category, start,
+                             self.__now() - start, self.__track(task), args))
+
+    def __instant(self,
+                  task: Job,
+                  name: str,
+                  category: str,
+                  args: Optional[dict] = None) -> None:
+        self._events.append(('i', name, category, self.__now(), 0.0,
+                             self.__track(task), args))
@@ -1,3 +1,4 @@
+import importlib
 import time
 from typing import Callable
 
@@ -28,18 +29,71 @@ def measure_execution_time(func: Callable):
             return func(self, *args, **kwargs)
 
         # Если есть ограничение, то засекаем время исполнения задачи
-        start_time = time.time()
+        # по монотонным часам высокого разрешения.
+        start_time = time.perf_counter()
         result = func(self, *args, **kwargs)
-        passed_time = time.time() - start_time
+        charge_running_time(self, time.perf_counter() - start_time)
+        return result
 
-        self.running_time += passed_time
+    return wrapper
 
-        if self.running_time > self.max_running_time:
-            logger.error('Функция превысела максимально возможное время '
-                         'исполнения | %s > %s',
-                         self.max_running_time, self.running_time)
-            raise TaskTimeLimitError
 
-        return result
+def charge_running_time(task, passed_time: float) -> None:
+    """
+    Добавляет время шага к накопленному времени выполнения задачи.
 
-    return wrapper
+    Args:
+        task: Задача с атрибутами running_time и max_running_time.
+        passed_time (float): Длительность шага в секундах.
+
+    Raises:
+        TaskTimeLimitError: Если накопленное время превысило
+        max_running_time.
+    """
+    task.running_time += passed_time
+
+    if task.running_time > task.max_running_time:
+        logger.error('Функция превысела максимально возможное время '
+                     'исполнения | %s > %s',
+                     task.max_running_time, task.running_time)
+        raise TaskTimeLimitError
+
+
+def target_reference(target: Callable) -> str:
+    """
+    Возвращает строку, по которой цель задачи можно импортировать
+    в другом процессе.
+
+    Args:
+        target (Callable): Функция-генератор задачи.
+
+    Returns:
+        str: Ссылка на цель в формате 'модуль:имя'.
+
+    Raises:
+        ValueError: Если цель нельзя импортировать по имени
+        (lambda, вложенная функция, объект без имени).
+    """
+    module = getattr(target, '__module__', None)
+    qualname = getattr(target, '__qualname__', None)
+    if (not isinstance(module, str) or not isinstance(qualname, str)
+            or '<' in qualname):
+        raise ValueError(f'Цель {target!r} нельзя импортировать по имени')
+    return f'{module}:{qualname}'
+
+
+def import_target(reference: str) -> Callable:
+    """
+    Импортирует цель задачи по ссылке, полученной из target_reference.
+
+    Args:
+        reference (str): Ссылка на цель в формате 'модуль:имя'.
+
+    Returns:
+        Callable: Импортированная функция-генератор.
+    """
+    module_name, _, qualname = reference.partition(':')
+    target = importlib.import_module(module_name)
+    for attribute in qualname.split('.'):
+        target = getattr(target, attribute)
+    return target
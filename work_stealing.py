@@ -0,0 +1,303 @@
+import heapq
+import random
+import threading
+import time
+from collections import deque
+from itertools import count
+from typing import (Iterable,
+                    Optional)
+from uuid import UUID
+
+from dag import validate_graph
+from executors import run_step
+from job import (FAILED_STATUSES,
+                 Job,
+                 JobStatus)
+from custom_logger import logger
+
+# Сколько ждёт работы простаивающий поток, прежде чем снова
+# попробовать украсть задачу и проверить таймеры.
+IDLE_WAIT = 0.01
+
+
+class WorkStealingScheduler:
+    """
+    Многопоточный планировщик с отдельной очередью у каждого потока.
+
+    Поток берёт задачи из своей очереди без общей блокировки: выполняет
+    шаг задачи и, если задача не завершилась, ставит её в конец своей
+    очереди. Поток, у которого кончились задачи, крадёт задачу с конца
+    очереди другого потока, не мешая его владельцу. Задачи, зависимости
+    которых только что выполнились, попадают в начало очереди потока,
+    завершившего последнюю зависимость: их данные, скорее всего,
+    ещё в кэше этого процессора.
+
+    С `stealing=False` все потоки берут задачи из одной общей очереди
+    под общей блокировкой; этот режим нужен для сравнения.
+
+    Учитываются зависимости, время старта, перезапуски с политикой
+    повторов и политика on_dependency_failure. Зависшие шаги
+    не прерываются: step_timeout не поддерживается.
+
+    Атрибуты:
+        workers (int): Количество рабочих потоков.
+        stealing (bool): Использовать очереди потоков и кражу задач.
+        dependency_map (dict[UUID, list[Job]]): Задачи, ожидающие
+        завершения задачи с данным ID.
+    """
+
+    def __init__(self, workers: int = 4, stealing: bool = True) -> None:
+        self.workers: int = workers
+        self.stealing: bool = stealing
+        self.dependency_map: dict[UUID, list[Job]] = {}
+        self._completed: dict[UUID, JobStatus] = {}
+        self._queues: list[deque[Job]] = []
+        # Блокировка общей очереди в режиме без кражи задач.
+        self._queue_lock = threading.Lock()
+        # Блокировка зависимостей, таймеров и счётчика задач.
+        self._lock = threading.Lock()
+        self._timers: list[tuple[float, int, Job]] = []
+        self._timer_seq = count()
+        self._remaining = 0
+        self._idle = 0
+        self._wakeup = threading.Condition()
+
+    def process_all_tasks(self, tasks: Iterable[Job]) -> None:
+        """
+        Выполняет все переданные задачи и возвращает управление,
+        когда каждая из них выполнена или провалена.
+
+        Args:
+            tasks (Iterable[Job]): Задачи для выполнения.
+
+        Raises:
+            DependencyGraphError: Если зависимости задач образуют цикл
+            или ссылаются на отсутствующие задачи.
+        """
+        tasks = validate_graph(list(tasks), self._completed)
+        self._queues = [deque()
+                        for _ in range(self.workers if self.stealing else 1)]
+        self._remaining = len(tasks)
+
+        ready = []
+        for task in tasks:
+            if self.__dependency_failed(task):
+                self.__complete(task, self.__cancelled_status(task), 0)
+            elif self.__register_dependencies(task):
+                task.status = JobStatus.POSTPONED
+            else:
+                ready.append(task)
+        # Начальные задачи раздаются потокам по кругу.
+        for index, task in enumerate(ready):
+            self.__enqueue(task, index % self.workers, front=False)
+
+        threads = [threading.Thread(target=self.__work, args=(index,),
+                                    name=f'stealing-{index}')
+                   for index in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        logger.info('Все задачи обработаны')
+
+    def __register_dependencies(self, task: Job) -> int:
+        """
+        Записывает незавершённые зависимости задачи в dependency_map.
+
+        Returns:
+            int: Количество незавершённых зависимостей.
+        """
+        unresolved = 0
+        for dependency in task.dependencies:
+            if dependency in self._completed:
+                task.dependency_statuses[dependency] = (
+                    self._completed[dependency]
+                )
+            else:
+                self.dependency_map.setdefault(dependency, []).append(task)
+                unresolved += 1
+        task.unresolved = unresolved
+        return unresolved
+
+    def __dependency_failed(self, task: Job) -> bool:
+        return task.on_dependency_failure != 'run' and any(
+            self._completed.get(dependency) in FAILED_STATUSES
+            for dependency in task.dependencies
+        )
+
+    @staticmethod
+    def __cancelled_status(task: Job) -> JobStatus:
+        logger.warning('Задача %s не будет запущена: её зависимость '
+                       'провалена.', task.id)
+        if task.on_dependency_failure == 'skip':
+            return JobStatus.SKIPPED
+        return JobStatus.FAILED
+
+    def __work(self, index: int) -> None:
+        """
+        Цикл рабочего потока: берёт задачи из своей очереди или крадёт
+        чужие, пока в планировщике есть невыполненные задачи.
+        """
+        while self._remaining:
+            task = self.__next(index)
+            if task is None:
+                if not self.__release_due_timers(index):
+                    self.__wait_for_work()
+                continue
+
+            try:
+                exhausted = run_step(task)
+            except Exception as e:
+                logger.error('Ошибка при выполнении %s: %s', task.id, e)
+                self.__handle_failure(task, e, index)
+                continue
+
+            if exhausted:
+                self.__complete(task, JobStatus.FINISHED, index)
+            elif task.awaiting is not None:
+                # Задача вернётся в очередь, когда завершится её Future.
+                awaiting, task.awaiting = task.awaiting, None
+                awaiting.add_done_callback(
+                    lambda _, task=task, index=index:
+                    self.__push(task, index, front=False)
+                )
+            else:
+                self.__push(task, index, front=False)
+
+    def __next(self, index: int) -> Optional[Job]:
+        """
+        Возвращает следующую задачу для потока или None, если задач нет.
+        """
+        if not self.stealing:
+            with self._queue_lock:
+                queue = self._queues[0]
+                return queue.popleft() if queue else None
+
+        # Операции deque атомарны, поэтому своя очередь и кража
+        # обходятся без блокировок.
+        try:
+            return self._queues[index].popleft()
+        except IndexError:
+            pass
+        offset = random.randrange(self.workers)
+        for shift in range(self.workers):
+            victim = self._queues[(offset + shift) % self.workers]
+            try:
+                return victim.pop()
+            except IndexError:
+                continue
+        return None
+
+    def __push(self, task: Job, index: int, front: bool) -> None:
+        """
+        Ставит задачу в очередь потока `index` (или в общую очередь):
+        в начало, если её нужно выполнить следующей, иначе в конец.
+        """
+        if self.stealing:
+            self.__put(self._queues[index], task, front)
+        else:
+            with self._queue_lock:
+                self.__put(self._queues[0], task, front)
+        if self._idle:
+            with self._wakeup:
+                self._wakeup.notify()
+
+    @staticmethod
+    def __put(queue: deque, task: Job, front: bool) -> None:
+        if front:
+            queue.appendleft(task)
+        else:
+            queue.append(task)
+
+    def __enqueue(self, task: Job, index: int, front: bool = True) -> None:
+        if task.start_at and time.time() < task.start_at:
+            self.__add_timer(task, task.start_at)
+        else:
+            self.__push(task, index, front)
+
+    def __add_timer(self, task: Job, due: float) -> None:
+        with self._lock:
+            heapq.heappush(self._timers, (due, next(self._timer_seq), task))
+
+    def __release_due_timers(self, index: int) -> bool:
+        """
+        Переносит в очередь потока задачи, время старта которых наступило.
+
+        Returns:
+            bool: True, если хотя бы одна задача перенесена.
+        """
+        if not self._timers:
+            return False
+        due = []
+        now = time.time()
+        with self._lock:
+            while self._timers and self._timers[0][0] <= now:
+                due.append(heapq.heappop(self._timers)[2])
+        for task in due:
+            self.__push(task, index, front=False)
+        return bool(due)
+
+    def __wait_for_work(self) -> None:
+        """
+        Ждёт, пока появится работа, но не дольше IDLE_WAIT
+        и не дольше, чем до ближайшего таймера.
+        """
+        timeout = IDLE_WAIT
+        if self._timers:
+            timeout = min(timeout, max(self._timers[0][0] - time.time(), 0))
+        with self._wakeup:
+            self._idle += 1
+            self._wakeup.wait(timeout)
+            self._idle -= 1
+
+    def __handle_failure(self,
+                         task: Job,
+                         error: Exception,
+                         index: int) -> None:
+        if (task.max_restarts > task.restarts
+                and task.retry.should_retry(error)):
+            task.restarts += 1
+            task.running_time = 0
+            task.reset()
+            delay = task.retry.delay(task.restarts)
+            if delay > 0:
+                self.__add_timer(task, time.time() + delay)
+            else:
+                self.__push(task, index, front=False)
+            return
+        self.__complete(task, JobStatus.FAILED, index)
+
+    def __complete(self, task: Job, status: JobStatus, index: int) -> None:
+        """
+        Завершает задачу и передаёт потоку `index` зависимые задачи,
+        которые стали готовыми. Зависимые задачи с политикой 'skip'
+        или 'fail' проваленной задачи завершаются сразу вместе со всем
+        графом ниже них.
+        """
+        task.status = status
+        ready = []
+        with self._lock:
+            stack = [task]
+            while stack:
+                task = stack.pop()
+                self._completed[task.id] = task.status
+                self._remaining -= 1
+                failed = task.status in FAILED_STATUSES
+                for dependent in self.dependency_map.pop(task.id, ()):
+                    if dependent.id in self._completed:
+                        continue
+                    dependent.dependency_statuses[task.id] = task.status
+                    if failed and dependent.on_dependency_failure != 'run':
+                        dependent.status = self.__cancelled_status(dependent)
+                        stack.append(dependent)
+                        continue
+                    dependent.unresolved -= 1
+                    if not dependent.unresolved:
+                        ready.append(dependent)
+            finished = not self._remaining
+
+        for dependent in ready:
+            self.__enqueue(dependent, index)
+        if finished:
+            with self._wakeup:
+                self._wakeup.notify_all()
@@ -0,0 +1,92 @@
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import (Client,
+                                        Connection)
+
+from broker import (Address,
+                    parse_address)
+from executors import run_job_in_process
+from custom_logger import logger
+
+
+def run_worker(address: Address,
+               authkey: bytes,
+               capacity: int = 1) -> None:
+    """
+    Подключается к брокеру и выполняет задачи, пока брокер
+    не попросит остановиться или не закроет соединение.
+
+    Рабочий сам запрашивает задачи: при подключении он сообщает,
+    сколько задач может выполнять одновременно, а каждый отчёт
+    о выполненной задаче освобождает место для следующей.
+
+    Args:
+        address (Address): Адрес брокера.
+        authkey (bytes): Общий с брокером ключ для проверки подключения
+        (BrokerExecutor.authkey).
+        capacity (int): Количество задач, выполняемых одновременно.
+    """
+    connection = Client(address, authkey=authkey)
+    send_lock = threading.Lock()
+    logger.info('Рабочий %s подключился к брокеру %s', os.getpid(), address)
+
+    def execute(key: int, spec: tuple) -> None:
+        try:
+            message = ('done', key, run_job_in_process(*spec))
+        except Exception as e:
+            logger.error('Ошибка при выполнении %s: %s', spec[0], e)
+            message = ('error', key, e)
+        with send_lock:
+            try:
+                connection.send(message)
+            except OSError:
+                pass
+            except Exception:
+                # Исключение не удалось передать брокеру как есть.
+                connection.send(('error', key,
+                                 RuntimeError(repr(message[2]))))
+
+    with ThreadPoolExecutor(max_workers=capacity,
+                            thread_name_prefix='worker') as pool:
+        with send_lock:
+            connection.send(('ready', capacity))
+        try:
+            while True:
+                message = _receive(connection)
+                if message is None or message[0] == 'stop':
+                    break
+                _, key, spec = message
+                pool.submit(execute, key, spec)
+        finally:
+            connection.close()
+    logger.info('Рабочий %s остановлен', os.getpid())
+
+
+def _receive(connection: Connection):
+    try:
+        return connection.recv()
+    except (EOFError, OSError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Рабочий процесс, выполняющий задачи брокера.'
+    )
+    parser.add_argument('address',
+                        help='Адрес брокера: хост:порт или путь к сокету')
+    parser.add_argument('--capacity', type=int, default=1,
+                        help='Количество задач, выполняемых одновременно')
+    args = parser.parse_args()
+    # Ключ не передаётся в командной строке, чтобы его не было видно в ps.
+    authkey = os.environ.get('SCHEDULER_AUTHKEY')
+    if not authkey:
+        parser.error('не задана переменная окружения SCHEDULER_AUTHKEY '
+                     'с ключом брокера')
+    run_worker(parse_address(args.address), authkey.encode(), args.capacity)
+
+
+if __name__ == '__main__':
+    main()